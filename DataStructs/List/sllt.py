@@ -2,9 +2,9 @@
 from typing import Any
 # import csv
 # import project libs
-from Src.Func.DataStructs.List import ltnode as node
+from DataStructs.List import ltnode as node
 # import project errors
-from Src.Func.Utils.error import error_handler as err
+from Utils.error import error_handler as err
 
 
 def dflt_elm_cmp_lt(id1: Any, id2: Any) -> int:
@@ -371,6 +371,29 @@ def find(lt: dict, element: Any) -> int:
         err("singlelist", "find()", e)
 
 
+def is_present(lt: dict, element: Any) -> int:
+    """is_present checks if an element is present in the single linked list walking the nodes only once.
+
+    Args:
+        lt (dict): single linked list to check.
+        element (Any): element to check if is present in the single linked list.
+
+    Returns:
+        int: returns the position of the element in the single linked list if it is present, -1 otherwise.
+    """
+    try:
+        cur = lt.get("first")
+        idx = 0
+        while cur is not None:
+            if compare(lt, element, cur.get("data")):
+                return idx
+            cur = cur["next"]
+            idx += 1
+        return -1
+    except Exception as e:
+        err("singlelist", "is_present()", e)
+
+
 def sub_list(lt: dict, start: int, end: int) -> dict:
     """sub_list returns a sub list of the single linked list from the start position to the end position.
 
@@ -11,17 +11,17 @@ import random as rd
 from typing import Any
 
 # import modules for data structures index + bucket
-from Src.Func.DataStructs.List import arlt     # as idx
-from Src.Func.DataStructs.List import sllt     # as bucket
+from DataStructs.List import arlt     # as idx
+from DataStructs.List import sllt     # as bucket
 
 # import error handler
-from Src.Func.Utils.error import error_handler as err
+from Utils.error import error_handler as err
 
 # import map entry
-from Src.Func.DataStructs.Tables import entry as me
+from DataStructs.Tables import entry as me
 
 # import prime number generator
-from Src.Func.Utils import numbers as num
+from Utils import numbers as num
 
 
 def dflt_mp_entry_cmp(key: Any, entry: Any) -> int:
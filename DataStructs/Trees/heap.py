@@ -1,4 +1,5 @@
-﻿from typing import Any, Callable
+﻿import heapq
+from typing import Any, Callable
 from DataStructs.List import arlt
 from Utils.error import error_handler as err
 
@@ -11,18 +12,40 @@ def dflt_heap_elm_cmp(id1: Any, id2: Any) -> int:
     return 0
 
 
-def new_heap(cmp_function: Callable[[Any, Any], int] = None) -> dict:
+def new_heap(cmp_function: Callable[[Any, Any], int] = None,
+             key: Callable[[Any], Any] = None) -> dict:
     try:
+        # con key, cada elemento se guarda como (key(elm), seq, elm) y el
+        # heap compara tuplas nativas sin invocar la función de comparación
         _new_heap = {
             "elements": arlt.new_list(cmp_function),
             "size": 0,
-            "cmp_function": cmp_function or dflt_heap_elm_cmp
+            "cmp_function": cmp_function or dflt_heap_elm_cmp,
+            "key": key,
+            "seq": 0
         }
         return _new_heap
     except Exception as exp:
         err("heap", "new_heap()", exp)
 
 
+def heapify(iterable: Any,
+            cmp_function: Callable[[Any, Any], int] = None,
+            key: Callable[[Any], Any] = None) -> dict:
+    try:
+        # construcción de abajo hacia arriba en O(n)
+        _heap = new_heap(cmp_function, key)
+        _elements = [_wrap(_heap, elm) for elm in iterable]
+        _heap["elements"].update({"elements": _elements})
+        _heap["elements"].update({"size": len(_elements)})
+        _heap["size"] = len(_elements)
+        for idx in range(_heap["size"] // 2 - 1, -1, -1):
+            _sink(_heap, idx)
+        return _heap
+    except Exception as exp:
+        err("heap", "heapify()", exp)
+
+
 def size(heap: dict) -> int:
     try:
         return heap["size"]
@@ -39,16 +62,28 @@ def is_empty(heap: dict) -> bool:
 
 def get_min(heap: dict) -> Any:
     try:
-        if is_empty(heap):
+        if heap["size"] == 0:
             return None
-        return arlt.get_element(heap["elements"], 0)
+        if heap["key"] is not None:
+            return heap["elements"]["elements"][0][2]
+        return _unwrap(heap, arlt.get_element(heap["elements"], 0))
     except Exception as exp:
         err("heap", "get_min()", exp)
 
 
 def insert(heap: dict, elm: Any) -> None:
     try:
-        arlt.add_last(heap["elements"], elm)  # Inserta correctamente al final
+        if heap["key"] is not None:
+            # camino rápido en modo key: las entradas (key(elm), seq, elm)
+            # tienen orden total y heapq las ubica sobre la lista interna
+            _elements = heap["elements"]
+            _entry = (heap["key"](elm), heap["seq"], elm)
+            heap["seq"] += 1
+            heapq.heappush(_elements["elements"], _entry)
+            _elements["size"] += 1
+            heap["size"] += 1
+            return
+        arlt.add_last(heap["elements"], _wrap(heap, elm))  # Inserta correctamente al final
         heap["size"] = arlt.size(heap["elements"])
         _swim(heap, heap["size"] - 1)
     except Exception as exp:
@@ -57,21 +92,65 @@ def insert(heap: dict, elm: Any) -> None:
 
 def delete_min(heap: dict) -> Any:
     try:
-        if is_empty(heap):
+        if heap["size"] == 0:
             return None
+        if heap["key"] is not None:
+            _elements = heap["elements"]
+            _min = heapq.heappop(_elements["elements"])
+            _elements["size"] -= 1
+            heap["size"] -= 1
+            return _min[2]
         _min = arlt.get_element(heap["elements"], 0)
         _last = arlt.get_element(heap["elements"], heap["size"] - 1)
         arlt.update(heap["elements"], 0, _last)
         arlt.remove_last(heap["elements"])
         heap["size"] = arlt.size(heap["elements"])
         _sink(heap, 0)
-        return _min
+        return _unwrap(heap, _min)
     except Exception as exp:
         err("heap", "delete_min()", exp)
 
 
+def top_k(heap: dict, k: int) -> list:
+    try:
+        # recorre la frontera de hijos desde la raíz con un heap auxiliar de
+        # posiciones, en O(k log k) y sin copiar el heap original
+        _elements = heap["elements"]["elements"]
+        _size = heap["size"]
+        _top = []
+        if k <= 0 or _size == 0:
+            return _top
+        if heap["key"] is not None:
+            _frontier = new_heap(key=lambda pos: _elements[pos])
+        else:
+            _cmp = heap["cmp_function"]
+            _frontier = new_heap(lambda pos1, pos2: _cmp(_elements[pos1],
+                                                         _elements[pos2]))
+        insert(_frontier, 0)
+        while len(_top) < k and not is_empty(_frontier):
+            pos = delete_min(_frontier)
+            _top.append(_unwrap(heap, _elements[pos]))
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < _size:
+                    insert(_frontier, child)
+        return _top
+    except Exception as exp:
+        err("heap", "top_k()", exp)
+
+
+def iterator(heap: dict) -> object:
+    try:
+        for _elm in arlt.iterator(heap["elements"]):
+            yield _unwrap(heap, _elm)
+    except Exception as exp:
+        err("heap", "iterator()", exp)
+
+
 def _swim(heap: dict, idx: int) -> None:
     try:
+        if heap["key"] is not None:
+            _swim_key(heap, idx)
+            return
         while idx > 0:
             parent_idx = (idx - 1) // 2
             parent = arlt.get_element(heap["elements"], parent_idx)
@@ -87,6 +166,9 @@ def _swim(heap: dict, idx: int) -> None:
 
 def _sink(heap: dict, idx: int) -> None:
     try:
+        if heap["key"] is not None:
+            _sink_key(heap, idx)
+            return
         _size = heap["size"]
         while 2 * idx + 1 < _size:
             j = 2 * idx + 1
@@ -117,3 +199,92 @@ def _exchange(heap: dict, idx1: int, idx2: int) -> None:
         arlt.exchange(heap["elements"], idx1, idx2)
     except Exception as exp:
         err("heap", "_exchange()", exp)
+
+
+def _wrap(heap: dict, elm: Any) -> Any:
+    if heap["key"] is None:
+        return elm
+    _entry = (heap["key"](elm), heap["seq"], elm)
+    heap["seq"] += 1
+    return _entry
+
+
+def _unwrap(heap: dict, entry: Any) -> Any:
+    if heap["key"] is None or entry is None:
+        return entry
+    return entry[2]
+
+
+# gancho opcional de conteo, lo fija Utils/instrumentacion.py al activarse;
+# recibe (nombre, n) al terminar cada recorrido en modo key
+_contar = None
+
+
+def _contar_swim(contar: Callable[[str, int], None], nombre: str,
+                 inicio: int, fin: int) -> None:
+    # cada nivel subido es un movimiento y una comparación, más la
+    # comparación que detuvo el recorrido si no llegó a la raíz
+    _movimientos = (inicio + 1).bit_length() - (fin + 1).bit_length()
+    contar(f"{nombre}.comparaciones", _movimientos + (fin > 0))
+    contar(f"{nombre}.intercambios", _movimientos)
+
+
+def _contar_sink(contar: Callable[[str, int], None], nombre: str,
+                 inicio: int, fin: int, size: int) -> None:
+    # cada nivel bajado compara los dos hijos y el menor con la entrada;
+    # solo el último nodo interno puede tener un único hijo, y en fin se
+    # compara otra vez si todavía tiene hijos
+    _movimientos = (fin + 1).bit_length() - (inicio + 1).bit_length()
+    _comparaciones = 2 * _movimientos
+    if _movimientos and fin == size - 1 and fin % 2 == 1:
+        _comparaciones -= 1
+    if 2 * fin + 1 < size:
+        _comparaciones += 1 + (2 * fin + 2 < size)
+    contar(f"{nombre}.comparaciones", _comparaciones)
+    contar(f"{nombre}.intercambios", _movimientos)
+
+
+# en modo key se recorre directamente la lista interna del arlt y se
+# compara con tuplas nativas, la secuencia evita comparar los elementos
+def _swim_key(heap: dict, idx: int) -> None:
+    try:
+        _elements = heap["elements"]["elements"]
+        _entry = _elements[idx]
+        _inicio = idx
+        while idx > 0:
+            parent_idx = (idx - 1) >> 1
+            parent = _elements[parent_idx]
+            if _entry < parent:
+                _elements[idx] = parent
+                idx = parent_idx
+            else:
+                break
+        _elements[idx] = _entry
+        if _contar is not None:
+            _contar_swim(_contar, "heap", _inicio, idx)
+    except Exception as exp:
+        err("heap", "_swim_key()", exp)
+
+
+def _sink_key(heap: dict, idx: int) -> None:
+    try:
+        _elements = heap["elements"]["elements"]
+        _size = heap["size"]
+        if idx >= _size:
+            return
+        _entry = _elements[idx]
+        _inicio = idx
+        j = 2 * idx + 1
+        while j < _size:
+            if j + 1 < _size and _elements[j + 1] < _elements[j]:
+                j += 1
+            if not _elements[j] < _entry:
+                break
+            _elements[idx] = _elements[j]
+            idx = j
+            j = 2 * idx + 1
+        _elements[idx] = _entry
+        if _contar is not None:
+            _contar_sink(_contar, "heap", _inicio, idx, _size)
+    except Exception as exp:
+        err("heap", "_sink_key()", exp)
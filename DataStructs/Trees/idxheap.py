@@ -0,0 +1,428 @@
+"""
+Module to handle an indexed priority queue (idxheap) data structure.
+
+The heap keeps a map from each element key to its position in the array, so an element can be located, updated or removed in O(log n) without rebuilding the heap.
+
+This code is based on the implementation proposed by the following authors/books:
+    #. Algorithms, 4th Edition, Robert Sedgewick and Kevin Wayne.
+    #. Data Structure and Algorithms in Python, M.T. Goodrich, R. Tamassia, M.H. Goldwasser.
+"""
+import heapq
+from typing import Any, Callable
+from DataStructs.List import arlt
+from DataStructs.Trees import heap as hp
+from DataStructs.Trees.heap import dflt_heap_elm_cmp
+from Utils.error import error_handler as err
+
+
+def new_idx_heap(cmp_function: Callable[[Any, Any], int] = None,
+                 key: Callable[[Any], Any] = None) -> dict:
+    try:
+        # con key, cada elemento se guarda como (key(elm), seq, elm), igual
+        # que en heap.new_heap(key=...)
+        _new_heap = {
+            "elements": arlt.new_list(cmp_function),
+            "keys": arlt.new_list(),
+            "index": {},
+            "size": 0,
+            "cmp_function": cmp_function or dflt_heap_elm_cmp,
+            "key": key,
+            "seq": 0
+        }
+        return _new_heap
+    except Exception as exp:
+        err("idxheap", "new_idx_heap()", exp)
+
+
+def heapify(pairs: Any,
+            cmp_function: Callable[[Any, Any], int] = None,
+            key: Callable[[Any], Any] = None) -> dict:
+    try:
+        _heap = new_idx_heap(cmp_function, key)
+        insert_all(_heap, pairs)
+        return _heap
+    except Exception as exp:
+        err("idxheap", "heapify()", exp)
+
+
+def size(heap: dict) -> int:
+    try:
+        return heap["size"]
+    except Exception as exp:
+        err("idxheap", "size()", exp)
+
+
+def is_empty(heap: dict) -> bool:
+    try:
+        return heap["size"] == 0
+    except Exception as exp:
+        err("idxheap", "is_empty()", exp)
+
+
+def contains_key(heap: dict, key: Any) -> bool:
+    try:
+        return key in heap["index"]
+    except Exception as exp:
+        err("idxheap", "contains_key()", exp)
+
+
+def get(heap: dict, key: Any) -> Any:
+    try:
+        pos = heap["index"].get(key)
+        if pos is None:
+            return None
+        return _unwrap(heap, arlt.get_element(heap["elements"], pos))
+    except Exception as exp:
+        err("idxheap", "get()", exp)
+
+
+def get_min(heap: dict) -> Any:
+    try:
+        if is_empty(heap):
+            return None
+        return _unwrap(heap, arlt.get_element(heap["elements"], 0))
+    except Exception as exp:
+        err("idxheap", "get_min()", exp)
+
+
+def get_min_key(heap: dict) -> Any:
+    try:
+        if is_empty(heap):
+            return None
+        return arlt.get_element(heap["keys"], 0)
+    except Exception as exp:
+        err("idxheap", "get_min_key()", exp)
+
+
+def insert(heap: dict, key: Any, elm: Any) -> None:
+    try:
+        if key in heap["index"]:
+            raise KeyError(f"Key {key} already in the heap")
+        arlt.add_last(heap["elements"], _wrap(heap, elm))
+        arlt.add_last(heap["keys"], key)
+        heap["size"] = arlt.size(heap["elements"])
+        heap["index"][key] = heap["size"] - 1
+        _swim(heap, heap["size"] - 1)
+    except Exception as exp:
+        err("idxheap", "insert()", exp)
+
+
+def insert_all(heap: dict, pairs: Any) -> None:
+    try:
+        _pairs = list(pairs)
+        _size = heap["size"]
+        # si el lote es pequeño frente al heap conviene insertar uno a uno,
+        # si no se agregan todos al final y se reconstruye en O(n)
+        if _size > 0 and len(_pairs) * 2 < _size:
+            for key, elm in _pairs:
+                insert(heap, key, elm)
+            return
+        _index = heap["index"]
+        _new_keys = set()
+        for key, elm in _pairs:
+            if key in _index or key in _new_keys:
+                raise KeyError(f"Key {key} already in the heap")
+            _new_keys.add(key)
+        _start = heap["size"]
+        heap["elements"]["elements"].extend(_wrap(heap, elm) for key, elm in _pairs)
+        heap["keys"]["elements"].extend(key for key, elm in _pairs)
+        heap["elements"]["size"] = len(heap["elements"]["elements"])
+        heap["keys"]["size"] = len(heap["keys"]["elements"])
+        for pos, (key, elm) in enumerate(_pairs, _start):
+            _index[key] = pos
+        heap["size"] = arlt.size(heap["elements"])
+        _build(heap)
+    except Exception as exp:
+        err("idxheap", "insert_all()", exp)
+
+
+def update_key(heap: dict, key: Any, elm: Any = None) -> None:
+    try:
+        pos = heap["index"].get(key)
+        if pos is None:
+            raise KeyError(f"Key {key} not in the heap")
+        # si no llega un elemento nuevo, el actual cambió su prioridad
+        if heap["key"] is not None:
+            _entry = arlt.get_element(heap["elements"], pos)
+            if elm is None:
+                elm = _entry[2]
+            # se conserva la secuencia para mantener el orden de desempate
+            arlt.update(heap["elements"], pos, (heap["key"](elm), _entry[1], elm))
+        elif elm is not None:
+            arlt.update(heap["elements"], pos, elm)
+        _swim(heap, pos)
+        _sink(heap, heap["index"][key])
+    except Exception as exp:
+        err("idxheap", "update_key()", exp)
+
+
+def update_keys(heap: dict, keys: Any) -> None:
+    try:
+        _keys = list(keys)
+        _size = heap["size"]
+        # con pocos cambios se reubica cada llave en O(log n), con muchos
+        # resulta más barato reconstruir todo el heap en O(n)
+        if len(_keys) * max(_size.bit_length(), 1) < _size:
+            for key in _keys:
+                update_key(heap, key)
+            return
+        _index = heap["index"]
+        for key in _keys:
+            if key not in _index:
+                raise KeyError(f"Key {key} not in the heap")
+        if heap["key"] is not None:
+            _elements = heap["elements"]["elements"]
+            for key in _keys:
+                pos = _index[key]
+                _entry = _elements[pos]
+                _elements[pos] = (heap["key"](_entry[2]), _entry[1], _entry[2])
+        _build(heap)
+    except Exception as exp:
+        err("idxheap", "update_keys()", exp)
+
+
+def remove_key(heap: dict, key: Any) -> Any:
+    try:
+        pos = heap["index"].get(key)
+        if pos is None:
+            return None
+        _elm = _unwrap(heap, arlt.get_element(heap["elements"], pos))
+        _last = heap["size"] - 1
+        if pos != _last:
+            _exchange(heap, pos, _last)
+        arlt.remove_last(heap["elements"])
+        arlt.remove_last(heap["keys"])
+        del heap["index"][key]
+        heap["size"] = arlt.size(heap["elements"])
+        if pos < heap["size"]:
+            _swim(heap, pos)
+            _sink(heap, pos)
+        return _elm
+    except Exception as exp:
+        err("idxheap", "remove_key()", exp)
+
+
+def delete_min(heap: dict) -> Any:
+    try:
+        if is_empty(heap):
+            return None
+        return remove_key(heap, arlt.get_element(heap["keys"], 0))
+    except Exception as exp:
+        err("idxheap", "delete_min()", exp)
+
+
+def top_k(heap: dict, k: int) -> list:
+    try:
+        # el arreglo tiene la misma forma que en heap, se reutiliza su recorrido
+        return hp.top_k(heap, k)
+    except Exception as exp:
+        err("idxheap", "top_k()", exp)
+
+
+def dump(heap: dict) -> tuple:
+    try:
+        # copia del arreglo interno en orden de heap: (llaves, entradas, seq);
+        # en modo key las entradas son las tuplas (key(elm), seq, elm)
+        return (list(heap["keys"]["elements"]),
+                list(heap["elements"]["elements"]),
+                heap["seq"])
+    except Exception as exp:
+        err("idxheap", "dump()", exp)
+
+
+def copy(heap: dict) -> dict:
+    try:
+        # heap nuevo con copias de los arreglos y del índice; los elementos
+        # (y en modo key sus tuplas) se comparten, no se copian
+        _copy = dict(heap)
+        _copy["elements"] = dict(heap["elements"], elements=list(heap["elements"]["elements"]))
+        _copy["keys"] = dict(heap["keys"], elements=list(heap["keys"]["elements"]))
+        _copy["index"] = dict(heap["index"])
+        return _copy
+    except Exception as exp:
+        err("idxheap", "copy()", exp)
+
+
+def restore(heap: dict, keys: list, entries: list, seq: int = 0,
+            ordered: bool = True) -> None:
+    try:
+        # carga un arreglo que ya está en orden de heap (p.ej. desde dump),
+        # sin comparar ni reordenar elementos; con ordered=False las entradas
+        # (p.ej. con llaves recalculadas) se reordenan con una construcción O(n)
+        if len(keys) != len(entries):
+            raise ValueError("keys and entries must have the same length")
+        heap["keys"].update({"elements": list(keys), "size": len(keys)})
+        heap["elements"].update({"elements": list(entries), "size": len(entries)})
+        heap["size"] = len(entries)
+        heap["seq"] = seq
+        if ordered:
+            heap["index"] = {key: pos for pos, key in enumerate(keys)}
+        else:
+            _build(heap)
+        if len(heap["index"]) != len(keys):
+            raise KeyError("Duplicated keys in the heap")
+    except Exception as exp:
+        err("idxheap", "restore()", exp)
+
+
+def iterator(heap: dict) -> object:
+    try:
+        for _elm in arlt.iterator(heap["elements"]):
+            yield _unwrap(heap, _elm)
+    except Exception as exp:
+        err("idxheap", "iterator()", exp)
+
+
+def _build(heap: dict) -> None:
+    try:
+        if heap["key"] is not None:
+            # las entradas (llave, seq, elm) son tuplas con orden total, así
+            # que heapq las ordena en C; las llaves se reubican por su seq
+            _elements = heap["elements"]["elements"]
+            _por_seq = {_entry[1]: _key
+                        for _key, _entry in zip(heap["keys"]["elements"], _elements)}
+            heapq.heapify(_elements)
+            _keys = [_por_seq[_entry[1]] for _entry in _elements]
+            heap["keys"]["elements"][:] = _keys
+            heap["index"] = {_key: pos for pos, _key in enumerate(_keys)}
+            return
+        for idx in range(heap["size"] // 2 - 1, -1, -1):
+            _sink(heap, idx)
+    except Exception as exp:
+        err("idxheap", "_build()", exp)
+
+
+def _swim(heap: dict, idx: int) -> None:
+    try:
+        if heap["key"] is not None:
+            _swim_key(heap, idx)
+            return
+        while idx > 0:
+            parent_idx = (idx - 1) // 2
+            parent = arlt.get_element(heap["elements"], parent_idx)
+            current = arlt.get_element(heap["elements"], idx)
+            if _greater(heap, parent, current):
+                _exchange(heap, idx, parent_idx)
+                idx = parent_idx
+            else:
+                break
+    except Exception as exp:
+        err("idxheap", "_swim()", exp)
+
+
+def _sink(heap: dict, idx: int) -> None:
+    try:
+        if heap["key"] is not None:
+            _sink_key(heap, idx)
+            return
+        _size = heap["size"]
+        while 2 * idx + 1 < _size:
+            j = 2 * idx + 1
+            if j + 1 < _size:
+                left = arlt.get_element(heap["elements"], j)
+                right = arlt.get_element(heap["elements"], j + 1)
+                if _greater(heap, left, right):
+                    j += 1
+            current = arlt.get_element(heap["elements"], idx)
+            child = arlt.get_element(heap["elements"], j)
+            if not _greater(heap, current, child):
+                break
+            _exchange(heap, idx, j)
+            idx = j
+    except Exception as exp:
+        err("idxheap", "_sink()", exp)
+
+
+def _greater(heap: dict, elm1: Any, elm2: Any) -> bool:
+    try:
+        return heap["cmp_function"](elm1, elm2) > 0
+    except Exception as exp:
+        err("idxheap", "_greater()", exp)
+
+
+def _exchange(heap: dict, idx1: int, idx2: int) -> None:
+    try:
+        arlt.exchange(heap["elements"], idx1, idx2)
+        arlt.exchange(heap["keys"], idx1, idx2)
+        heap["index"][arlt.get_element(heap["keys"], idx1)] = idx1
+        heap["index"][arlt.get_element(heap["keys"], idx2)] = idx2
+    except Exception as exp:
+        err("idxheap", "_exchange()", exp)
+
+
+def _wrap(heap: dict, elm: Any) -> Any:
+    if heap["key"] is None:
+        return elm
+    _entry = (heap["key"](elm), heap["seq"], elm)
+    heap["seq"] += 1
+    return _entry
+
+
+def _unwrap(heap: dict, entry: Any) -> Any:
+    if heap["key"] is None or entry is None:
+        return entry
+    return entry[2]
+
+
+# gancho opcional de conteo, igual que heap._contar
+_contar = None
+
+
+# en modo key se recorren directamente las listas internas de los arlt y se
+# compara con tuplas nativas, actualizando el índice de cada llave movida
+def _swim_key(heap: dict, idx: int) -> None:
+    try:
+        _elements = heap["elements"]["elements"]
+        _keys = heap["keys"]["elements"]
+        _index = heap["index"]
+        _entry = _elements[idx]
+        _key = _keys[idx]
+        _inicio = idx
+        while idx > 0:
+            parent_idx = (idx - 1) >> 1
+            parent = _elements[parent_idx]
+            if _entry < parent:
+                _elements[idx] = parent
+                _keys[idx] = _keys[parent_idx]
+                _index[_keys[idx]] = idx
+                idx = parent_idx
+            else:
+                break
+        _elements[idx] = _entry
+        _keys[idx] = _key
+        _index[_key] = idx
+        if _contar is not None:
+            hp._contar_swim(_contar, "idxheap", _inicio, idx)
+    except Exception as exp:
+        err("idxheap", "_swim_key()", exp)
+
+
+def _sink_key(heap: dict, idx: int) -> None:
+    try:
+        _elements = heap["elements"]["elements"]
+        _keys = heap["keys"]["elements"]
+        _index = heap["index"]
+        _size = heap["size"]
+        if idx >= _size:
+            return
+        _entry = _elements[idx]
+        _key = _keys[idx]
+        _inicio = idx
+        j = 2 * idx + 1
+        while j < _size:
+            if j + 1 < _size and _elements[j + 1] < _elements[j]:
+                j += 1
+            if not _elements[j] < _entry:
+                break
+            _elements[idx] = _elements[j]
+            _keys[idx] = _keys[j]
+            _index[_keys[idx]] = idx
+            idx = j
+            j = 2 * idx + 1
+        _elements[idx] = _entry
+        _keys[idx] = _key
+        _index[_key] = idx
+        if _contar is not None:
+            hp._contar_sink(_contar, "idxheap", _inicio, idx, _size)
+    except Exception as exp:
+        err("idxheap", "_sink_key()", exp)
@@ -7,16 +7,20 @@ This code is based on the implementation proposed by the following authors/books
 """
 
 # import python modules
+from functools import cmp_to_key
 from typing import Any, Callable
 
 # import modules for data structures ranges in tree
-from Src.Func.DataStructs.List import sllt
+from DataStructs.List import sllt
 
 # import error handler
-from Src.Func.Utils.error import error_handler as err
+from Utils.error import error_handler as err
 
 # import map entry
-from Src.Func.DataStructs.Trees import trnode as trn
+from DataStructs.Trees import trnode as trn
+
+# import map entry for the entries in range
+from DataStructs.Tables import entry as me
 
 
 def dflt_tree_node_cmp(key1: Any, key2: Any) -> int:
@@ -84,13 +88,109 @@ def insert(tree: dict, k: Any, v: Any) -> dict:
         _cmp = tree["cmp_func"]
         # invocando la funcion recursiva para agregar el nodo al árbol
         _root = _insert(_root, k, v, _cmp)
-        # actualizando la raiz del árbol
-        tree["root"]["color"] = trn.BLACK
+        # actualizando la raiz del árbol, la raiz siempre es negra
+        _root["color"] = trn.BLACK
         tree["root"] = _root
     except Exception as exp:
         err("llrbt", "insert()", exp)
 
 
+def insert_all(tree: dict, pairs: Any) -> None:
+    """insert_all agrega un lote de parejas (llave, valor) al árbol binario balanceado hacia la izquierda (LLRBT). Si el lote es grande frente al árbol, las llaves se ordenan una vez y el árbol se reconstruye en O(n) en vez de insertar una a una.
+
+    Args:
+        tree (dict): diccionario que representa el árbol binario balanceado hacia la izquierda (LLRBT)
+        pairs (Any): iterable de parejas (llave, valor), si una llave se repite queda el último valor
+    """
+    try:
+        _pairs = list(pairs)
+        _root = tree["root"]
+        _n = _size(_root)
+        # si el lote es pequeño frente al árbol conviene insertar uno a uno
+        if _n > 0 and len(_pairs) * 2 < _n:
+            for k, v in _pairs:
+                insert(tree, k, v)
+            return
+        _cmp = tree["cmp_func"]
+        _entries = []
+        _collect(_root, _entries)
+        _entries.extend(_pairs)
+        # el ordenamiento es estable, ante llaves repetidas la última gana
+        if _cmp is dflt_tree_node_cmp:
+            _entries.sort(key=lambda pair: pair[0])
+        else:
+            _entries.sort(key=cmp_to_key(lambda a, b: _cmp(a[0], b[0])))
+        _unique = []
+        for pair in _entries:
+            if _unique and _cmp(_unique[-1][0], pair[0]) == 0:
+                _unique[-1] = pair
+            else:
+                _unique.append(pair)
+        _total = len(_unique)
+        # altura negra de la raíz, floor(log2(n + 1))
+        _black_h = (_total + 1).bit_length() - 1
+        tree["root"] = _build(_unique, 0, _total, _black_h)
+    except Exception as exp:
+        err("llrbt", "insert_all()", exp)
+
+
+def _collect(node: dict, entries: list) -> None:
+    """_collect funcion recursiva que agrega las parejas (llave, valor) del árbol en orden a la lista entries.
+
+    Args:
+        node (dict): nodo actual del árbol
+        entries (list): lista donde se agregan las parejas
+    """
+    if node is not None:
+        _collect(node["left"], entries)
+        entries.append((node["key"], node["value"]))
+        _collect(node["right"], entries)
+
+
+def _build(entries: list, lo: int, hi: int, black_h: int) -> dict:
+    """_build funcion recursiva que construye un árbol binario balanceado hacia la izquierda (LLRBT) con las parejas ordenadas entries[lo:hi] y altura negra black_h, retorna su raíz.
+
+    Cada subárbol equivale a un nodo 2 (un nodo negro) o a un nodo 3 (un nodo negro con un hijo izquierdo rojo) del árbol 2-3, elegido para que todos sus hijos quepan con altura negra black_h - 1.
+
+    Args:
+        entries (list): lista ordenada de parejas (llave, valor) sin llaves repetidas
+        lo (int): posición inicial del rango, inclusiva
+        hi (int): posición final del rango, exclusiva
+        black_h (int): altura negra del subárbol
+
+    Returns:
+        dict: raíz del subárbol construido, None si el rango está vacío
+    """
+    _n = hi - lo
+    if _n == 0:
+        return None
+    # máximo de nodos de un subárbol hijo, todo con nodos 3
+    _cap = 3 ** (black_h - 1) - 1
+    if _n - 1 <= 2 * _cap:
+        # nodo 2, las llaves restantes se reparten en dos hijos
+        _mid = lo + (_n - 1) // 2
+        k, v = entries[_mid]
+        node = trn.new_rbt_node(k, v, _n, trn.BLACK)
+        node["left"] = _build(entries, lo, _mid, black_h - 1)
+        node["right"] = _build(entries, _mid + 1, hi, black_h - 1)
+        return node
+    # nodo 3, las llaves restantes se reparten en tres hijos
+    _rest = _n - 2
+    _a = _rest // 3
+    _b = (_rest - _a) // 2
+    _red_pos = lo + _a
+    _black_pos = _red_pos + _b + 1
+    k, v = entries[_red_pos]
+    _red = trn.new_rbt_node(k, v, _a + _b + 1, trn.RED)
+    _red["left"] = _build(entries, lo, _red_pos, black_h - 1)
+    _red["right"] = _build(entries, _red_pos + 1, _black_pos, black_h - 1)
+    k, v = entries[_black_pos]
+    node = trn.new_rbt_node(k, v, _n, trn.BLACK)
+    node["left"] = _red
+    node["right"] = _build(entries, _black_pos + 1, hi, black_h - 1)
+    return node
+
+
 def _insert(node: dict, k: Any, v: Any, cmp_func: Callable) -> dict:
     """_insert funcion recursiva que agrega un nuevo nodo al árbol binario balanceado hacia la izquierda (LLRBT) y lo retorna.
 
@@ -205,6 +305,9 @@ def remove(tree: dict, k: Any) -> dict:
     try:
         _root = tree["root"]
         _cmp = tree["cmp_func"]
+        # caso base, si la llave no existe no hay nada que eliminar
+        if not _contains(_root, k, _cmp, False):
+            return tree
         # caso base, si el hijo izquierdo y derecho NO son rojos
         if not _is_red(_root["left"]) and not _is_red(_root["right"]):
             # cambiar el color del padre a rojo
@@ -244,8 +347,9 @@ def _remove(node: dict, k: Any, cmp_func: Callable) -> dict:
         else:
             # caso base, si el nodo izquierdo es rojo
             if _is_red(node["left"]):
-                # rotar a la derecha
+                # rotar a la derecha, el nodo actual cambia y se compara de nuevo
                 node = _rotate_right(node)
+                _cmp = cmp_func(k, node["key"])
             # caso base, si el nodo es igual a la llave y no hay un nodo derecho
             if _cmp == 0 and node["right"] is None:
                 # eliminar el nodo
@@ -254,6 +358,7 @@ def _remove(node: dict, k: Any, cmp_func: Callable) -> dict:
             if not _is_red(node["right"]) and not _is_red(node["right"]["left"]):
                 # invertir colores a la derecha
                 node = _move_red_right(node)
+                _cmp = cmp_func(k, node["key"])
             # caso base, si el nodo es igual a la llave y el hijo der es None
             if _cmp == 0:
                 # eliminar el nodo
@@ -400,7 +505,7 @@ def _min(node: dict) -> dict:
     try:
         __min__ = node
         if node is not None:
-            if node["left"] is not None:
+            if node["left"] is None:
                 __min__ = node
             else:
                 __min__ = _min(node["left"])
@@ -495,7 +600,7 @@ def _max(node: dict) -> dict:
     try:
         __max__ = None
         if node is not None:
-            if node["right"] is not None:
+            if node["right"] is None:
                 __max__ = node
             else:
                 __max__ = _max(node["right"])
@@ -797,7 +902,8 @@ def _height(node: dict) -> int:
         else:
             left_h = _height(node["left"])
             right_h = _height(node["right"])
-            return max(left_h, right_h) + 1
+            # el max() nativo, este módulo define su propio max(tree)
+            return left_h + 1 if left_h > right_h else right_h + 1
     except Exception as exp:
         err("llrbt", "_height()", exp)
 
@@ -840,8 +946,18 @@ def _range(node: dict,
     Returns:
         dict: _description_
     """
-    # TODO check the if statement for infinite loops
     try:
+        # recorrido en orden que solo baja a los subárboles que pueden tener
+        # llaves dentro del rango
+        if node is not None:
+            _cmp_low = cmp_func(low, node["key"])
+            _cmp_high = cmp_func(high, node["key"])
+            if _cmp_low < 0:
+                _range(node["left"], low, high, cmp_func, lt_range)
+            if _cmp_low <= 0 and _cmp_high >= 0:
+                sllt.add_last(lt_range, node)
+            if _cmp_high > 0:
+                _range(node["right"], low, high, cmp_func, lt_range)
         return lt_range
     except Exception as exp:
         err("llrbt", "_range()", exp)
@@ -884,8 +1000,16 @@ def _keys(node: dict,
     Returns:
         dict: lista con las llaves del árbol binario balanceado hacia la izquierda (LLRBT) que están dentro del rango [low, high]
     """
-    # TODO check if i generate an in-order traversal of the tree
     try:
+        if node is not None:
+            _cmp_low = cmp_func(low, node["key"])
+            _cmp_high = cmp_func(high, node["key"])
+            if _cmp_low < 0:
+                _keys(node["left"], low, high, cmp_func, keys_lt)
+            if _cmp_low <= 0 and _cmp_high >= 0:
+                sllt.add_last(keys_lt, node["key"])
+            if _cmp_high > 0:
+                _keys(node["right"], low, high, cmp_func, keys_lt)
         return keys_lt
     except Exception as exp:
         err("llrbt", "_keys()", exp)
@@ -928,8 +1052,16 @@ def _values(node: dict,
     Returns:
         dict: lista con los valores del árbol binario balanceado hacia la izquierda (LLRBT) que están dentro del rango [low, high]
     """
-    # TODO check if i generate an in-order traversal of the tree
     try:
+        if node is not None:
+            _cmp_low = cmp_func(low, node["key"])
+            _cmp_high = cmp_func(high, node["key"])
+            if _cmp_low < 0:
+                _values(node["left"], low, high, cmp_func, values_lt)
+            if _cmp_low <= 0 and _cmp_high >= 0:
+                sllt.add_last(values_lt, node["value"])
+            if _cmp_high > 0:
+                _values(node["right"], low, high, cmp_func, values_lt)
         return values_lt
     except Exception as exp:
         err("llrbt", "_values()", exp)
@@ -972,9 +1104,16 @@ def _entries(node: dict,
     Returns:
         dict: lista con los nodos del árbol binario balanceado hacia la izquierda (LLRBT) que están dentro del rango [low, high]
     """
-    # TODO check if i generate an in-order traversal of the tree
     try:
-
+        if node is not None:
+            _cmp_low = cmp_func(low, node["key"])
+            _cmp_high = cmp_func(high, node["key"])
+            if _cmp_low < 0:
+                _entries(node["left"], low, high, cmp_func, entries_lt)
+            if _cmp_low <= 0 and _cmp_high >= 0:
+                sllt.add_last(entries_lt, me.new_map_entry(node["key"], node["value"]))
+            if _cmp_high > 0:
+                _entries(node["right"], low, high, cmp_func, entries_lt)
         return entries_lt
     except Exception as exp:
         err("llrbt", "_entries()", exp)
@@ -1146,7 +1285,7 @@ def _balance(node: dict) -> dict:
             node = _rotate_right(node)
         # si el hijo izquierdo es rojo y el hijo derecho es rojo, cambiar el color del nodo
         if _is_red(node["left"]) and _is_red(node["right"]):
-            __flip_colors_node(node)
+            _flip_colors_node(node)
         # actualizar el tamaño del nodo
         _left_n = _size(node["left"])
         _right_n = _size(node["right"])
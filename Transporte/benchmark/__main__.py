@@ -0,0 +1,43 @@
+"""
+Punto de entrada del benchmark: python -m Transporte.benchmark --tamanos 1000 10000 100000 --salida resultados.json
+"""
+# native python modules
+import argparse
+import json
+import sys
+
+# custom modules
+from Transporte.benchmark.corrida import ejecutar, comparar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Transporte.benchmark",
+                                     description="Benchmark de las operaciones del sistema de transporte")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="número de rutas de cada red (1e3 a 1e6)")
+    parser.add_argument("--ops", type=int, default=10000,
+                        help="operaciones medidas por tipo")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--columnar", action="store_true",
+                        help="usar SistemaTransporteColumnar")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args.tamanos, args.ops, args.semilla, args.columnar)
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto)
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            anterior = json.load(archivo)
+        for rutas, operacion, razon in comparar(resultado, anterior):
+            print(f"{rutas:>8} {operacion:<28} x{razon:.2f}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
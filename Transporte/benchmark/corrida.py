@@ -0,0 +1,128 @@
+"""
+Módulo que mide las operaciones críticas del sistema de transporte sobre redes sintéticas.
+
+Cada tamaño de red se mide en un proceso hijo nuevo para que el pico de memoria (ru_maxrss) corresponda solo a esa red. Por operación se reporta el número de operaciones, operaciones por segundo y las latencias p50/p99 en microsegundos.
+"""
+# native python modules
+import os
+import platform
+import random
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+
+# custom modules
+from Transporte.benchmark.generadores import generar_red, generar_eventos
+from Transporte.sistema import SistemaTransporte, SistemaTransporteColumnar, CAMBIOS_POR_EVENTO, cambios_evento
+
+
+def _percentil(ordenados, fraccion):
+    return ordenados[int(fraccion * (len(ordenados) - 1))]
+
+
+def _resumen(operacion, tiempos_ns):
+    ordenados = sorted(tiempos_ns)
+    total = sum(ordenados)
+    return {
+        "operacion": operacion,
+        "ops": len(ordenados),
+        "ops_por_segundo": len(ordenados) / (total / 1e9) if total else None,
+        "p50_us": _percentil(ordenados, 0.50) / 1e3 if ordenados else None,
+        "p99_us": _percentil(ordenados, 0.99) / 1e3 if ordenados else None,
+    }
+
+
+def _medir(operacion, llamadas):
+    # llamadas: iterable de funciones sin argumentos, una por operación
+    reloj = time.perf_counter_ns
+    tiempos = []
+    for llamada in llamadas:
+        inicio = reloj()
+        llamada()
+        tiempos.append(reloj() - inicio)
+    return _resumen(operacion, tiempos)
+
+
+def medir_red(n_rutas, n_ops=10000, semilla=0, columnar=False):
+    clase = SistemaTransporteColumnar if columnar else SistemaTransporte
+    rng = random.Random(semilla + 1)
+    rutas = generar_red(n_rutas, semilla)
+    eventos = generar_eventos(n_rutas, max(1, n_ops // 10), semilla + 2)
+    sistema = clase()
+    operaciones = []
+
+    # carga masiva de la red, salvo las rutas que se agregan una a una
+    n_sueltas = min(n_ops, max(1, n_rutas // 10))
+    inicio = time.perf_counter()
+    sistema.agregar_rutas(rutas[:-n_sueltas])
+    segundos = time.perf_counter() - inicio
+    n_carga = n_rutas - n_sueltas
+    # es una sola llamada, no hay distribución de latencias por operación
+    operaciones.append({"operacion": "agregar_rutas", "ops": n_carga,
+                        "ops_por_segundo": n_carga / segundos if segundos else None,
+                        "p50_us": None, "p99_us": None})
+
+    operaciones.append(_medir("agregar_ruta", (
+        (lambda r=ruta: sistema.agregar_ruta(r)) for ruta in rutas[-n_sueltas:])))
+
+    operaciones.append(_medir("actualizar_ruta", (
+        (lambda i=rng.randrange(n_rutas), v=rng.randrange(0, 30):
+         sistema.actualizar_ruta(i, retraso_acumulado=v))
+        for _ in range(n_ops))))
+
+    operaciones.append(_medir("simular_evento_trafico", (
+        (lambda i=rng.randrange(n_rutas), v=rng.randint(1, 10):
+         sistema.simular_evento_trafico(i, v))
+        for _ in range(n_ops))))
+
+    # eventos mixtos (hora pico, accidentes, refuerzos...) aplicados como lote
+    operaciones.append(_medir("eventos_mixtos", (
+        (lambda t=tipo, c=cambios: sistema.aplicar_lote(
+            cambios_evento(sistema, CAMBIOS_POR_EVENTO[t], c)))
+        for tipo, cambios in eventos)))
+
+    operaciones.append(_medir("generar_plan_optimizacion", (
+        sistema.generar_plan_optimizacion for _ in range(max(1, n_ops // 10)))))
+
+    operaciones.append(_medir("procesar_ruta_critica", (
+        sistema.procesar_ruta_critica for _ in range(min(n_ops, n_rutas)))))
+
+    # ru_maxrss está en KB en Linux
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"rutas": n_rutas, "pico_memoria_mb": round(pico, 1), "operaciones": operaciones}
+
+
+def ejecutar(tamanos, n_ops=10000, semilla=0, columnar=False):
+    redes = []
+    ctx = multiprocessing.get_context("fork")
+    for n_rutas in tamanos:
+        # un proceso por red para aislar el pico de memoria
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ejecutor:
+            redes.append(ejecutor.submit(medir_red, n_rutas, n_ops, semilla, columnar).result())
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "maquina": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "procesador": platform.processor(),
+            "cpus": os.cpu_count(),
+        },
+        "parametros": {"tamanos": list(tamanos), "n_ops": n_ops,
+                       "semilla": semilla, "columnar": columnar},
+        "redes": redes,
+    }
+
+
+def comparar(actual, anterior):
+    # razón de operaciones por segundo (actual / anterior) por red y operación
+    previas = {(red["rutas"], op["operacion"]): op["ops_por_segundo"]
+               for red in anterior["redes"] for op in red["operaciones"]}
+    filas = []
+    for red in actual["redes"]:
+        for op in red["operaciones"]:
+            previo = previas.get((red["rutas"], op["operacion"]))
+            if previo and op["ops_por_segundo"]:
+                filas.append((red["rutas"], op["operacion"], op["ops_por_segundo"] / previo))
+    return filas
@@ -0,0 +1,76 @@
+"""
+Módulo con generadores sembrados (seeded) de redes y cargas de eventos sintéticas para medir el sistema de transporte.
+
+Con la misma semilla se obtienen siempre las mismas rutas y los mismos eventos, de modo que las corridas en la misma máquina son comparables.
+"""
+# native python modules
+import random
+from datetime import datetime
+
+# custom modules
+from Transporte.sistema import Ruta
+
+
+# terminales base para armar los orígenes y destinos de las rutas
+# :data: TERMINALES
+TERMINALES: tuple = (
+    "Terminal Norte", "Terminal Sur", "Terminal Este", "Terminal Oeste",
+    "Centro", "Plaza Central", "Aeropuerto", "Universidad",
+    "Centro Comercial", "Barrio Norte", "Parque Industrial", "Estadio",
+)
+"""
+Tupla con los nombres base de las terminales de la red sintética.
+"""
+
+# peso de cada tipo de evento en la carga mixta
+# :data: MEZCLA_EVENTOS
+MEZCLA_EVENTOS: dict = {
+    "hora pico": 0.15,
+    "accidente": 0.35,
+    "refuerzo": 0.2,
+    "congestión": 0.2,
+    "conectividad": 0.1,
+}
+"""
+Diccionario con la proporción de cada tipo de evento en la carga mixta.
+"""
+
+
+def generar_red(n_rutas, semilla=0, n_terminales=None):
+    # las terminales crecen con la red para que cada una tenga pocas rutas
+    rng = random.Random(semilla)
+    n_terminales = n_terminales or max(len(TERMINALES), n_rutas // 20)
+    terminales = [f"{TERMINALES[i % len(TERMINALES)]} {i // len(TERMINALES)}"
+                  for i in range(n_terminales)]
+    ahora = datetime.now()
+    rutas = []
+    for i in range(n_rutas):
+        origen, destino = rng.sample(terminales, 2)
+        rutas.append(Ruta(i, f"Línea {i}", origen, destino,
+                          round(rng.random(), 3), rng.randrange(0, 20),
+                          round(rng.random(), 3), rng.randrange(0, 10), ahora))
+    return rutas
+
+
+def generar_eventos(n_rutas, n_eventos, semilla=0, mezcla=None):
+    # eventos (tipo, [(id_ruta, valor)]) compatibles con CAMBIOS_POR_EVENTO
+    rng = random.Random(semilla)
+    mezcla = mezcla or MEZCLA_EVENTOS
+    tipos = list(mezcla)
+    pesos = list(mezcla.values())
+    eventos = []
+    for tipo in rng.choices(tipos, weights=pesos, k=n_eventos):
+        if tipo == "hora pico":
+            # la hora pico toca alrededor del 1% de la red
+            afectadas = rng.sample(range(n_rutas), max(1, n_rutas // 100))
+            cambios = [(id_ruta, round(rng.uniform(0.7, 1.0), 3)) for id_ruta in afectadas]
+        elif tipo in ("accidente", "congestión"):
+            afectadas = rng.sample(range(n_rutas), min(n_rutas, rng.randint(1, 3)))
+            cambios = [(id_ruta, rng.randint(1, 15)) for id_ruta in afectadas]
+        elif tipo == "refuerzo":
+            afectadas = rng.sample(range(n_rutas), min(n_rutas, rng.randint(1, 5)))
+            cambios = [(id_ruta, rng.randint(1, 5)) for id_ruta in afectadas]
+        else:
+            cambios = [(rng.randrange(n_rutas), round(rng.random(), 3))]
+        eventos.append((tipo, cambios))
+    return eventos
@@ -0,0 +1,227 @@
+"""
+Módulo con el almacenamiento columnar (estructura de arreglos) de las rutas del sistema de transporte.
+
+Cada campo numérico de las rutas vive en un arreglo contiguo de NumPy indexado por el slot de la ruta, de modo que la prioridad de toda la red se calcula con una sola expresión vectorizada y las rutas críticas se obtienen con argpartition.
+
+*IMPORTANTE:* NumPy es una dependencia opcional, solo se requiere al crear un almacenamiento columnar.
+"""
+# native python modules
+from collections.abc import Mapping
+from datetime import datetime
+
+# custom modules
+from Transporte.prioridad import prioridad_ruta
+
+# optional modules
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# columnas numéricas de las rutas y su tipo de dato en los arreglos
+# :data: COLUMNAS
+COLUMNAS: dict = {
+    "densidad_pasajeros": "float64",
+    "retraso_acumulado": "int64",
+    "importancia_conexion": "float64",
+    "recursos_disponibles": "int64",
+}
+"""
+Diccionario con los campos numéricos de las rutas que se guardan en arreglos y su tipo de dato en NumPy.
+"""
+
+# columnas de texto de las rutas, se guardan en listas de Python
+# :data: TEXTOS
+TEXTOS: tuple = ("nombre", "origen", "destino")
+"""
+Tupla con los campos de texto de las rutas que se guardan en listas nativas.
+"""
+
+
+class AlmacenColumnar:
+    def __init__(self, factores, capacidad=1024):
+        if np is None:
+            raise ImportError("AlmacenColumnar requiere numpy instalado")
+        # factores (demanda, retraso, conectividad, recursos) de la prioridad
+        self.factores = factores
+        self.capacidad = max(int(capacidad), 1)
+        self.size = 0
+        self.slots = {}
+        self.ids = np.zeros(self.capacidad, dtype="int64")
+        self.columnas = {campo: np.zeros(self.capacidad, dtype=tipo)
+                         for campo, tipo in COLUMNAS.items()}
+        self.prioridad = np.zeros(self.capacidad, dtype="float64")
+        self.actualizacion = np.zeros(self.capacidad, dtype="float64")
+        # activa equivale a "está en el heap de rutas críticas"
+        self.activa = np.zeros(self.capacidad, dtype=bool)
+        self.textos = {campo: [] for campo in TEXTOS}
+
+    def copiar(self):
+        # copia independiente: los arreglos se copian en bloque y las listas
+        # de texto comparten sus cadenas
+        copia = object.__new__(AlmacenColumnar)
+        copia.factores = self.factores
+        copia.capacidad = self.capacidad
+        copia.size = self.size
+        copia.slots = dict(self.slots)
+        copia.ids = self.ids.copy()
+        copia.columnas = {campo: arreglo.copy() for campo, arreglo in self.columnas.items()}
+        copia.prioridad = self.prioridad.copy()
+        copia.actualizacion = self.actualizacion.copy()
+        copia.activa = self.activa.copy()
+        copia.textos = {campo: list(valores) for campo, valores in self.textos.items()}
+        return copia
+
+    def _crecer(self, minimo):
+        capacidad = self.capacidad
+        while capacidad < minimo:
+            capacidad *= 2
+        if capacidad == self.capacidad:
+            return
+        for campo, arreglo in self.columnas.items():
+            self.columnas[campo] = self._ampliar(arreglo, capacidad)
+        self.ids = self._ampliar(self.ids, capacidad)
+        self.prioridad = self._ampliar(self.prioridad, capacidad)
+        self.actualizacion = self._ampliar(self.actualizacion, capacidad)
+        self.activa = self._ampliar(self.activa, capacidad)
+        self.capacidad = capacidad
+
+    def _ampliar(self, arreglo, capacidad):
+        nuevo = np.zeros(capacidad, dtype=arreglo.dtype)
+        nuevo[:self.size] = arreglo[:self.size]
+        return nuevo
+
+    def agregar_lote(self, rutas):
+        # las rutas existentes se sobrescriben en su slot, las nuevas se
+        # agregan al final y todo se escribe columna por columna
+        rutas = list(rutas)
+        slots = []
+        nuevas = {}
+        for ruta in rutas:
+            slot = self.slots.get(ruta.id, nuevas.get(ruta.id))
+            if slot is None:
+                slot = self.size + len(nuevas)
+                nuevas[ruta.id] = slot
+            slots.append(slot)
+        self._crecer(self.size + len(nuevas))
+        for campo in TEXTOS:
+            self.textos[campo].extend([None] * len(nuevas))
+        self.size += len(nuevas)
+        self.slots.update(nuevas)
+        if not slots:
+            return
+        idx = np.asarray(slots, dtype="int64")
+        self.ids[idx] = [ruta.id for ruta in rutas]
+        for campo, arreglo in self.columnas.items():
+            arreglo[idx] = [getattr(ruta, campo) for ruta in rutas]
+        self.actualizacion[idx] = [ruta.ultima_actualizacion.timestamp()
+                                   for ruta in rutas]
+        for campo in TEXTOS:
+            valores = self.textos[campo]
+            for slot, ruta in zip(slots, rutas):
+                valores[slot] = getattr(ruta, campo)
+        self.activa[idx] = True
+        self.recalcular(idx)
+
+    def recalcular(self, idx=None):
+        # una sola expresión vectorizada sobre todas las rutas (o un subconjunto)
+        if idx is None:
+            idx = slice(0, self.size)
+        c = self.columnas
+        self.prioridad[idx] = prioridad_ruta(self.factores, c["densidad_pasajeros"][idx],
+                                             c["retraso_acumulado"][idx],
+                                             c["importancia_conexion"][idx],
+                                             c["recursos_disponibles"][idx])
+
+    def leer(self, slot, campo):
+        if campo in self.columnas:
+            return self.columnas[campo][slot].item()
+        elif campo in self.textos:
+            return self.textos[campo][slot]
+        elif campo == "id":
+            return self.ids[slot].item()
+        elif campo == "ultima_actualizacion":
+            return datetime.fromtimestamp(self.actualizacion[slot])
+        raise AttributeError(campo)
+
+    def escribir(self, slot, campo, valor):
+        if campo in self.columnas:
+            self.columnas[campo][slot] = valor
+            c = self.columnas
+            self.prioridad[slot] = prioridad_ruta(self.factores, c["densidad_pasajeros"][slot],
+                                                  c["retraso_acumulado"][slot],
+                                                  c["importancia_conexion"][slot],
+                                                  c["recursos_disponibles"][slot])
+        elif campo in self.textos:
+            self.textos[campo][slot] = valor
+        elif campo == "ultima_actualizacion":
+            self.actualizacion[slot] = valor.timestamp()
+        else:
+            raise AttributeError(campo)
+
+    def escribir_lote(self, columnas):
+        # columnas: {campo: {slot: valor}}, sin recalcular la prioridad
+        for campo, valores in columnas.items():
+            idx = np.fromiter(valores.keys(), dtype="int64", count=len(valores))
+            self.columnas[campo][idx] = list(valores.values())
+
+    def mas_critica(self):
+        if not self.activa[:self.size].any():
+            return None
+        prioridad = np.where(self.activa[:self.size],
+                             self.prioridad[:self.size], -np.inf)
+        return int(np.argmax(prioridad))
+
+    def top_k(self, k):
+        # argpartition deja las k mayores al frente en O(n) y solo esas se ordenan
+        activos = np.flatnonzero(self.activa[:self.size])
+        if k <= 0 or activos.size == 0:
+            return []
+        prioridad = -self.prioridad[activos]
+        if k < activos.size:
+            elegidos = np.argpartition(prioridad, k - 1)[:k]
+        else:
+            elegidos = np.arange(activos.size)
+        orden = elegidos[np.argsort(prioridad[elegidos], kind="stable")]
+        return activos[orden].tolist()
+
+
+class RutaColumnar:
+    # Vista de una ruta dentro del almacenamiento, con los mismos atributos
+    # que Ruta; leer o asignar un campo accede directamente a los arreglos
+    __slots__ = ("_almacen", "_slot")
+
+    def __init__(self, almacen, slot):
+        object.__setattr__(self, "_almacen", almacen)
+        object.__setattr__(self, "_slot", slot)
+
+    def __getattr__(self, nombre):
+        return self._almacen.leer(self._slot, nombre)
+
+    def __setattr__(self, nombre, valor):
+        self._almacen.escribir(self._slot, nombre, valor)
+
+    def __repr__(self):
+        return f"RutaColumnar(id={self.id}, nombre={self.nombre!r})"
+
+    def calcular_prioridad(self):
+        return self._almacen.prioridad[self._slot].item()
+
+
+class VistaRutas(Mapping):
+    # Diccionario de solo lectura id -> RutaColumnar, reemplaza a SistemaTransporte.rutas
+    def __init__(self, almacen):
+        self._almacen = almacen
+
+    def __getitem__(self, id_ruta):
+        return RutaColumnar(self._almacen, self._almacen.slots[id_ruta])
+
+    def __contains__(self, id_ruta):
+        return id_ruta in self._almacen.slots
+
+    def __iter__(self):
+        return iter(self._almacen.slots)
+
+    def __len__(self):
+        return self._almacen.size
@@ -0,0 +1,103 @@
+"""
+Módulo para comparar escenarios hipotéticos ("qué pasa si") sobre el sistema de transporte sin modificarlo.
+
+Un escenario es una pareja (nombre, cambios) con cambios [(id_ruta, campo, valor)] como los de aplicar_lote. Cada escenario se evalúa sobre un fork() copy-on-write del sistema base: solo se copian las rutas que el escenario modifica, nunca toda la red. El resultado de cada escenario es su plan de las k rutas más críticas y la prioridad agregada de toda la red, calculada a partir de la del sistema base más la diferencia de las rutas modificadas.
+
+Los escenarios se reparten en lotes entre procesos creados con fork: cada proceso hereda el sistema base del padre (las páginas de memoria se comparten hasta que se escriben) y solo viajan entre procesos los escenarios y sus resultados.
+"""
+# native python modules
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+# vehículos que se suman a una ruta al aumentar su frecuencia
+# :data: VEHICULOS_REFUERZO
+VEHICULOS_REFUERZO: int = 2
+"""
+Cantidad de vehículos que agrega la acción "Aumentar frecuencia de vehículos" a cada ruta.
+"""
+
+# fracción del retraso que queda al implementar una ruta express
+# :data: RETRASO_EXPRESS
+RETRASO_EXPRESS: float = 0.5
+"""
+Fracción del retraso acumulado que conserva una ruta con la acción "Implementar ruta express".
+"""
+
+# efecto supuesto de cada acción del plan sobre una ruta: ruta -> [(campo, valor)]
+# :data: EFECTOS_ACCION
+EFECTOS_ACCION: dict = {
+    "Aumentar frecuencia de vehículos":
+        lambda ruta: [("recursos_disponibles", ruta.recursos_disponibles + VEHICULOS_REFUERZO)],
+    "Implementar ruta express":
+        lambda ruta: [("retraso_acumulado", int(ruta.retraso_acumulado * RETRASO_EXPRESS))],
+    "Priorizar sincronización de conexiones":
+        lambda ruta: [("retraso_acumulado", max(ruta.retraso_acumulado - 5, 0))],
+    "Monitoreo continuo":
+        lambda ruta: [],
+}
+"""
+Diccionario con el efecto que se supone tiene cada acción de optimización sobre los campos de una ruta; se puede reemplazar o ampliar con otras hipótesis.
+"""
+
+
+def escenario_accion(sistema, accion, ids, nombre=None):
+    # escenario que aplica la misma acción a varias rutas del sistema
+    efecto = EFECTOS_ACCION[accion]
+    cambios = []
+    for id_ruta in ids:
+        if id_ruta in sistema.rutas:
+            cambios.extend((id_ruta, campo, valor)
+                           for campo, valor in efecto(sistema.rutas[id_ruta]))
+    return (nombre or accion, cambios)
+
+
+def evaluar(sistema, escenario, k=5, total=None):
+    # aplica el escenario a un fork del sistema y resume el resultado
+    nombre, cambios = escenario
+    if total is None:
+        total = sistema.prioridad_total()
+    ids = {id_ruta for id_ruta, _, _ in cambios if id_ruta in sistema.rutas}
+    antes = sum(sistema.rutas[id_ruta].calcular_prioridad() for id_ruta in ids)
+    copia = sistema.fork()
+    copia.aplicar_lote(cambios)
+    despues = sum(copia.rutas[id_ruta].calcular_prioridad() for id_ruta in ids)
+    plan = [(ruta.id, ruta.nombre, accion, ruta.calcular_prioridad())
+            for ruta, accion in copia.generar_plan_optimizacion(k)]
+    return {"nombre": nombre, "rutas_modificadas": len(ids), "plan": plan,
+            "prioridad_total": total - antes + despues,
+            "diferencia_prioridad": despues - antes}
+
+
+# sistema base y parámetros de cada proceso, los fija _inicializar
+_BASE = {}
+
+
+def _inicializar(sistema, k, total):
+    _BASE.update(sistema=sistema, k=k, total=total)
+
+
+def _evaluar_lote(escenarios):
+    return [evaluar(_BASE["sistema"], escenario, _BASE["k"], _BASE["total"])
+            for escenario in escenarios]
+
+
+def evaluar_escenarios(sistema, escenarios, k=5, procesos=None, por_lote=None):
+    # retorna un resultado por escenario, en el mismo orden; con procesos=0
+    # se evalúan en este proceso
+    escenarios = list(escenarios)
+    total = sistema.prioridad_total()
+    if procesos == 0 or len(escenarios) <= 1:
+        return [evaluar(sistema, escenario, k, total) for escenario in escenarios]
+    procesos = procesos or os.cpu_count() or 1
+    # unos pocos lotes por proceso reparten la carga sin pagar un viaje
+    # entre procesos por escenario
+    por_lote = por_lote or max(1, -(-len(escenarios) // (procesos * 4)))
+    lotes = [escenarios[i:i + por_lote] for i in range(0, len(escenarios), por_lote)]
+    ctx = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=ctx,
+                             initializer=_inicializar,
+                             initargs=(sistema, k, total)) as ejecutor:
+        return [resultado for lote in ejecutor.map(_evaluar_lote, lotes)
+                for resultado in lote]
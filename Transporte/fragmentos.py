@@ -0,0 +1,188 @@
+"""
+Módulo con el modo fragmentado (sharded) del sistema de transporte.
+
+Las rutas se reparten por id entre N procesos trabajadores y cada uno tiene su propio SistemaTransporte (diccionario de rutas y heap). Un coordinador envía cada cambio al fragmento dueño de la ruta y responde las consultas globales (ruta más crítica y plan de optimización) mezclando los tops de cada fragmento con un heap.
+
+Los mensajes a un fragmento viajan por un Pipe y se procesan en orden, por eso las actualizaciones se envían sin esperar respuesta y las consultas ven todos los cambios enviados antes.
+
+Un error en un fragmento no lo detiene: si la operación espera respuesta la excepción vuelve al coordinador y se lanza ahí; si no, el fragmento la anota y errores() la informa.
+"""
+# native python modules
+import multiprocessing
+import os
+
+# custom modules
+from DataStructs.Trees.heap import new_heap, insert, delete_min, is_empty
+from Transporte.sistema import SistemaTransporte
+
+
+def _trabajador(conexion):
+    # cada mensaje es (operación, args, kwargs, responder); cada respuesta
+    # es (ok, resultado o excepción)
+    sistema = SistemaTransporte()
+    # errores de las operaciones sin respuesta, (operación, mensaje)
+    errores = []
+    while True:
+        operacion, args, kwargs, responder = conexion.recv()
+        if operacion == "cerrar":
+            break
+        try:
+            if operacion == "sincronizar":
+                resultado = True
+            elif operacion == "errores":
+                resultado, errores = errores, []
+            else:
+                resultado = getattr(sistema, operacion)(*args, **kwargs)
+        except Exception as exp:
+            if not responder:
+                errores.append((operacion, f"{type(exp).__name__}: {exp}"))
+                continue
+            try:
+                conexion.send((False, exp))
+            except Exception:
+                # la excepción no se puede serializar
+                conexion.send((False, RuntimeError(f"{type(exp).__name__}: {exp}")))
+            continue
+        if responder:
+            conexion.send((True, resultado))
+    conexion.close()
+
+
+def _recibir(conexiones):
+    # lee la respuesta de cada conexión y, si alguna es un error, lo lanza
+    # después de leerlas todas para no desfasar los pipes
+    respuestas = [conexion.recv() for conexion in conexiones]
+    for ok, resultado in respuestas:
+        if not ok:
+            raise resultado
+    return [resultado for _, resultado in respuestas]
+
+
+def _prioridad_negada(item):
+    # item = (ruta, accion, fragmento, posicion)
+    return -item[0].calcular_prioridad()
+
+
+class SistemaFragmentado:
+    def __init__(self, fragmentos=None, contexto="fork"):
+        self.n_fragmentos = fragmentos or os.cpu_count() or 1
+        ctx = multiprocessing.get_context(contexto)
+        self._conexiones = []
+        self._procesos = []
+        self._ids = set()
+        for _ in range(self.n_fragmentos):
+            padre, hijo = ctx.Pipe()
+            proceso = ctx.Process(target=_trabajador, args=(hijo,), daemon=True)
+            proceso.start()
+            hijo.close()
+            self._conexiones.append(padre)
+            self._procesos.append(proceso)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def fragmento(self, id_ruta):
+        return hash(id_ruta) % self.n_fragmentos
+
+    def _enviar(self, fragmento, operacion, *args, **kwargs):
+        self._conexiones[fragmento].send((operacion, args, kwargs, False))
+
+    def _consultar_todos(self, operacion, *args):
+        # primero se envía a todos para que respondan en paralelo
+        for conexion in self._conexiones:
+            conexion.send((operacion, args, {}, True))
+        return _recibir(self._conexiones)
+
+    def _repartir(self, elementos, id_de):
+        partes = [[] for _ in range(self.n_fragmentos)]
+        for elemento in elementos:
+            partes[self.fragmento(id_de(elemento))].append(elemento)
+        return partes
+
+    def agregar_ruta(self, ruta):
+        self._ids.add(ruta.id)
+        self._enviar(self.fragmento(ruta.id), "agregar_ruta", ruta)
+
+    def agregar_rutas(self, lote):
+        lote = list(lote)
+        self._ids.update(ruta.id for ruta in lote)
+        for fragmento, parte in enumerate(self._repartir(lote, lambda r: r.id)):
+            if parte:
+                self._enviar(fragmento, "agregar_rutas", parte)
+
+    def actualizar_ruta(self, id_ruta, **kwargs):
+        if id_ruta not in self._ids:
+            return False
+        self._enviar(self.fragmento(id_ruta), "actualizar_ruta", id_ruta, **kwargs)
+        return True
+
+    def aplicar_lote(self, cambios):
+        cambios = [c for c in cambios if c[0] in self._ids]
+        for fragmento, parte in enumerate(self._repartir(cambios, lambda c: c[0])):
+            if parte:
+                self._enviar(fragmento, "aplicar_lote", parte)
+        return len({c[0] for c in cambios})
+
+    def simular_evento_trafico(self, id_ruta, retraso_adicional):
+        if id_ruta not in self._ids:
+            return False
+        self._enviar(self.fragmento(id_ruta), "simular_evento_trafico",
+                     id_ruta, retraso_adicional)
+        return True
+
+    def obtener_ruta_mas_critica(self):
+        candidatas = [r for r in self._consultar_todos("obtener_ruta_mas_critica")
+                      if r is not None]
+        if not candidatas:
+            return None
+        return max(candidatas, key=lambda r: r.calcular_prioridad())
+
+    def procesar_ruta_critica(self):
+        ruta = self.obtener_ruta_mas_critica()
+        if ruta is None:
+            return None
+        conexion = self._conexiones[self.fragmento(ruta.id)]
+        conexion.send(("procesar_ruta_critica", (), {}, True))
+        return _recibir([conexion])[0]
+
+    def generar_plan_optimizacion(self, k=5):
+        # mezcla k-way de los planes de cada fragmento, que ya vienen
+        # ordenados de mayor a menor prioridad
+        planes = self._consultar_todos("generar_plan_optimizacion", k)
+        frontera = new_heap(key=_prioridad_negada)
+        for fragmento, plan in enumerate(planes):
+            if plan:
+                ruta, accion = plan[0]
+                insert(frontera, (ruta, accion, fragmento, 0))
+        resultado = []
+        while len(resultado) < k and not is_empty(frontera):
+            ruta, accion, fragmento, pos = delete_min(frontera)
+            resultado.append((ruta, accion))
+            if pos + 1 < len(planes[fragmento]):
+                siguiente, accion = planes[fragmento][pos + 1]
+                insert(frontera, (siguiente, accion, fragmento, pos + 1))
+        return resultado
+
+    def sincronizar(self):
+        # espera a que todos los fragmentos terminen los cambios pendientes
+        self._consultar_todos("sincronizar")
+
+    def errores(self):
+        # [(fragmento, operación, mensaje)] de las operaciones enviadas sin
+        # esperar respuesta que fallaron desde la última llamada
+        return [(fragmento, operacion, mensaje)
+                for fragmento, errores in enumerate(self._consultar_todos("errores"))
+                for operacion, mensaje in errores]
+
+    def cerrar(self):
+        for conexion, proceso in zip(self._conexiones, self._procesos):
+            if proceso.is_alive():
+                conexion.send(("cerrar", (), {}, False))
+        for conexion, proceso in zip(self._conexiones, self._procesos):
+            proceso.join()
+            conexion.close()
+        self._conexiones = []
+        self._procesos = []
@@ -0,0 +1,136 @@
+"""
+Módulo con los índices secundarios de las rutas del sistema de transporte por origen, destino y terminal.
+
+Cada índice es una tabla de hash con encadenamiento separado del proyecto (DataStructs/Tables/scht.py) que asocia cada terminal a un heap indexado (DataStructs/Trees/idxheap.py) con las rutas de esa terminal ordenadas por prioridad. Así la ruta más crítica de una terminal se obtiene en O(1) y cada cambio de una ruta se refleja en O(log n) en los heaps de sus terminales.
+"""
+# custom modules
+from DataStructs.Tables import scht
+from DataStructs.Trees.idxheap import new_idx_heap, insert, insert_all, update_key, remove_key, contains_key
+from DataStructs.Trees.idxheap import get_min, is_empty, size, top_k, iterator
+from Utils.memoria import pausar_gc
+
+
+# tipos de índice disponibles y los extremos de la ruta que usa cada uno
+# :data: TIPOS_INDICE
+TIPOS_INDICE: dict = {
+    "origen": (0,),
+    "destino": (1,),
+    "terminal": (0, 1),
+}
+"""
+Diccionario con los tipos de índice y las posiciones de (origen, destino) que los alimentan; "terminal" agrupa las rutas que salen o llegan a cada terminal.
+"""
+
+
+class IndicesRutas:
+    def __init__(self, clave):
+        # clave(ruta) es la llave de prioridad de los heaps (la misma del
+        # heap de rutas críticas del sistema)
+        self.clave = clave
+        self.indices = {tipo: scht.new_chaining_mp() for tipo in TIPOS_INDICE}
+        # id de la ruta -> (origen, destino) con el que está indexada
+        self.extremos = {}
+        # id de la ruta -> heaps que la contienen, evita buscar en las tablas
+        # de hash en cada actualización
+        self._ubicacion = {}
+
+    def _heap(self, tipo, terminal, crear=False):
+        entrada = scht.get(self.indices[tipo], terminal)
+        if entrada is not None:
+            return entrada["value"]
+        if not crear:
+            return None
+        heap = new_idx_heap(key=self.clave)
+        scht.put(self.indices[tipo], terminal, heap)
+        return heap
+
+    def _heaps_de(self, extremos, crear):
+        # heaps en los que aparece una ruta con esos extremos, sin repetir
+        # cuando origen y destino son la misma terminal
+        heaps = []
+        for tipo, posiciones in TIPOS_INDICE.items():
+            for terminal in {extremos[pos] for pos in posiciones}:
+                heaps.append(self._heap(tipo, terminal, crear))
+        return heaps
+
+    def agregar(self, ruta):
+        if ruta.id in self.extremos:
+            self.quitar(ruta.id)
+        extremos = (ruta.origen, ruta.destino)
+        self.extremos[ruta.id] = extremos
+        heaps = self._heaps_de(extremos, crear=True)
+        self._ubicacion[ruta.id] = heaps
+        for heap in heaps:
+            insert(heap, ruta.id, ruta)
+
+    def agregar_lote(self, rutas):
+        # las rutas se agrupan por heap y cada grupo entra con insert_all,
+        # que reconstruye el heap en O(n) si el grupo es grande
+        with pausar_gc(rutas):
+            grupos = {}
+            for ruta in rutas:
+                if ruta.id in self.extremos:
+                    self.quitar(ruta.id)
+                extremos = (ruta.origen, ruta.destino)
+                self.extremos[ruta.id] = extremos
+                self._ubicacion[ruta.id] = []
+                for tipo, posiciones in TIPOS_INDICE.items():
+                    for terminal in {extremos[pos] for pos in posiciones}:
+                        grupos.setdefault((tipo, terminal), []).append((ruta.id, ruta))
+            for (tipo, terminal), pares in grupos.items():
+                heap = self._heap(tipo, terminal, crear=True)
+                insert_all(heap, pares)
+                for id_ruta, _ in pares:
+                    self._ubicacion[id_ruta].append(heap)
+
+    def quitar(self, id_ruta):
+        extremos = self.extremos.pop(id_ruta, None)
+        if extremos is None:
+            return False
+        del self._ubicacion[id_ruta]
+        for tipo, posiciones in TIPOS_INDICE.items():
+            for terminal in {extremos[pos] for pos in posiciones}:
+                heap = self._heap(tipo, terminal)
+                remove_key(heap, id_ruta)
+                if is_empty(heap):
+                    scht.remove(self.indices[tipo], terminal)
+        return True
+
+    def actualizar(self, rutas):
+        # rutas: {id: ruta} modificadas; si cambió un extremo la ruta se
+        # mueve de heap, si no solo se reubica en los heaps que ya ocupa
+        for id_ruta, ruta in rutas.items():
+            extremos = self.extremos.get(id_ruta)
+            if extremos != (ruta.origen, ruta.destino):
+                self.agregar(ruta)
+                continue
+            for heap in self._ubicacion[id_ruta]:
+                update_key(heap, id_ruta, ruta)
+
+    def mas_critica(self, terminal, tipo="terminal"):
+        heap = self._heap(tipo, terminal)
+        if heap is None:
+            return None
+        return get_min(heap)
+
+    def criticas(self, terminal, k, tipo="terminal"):
+        heap = self._heap(tipo, terminal)
+        if heap is None:
+            return []
+        return top_k(heap, k)
+
+    def rutas(self, terminal, tipo="terminal"):
+        heap = self._heap(tipo, terminal)
+        if heap is None:
+            return []
+        return list(iterator(heap))
+
+    def contar(self, terminal, tipo="terminal"):
+        heap = self._heap(tipo, terminal)
+        if heap is None:
+            return 0
+        return size(heap)
+
+    def contiene(self, id_ruta, terminal, tipo="terminal"):
+        heap = self._heap(tipo, terminal)
+        return heap is not None and contains_key(heap, id_ruta)
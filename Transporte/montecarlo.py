@@ -0,0 +1,260 @@
+"""
+Módulo con la simulación Monte Carlo de días operativos del sistema de transporte.
+
+Cada día se arma a partir de su semilla: la demanda del día, las horas pico, los accidentes, la congestión y los refuerzos se sortean con un generador random.Random(semilla), así el mismo día se reproduce siempre igual sin importar en qué proceso o en qué lote se simule. Los días se ejecutan con el Simulador de eventos discretos (Transporte/simulacion.py) sobre un fork() copy-on-write de un sistema base que se carga una sola vez por proceso.
+
+De cada día se guardan, solo para las rutas en que cambian, los minutos que cada ruta pasó como la más crítica y su prioridad máxima; las rutas que el día no tocó conservan la prioridad base, por eso las distribuciones se reconstruyen a partir de esos valores más el total de días.
+
+Los días se reparten en lotes de semillas consecutivas entre procesos creados con fork, que heredan el sistema base del padre.
+"""
+# native python modules
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# custom modules
+from Transporte.sistema import SistemaTransporte, SistemaTransporteColumnar, CAMBIOS_POR_EVENTO, cambios_evento
+from Transporte.simulacion import Simulador
+from Transporte.benchmark.generadores import generar_red
+
+
+# duración del día simulado en minutos
+# :data: MINUTOS_DIA
+MINUTOS_DIA: int = 24 * 60
+"""
+Minutos de un día operativo, el reloj del simulador va de 0 a MINUTOS_DIA.
+"""
+
+# parámetros por defecto de los días sorteados
+# :data: PARAMETROS_DIA
+PARAMETROS_DIA: dict = {
+    # factor de demanda del día ~ normal(media, desvío), escala la densidad en hora pico
+    "demanda_media": 1.0,
+    "demanda_desvio": 0.15,
+    # horas pico (minuto medio, desvío en minutos) y fracción de rutas que tocan
+    "horas_pico": ((8 * 60, 20), (17 * 60 + 30, 25)),
+    "fraccion_hora_pico": 0.05,
+    # la densidad baja a esta fracción de la base a partir de la noche
+    "inicio_noche": 21 * 60,
+    "densidad_noche": 0.5,
+    # accidentes y congestión como procesos de Poisson (eventos por hora)
+    "accidentes_por_hora": 0.5,
+    "retraso_accidente": (5, 20),
+    "congestion_por_hora": 2.0,
+    "retraso_congestion": (1, 8),
+    # probabilidad de reforzar una ruta tras un accidente y demora en minutos
+    "probabilidad_refuerzo": 0.6,
+    "demora_refuerzo": (15, 45),
+    "vehiculos_refuerzo": (1, 3),
+}
+"""
+Diccionario con los parámetros con que se sortea cada día; simular_dias() acepta otro diccionario con los que se quieran cambiar.
+"""
+
+
+def _poisson(rng, por_hora, factor=1.0):
+    # minutos de un proceso de Poisson con por_hora eventos por hora
+    tasa = por_hora * factor / 60.0
+    minutos = []
+    if tasa <= 0:
+        return minutos
+    t = rng.expovariate(tasa)
+    while t < MINUTOS_DIA:
+        minutos.append(t)
+        t += rng.expovariate(tasa)
+    return minutos
+
+
+def generar_dia(rutas, ids, rng, parametros=None):
+    # eventos [(minuto, tipo, [(id_ruta, valor)])] de un día, compatibles
+    # con CAMBIOS_POR_EVENTO; rutas: {id: ruta} con el estado base
+    p = dict(PARAMETROS_DIA, **(parametros or {}))
+    demanda = max(0.0, rng.gauss(p["demanda_media"], p["demanda_desvio"]))
+    n_pico = max(1, int(len(ids) * p["fraccion_hora_pico"]))
+    eventos = []
+    afectadas = set()
+    for media, desvio in p["horas_pico"]:
+        minuto = min(max(rng.gauss(media, desvio), 0.0), MINUTOS_DIA - 1)
+        muestra = rng.sample(ids, n_pico)
+        afectadas.update(muestra)
+        eventos.append((minuto, "hora pico",
+                        [(id_ruta, round(min(1.0, rng.uniform(0.7, 1.0) * demanda), 3))
+                         for id_ruta in muestra]))
+    if afectadas:
+        eventos.append((float(p["inicio_noche"]), "desaceleración",
+                        [(id_ruta, round(rutas[id_ruta].densidad_pasajeros * p["densidad_noche"], 3))
+                         for id_ruta in sorted(afectadas)]))
+    for minuto in _poisson(rng, p["accidentes_por_hora"]):
+        id_ruta = rng.choice(ids)
+        eventos.append((minuto, "accidente", [(id_ruta, rng.randint(*p["retraso_accidente"]))]))
+        if rng.random() < p["probabilidad_refuerzo"]:
+            llegada = minuto + rng.uniform(*p["demora_refuerzo"])
+            if llegada < MINUTOS_DIA:
+                eventos.append((llegada, "refuerzo", [(id_ruta, rng.randint(*p["vehiculos_refuerzo"]))]))
+    # la congestión crece con la demanda del día
+    for minuto in _poisson(rng, p["congestion_por_hora"], demanda):
+        muestra = rng.sample(ids, min(len(ids), rng.randint(1, 3)))
+        eventos.append((minuto, "congestión",
+                        [(id_ruta, rng.randint(*p["retraso_congestion"])) for id_ruta in muestra]))
+    eventos.sort(key=lambda evento: evento[0])
+    return eventos
+
+
+def simular_dia(base, semilla, parametros=None, ids=None, prioridades=None):
+    # simula el día de la semilla sobre un fork de base; retorna
+    # ({id: minutos como la más crítica}, {id: prioridad máxima}) solo con
+    # las rutas que fueron críticas o superaron su prioridad base
+    ids = ids if ids is not None else sorted(base.rutas)
+    if prioridades is None:
+        prioridades = {id_ruta: ruta.calcular_prioridad() for id_ruta, ruta in base.rutas.items()}
+    rng = random.Random(semilla)
+    eventos = generar_dia(base.rutas, ids, rng, parametros)
+
+    sistema = base.fork()
+    simulador = Simulador()
+    sistema.reloj = simulador.fecha
+    minutos = {}
+    picos = {}
+    critica = sistema.obtener_ruta_mas_critica()
+    actual = [critica.id if critica is not None else None, 0.0]
+
+    def observar(tiempo):
+        ruta = sistema.obtener_ruta_mas_critica()
+        nueva = ruta.id if ruta is not None else None
+        if nueva != actual[0]:
+            if actual[0] is not None and tiempo > actual[1]:
+                minutos[actual[0]] = minutos.get(actual[0], 0.0) + tiempo - actual[1]
+            actual[0] = nueva
+            actual[1] = tiempo
+
+    def manejador(cambio):
+        def manejar(simulador, cambios):
+            sistema.aplicar_lote(cambios_evento(sistema, cambio, cambios))
+            for id_ruta, _ in cambios:
+                prioridad = sistema.rutas[id_ruta].calcular_prioridad()
+                if prioridad > picos.get(id_ruta, prioridades[id_ruta]):
+                    picos[id_ruta] = prioridad
+            observar(simulador.reloj)
+        return manejar
+
+    for tipo, cambio in CAMBIOS_POR_EVENTO.items():
+        simulador.registrar(tipo, manejador(cambio))
+    for minuto, tipo, cambios in eventos:
+        simulador.programar(minuto, tipo, cambios)
+    simulador.ejecutar(hasta=MINUTOS_DIA)
+    # el día se cierra como si la ruta crítica cambiara a medianoche
+    if actual[0] is not None:
+        minutos[actual[0]] = minutos.get(actual[0], 0.0) + MINUTOS_DIA - actual[1]
+    # corta el ciclo fork -> simulador -> manejadores -> fork para que el
+    # fork se libere al salir y la base deje de copiar al escribir
+    sistema.reloj = base.reloj
+    return minutos, picos
+
+
+def distribucion(valores, n, base=0.0, percentiles=(0.5, 0.95)):
+    # resumen de n muestras de las que solo se guardaron los valores
+    # distintos de base (todos mayores que base); las n - len(valores)
+    # restantes valen base
+    ordenados = sorted(valores)
+    ceros = n - len(ordenados)
+    resumen = {"n": len(ordenados), "media": (base * ceros + sum(ordenados)) / n if n else None,
+               "max": ordenados[-1] if ordenados else base}
+    for fraccion in percentiles:
+        posicion = int(fraccion * (n - 1))
+        resumen[f"p{round(fraccion * 100)}"] = base if posicion < ceros else ordenados[posicion - ceros]
+    return resumen
+
+
+# sistema base de cada proceso, lo fija _inicializar
+_BASE = {}
+
+
+def _inicializar(sistema, parametros):
+    _BASE.update(sistema=sistema, parametros=parametros, ids=sorted(sistema.rutas),
+                 prioridades={id_ruta: ruta.calcular_prioridad()
+                              for id_ruta, ruta in sistema.rutas.items()})
+
+
+def _simular_lote(semillas):
+    return [simular_dia(_BASE["sistema"], semilla, _BASE["parametros"],
+                        _BASE["ids"], _BASE["prioridades"])
+            for semilla in semillas]
+
+
+def simular_dias(sistema, n_dias, semilla=0, parametros=None, procesos=None,
+                 por_lote=None, percentiles=(0.5, 0.95)):
+    # simula los días con semillas semilla, semilla + 1, ...; con procesos=0
+    # corren en este proceso. El sistema no se modifica, cada día es un fork
+    if n_dias < 1:
+        raise ValueError(f"Se necesita al menos un día: {n_dias}")
+    semillas = range(semilla, semilla + n_dias)
+    inicio = time.perf_counter()
+    if procesos == 0:
+        _inicializar(sistema, parametros)
+        try:
+            dias = _simular_lote(semillas)
+        finally:
+            _BASE.clear()
+    else:
+        procesos = procesos or os.cpu_count() or 1
+        # lotes de semillas consecutivas, unos pocos por proceso; los
+        # resultados vuelven en el orden de las semillas
+        por_lote = por_lote or max(1, -(-n_dias // (procesos * 4)))
+        lotes = [semillas[i:i + por_lote] for i in range(0, n_dias, por_lote)]
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=ctx,
+                                 initializer=_inicializar,
+                                 initargs=(sistema, parametros)) as ejecutor:
+            dias = [dia for lote in ejecutor.map(_simular_lote, lotes) for dia in lote]
+    segundos = time.perf_counter() - inicio
+
+    minutos = {}
+    picos = {}
+    for minutos_dia, picos_dia in dias:
+        for id_ruta, valor in minutos_dia.items():
+            minutos.setdefault(id_ruta, []).append(valor)
+        for id_ruta, valor in picos_dia.items():
+            picos.setdefault(id_ruta, []).append(valor)
+    return {"dias": n_dias, "semillas": [semilla, semilla + n_dias - 1],
+            "segundos": segundos, "dias_por_segundo": n_dias / segundos if segundos else None,
+            "minutos_critica": {id_ruta: distribucion(valores, n_dias, 0.0, percentiles)
+                                for id_ruta, valores in sorted(minutos.items())},
+            "pico": {id_ruta: distribucion(valores, n_dias,
+                                           sistema.rutas[id_ruta].calcular_prioridad(), percentiles)
+                     for id_ruta, valores in sorted(picos.items())}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Transporte.montecarlo",
+                                     description="Simulación Monte Carlo de días operativos")
+    parser.add_argument("--rutas", type=int, default=1000, help="rutas de la red sintética")
+    parser.add_argument("--dias", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=0, help="semilla del primer día y de la red")
+    parser.add_argument("--procesos", type=int, default=None, help="0 para no usar procesos")
+    parser.add_argument("--por-lote", type=int, default=None, help="días por lote")
+    parser.add_argument("--columnar", action="store_true", help="usar SistemaTransporteColumnar")
+    parser.add_argument("--top", type=int, default=10,
+                        help="rutas con más minutos como la más crítica en la salida")
+    args = parser.parse_args(argv)
+    if args.dias < 1:
+        parser.error("--dias debe ser al menos 1")
+
+    clase = SistemaTransporteColumnar if args.columnar else SistemaTransporte
+    sistema = clase()
+    sistema.agregar_rutas(generar_red(args.rutas, args.semilla))
+    resultado = simular_dias(sistema, args.dias, args.semilla, procesos=args.procesos,
+                             por_lote=args.por_lote)
+    criticas = sorted(resultado["minutos_critica"].items(),
+                      key=lambda item: -item[1]["media"])[:args.top]
+    resultado["minutos_critica"] = dict(criticas)
+    resultado["pico"] = {id_ruta: resultado["pico"][id_ruta]
+                         for id_ruta, _ in criticas if id_ruta in resultado["pico"]}
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Módulo con los índices ordenados de las rutas del sistema de transporte: por prioridad y por hora de la última actualización.
+
+Cada índice es un árbol rojo-negro inclinado a la izquierda con estadísticas de orden del proyecto (DataStructs/Trees/llrbt.py) cuyas llaves son (clave(ruta), id de la ruta), el id desempata las rutas con la misma clave. En el índice de prioridad la clave es la misma del heap de rutas críticas (la prioridad negada), así que el recorrido en orden va de la ruta más crítica a la menos crítica; en el de actualización es la marca de tiempo, de la ruta con datos más viejos a la más reciente. Cada nodo guarda el tamaño de su subárbol, por lo que rank(), select() y los rangos cuestan O(log n + tamaño de la salida).
+"""
+# custom modules
+from DataStructs.List import sllt
+from DataStructs.Trees import llrbt
+from Utils.memoria import pausar_gc
+
+
+class IndiceOrdenado:
+    def __init__(self, clave):
+        # clave(ruta) es el criterio de orden del índice
+        self.clave = clave
+        self.arbol = llrbt.new_tree()
+        # id de la ruta -> llave con la que está en el árbol
+        self.llaves = {}
+
+    def agregar(self, ruta):
+        llave = (self.clave(ruta), ruta.id)
+        anterior = self.llaves.get(ruta.id)
+        if anterior is not None:
+            llrbt.remove(self.arbol, anterior)
+        self.llaves[ruta.id] = llave
+        llrbt.insert(self.arbol, llave, ruta)
+
+    def agregar_lote(self, rutas):
+        # las llaves se ordenan una vez y el árbol se reconstruye en O(n) con
+        # insert_all
+        with pausar_gc(rutas):
+            pares = []
+            for ruta in rutas:
+                llave = (self.clave(ruta), ruta.id)
+                anterior = self.llaves.get(ruta.id)
+                if anterior is not None and anterior != llave:
+                    llrbt.remove(self.arbol, anterior)
+                self.llaves[ruta.id] = llave
+                pares.append((llave, ruta))
+            llrbt.insert_all(self.arbol, pares)
+
+    def quitar(self, id_ruta):
+        llave = self.llaves.pop(id_ruta, None)
+        if llave is None:
+            return False
+        llrbt.remove(self.arbol, llave)
+        return True
+
+    def actualizar(self, rutas):
+        # rutas: {id: ruta} modificadas; solo se mueven las que cambiaron de
+        # clave, cada una con un remove y un insert en O(log n)
+        for id_ruta, ruta in rutas.items():
+            llave = (self.clave(ruta), id_ruta)
+            anterior = self.llaves.get(id_ruta)
+            if anterior == llave:
+                # misma llave: solo se refresca la ruta guardada, que puede
+                # ser otro objeto (p.ej. una copia tras un fork)
+                llrbt.insert(self.arbol, llave, ruta)
+                continue
+            if anterior is not None:
+                llrbt.remove(self.arbol, anterior)
+            self.llaves[id_ruta] = llave
+            llrbt.insert(self.arbol, llave, ruta)
+
+    def __len__(self):
+        return llrbt.size(self.arbol)
+
+    def _entre(self, desde, hasta):
+        # rutas con llave entre desde y hasta (inclusive), en orden
+        if desde > hasta or llrbt.is_empty(self.arbol):
+            return []
+        nodos = llrbt.range(self.arbol, desde, hasta)
+        return [nodo["value"] for nodo in sllt.iterator(nodos)]
+
+    def rank(self, id_ruta):
+        # cantidad de rutas antes de la ruta en el orden del índice
+        llave = self.llaves.get(id_ruta)
+        if llave is None:
+            return None
+        return llrbt.rank(self.arbol, llave)
+
+    def select(self, k):
+        # k-ésima ruta en el orden del índice, empezando en 0
+        if not 0 <= k < llrbt.size(self.arbol):
+            return None
+        return llrbt.select(self.arbol, k)["value"]
+
+
+class IndicePrioridad(IndiceOrdenado):
+    # clave(ruta) es la llave de prioridad del heap de rutas críticas: rank 0
+    # y select(0) corresponden a la ruta más crítica
+
+    def rango(self, minima, maxima):
+        # rutas con minima <= prioridad <= maxima, de la más crítica a la
+        # menos crítica; los ids extremos acotan todo el intervalo de llaves
+        if minima > maxima:
+            return []
+        return self._entre((-maxima, float("-inf")), (-minima, float("inf")))
+
+    def percentil(self, id_ruta):
+        # porcentaje de rutas con prioridad menor o igual a la de la ruta
+        posicion = self.rank(id_ruta)
+        if posicion is None:
+            return None
+        total = llrbt.size(self.arbol)
+        return 100.0 * (total - posicion) / total
+
+    def en_percentil(self, porcentaje):
+        # ruta que ocupa el percentil indicado, 100 es la más crítica
+        total = llrbt.size(self.arbol)
+        if total == 0:
+            return None
+        posicion = round((100.0 - porcentaje) / 100.0 * total)
+        return self.select(min(max(posicion, 0), total - 1))
+
+
+class IndiceActualizacion(IndiceOrdenado):
+    # clave(ruta) es la marca de tiempo de la última actualización: rank 0 y
+    # select(0) corresponden a la ruta con los datos más viejos
+    def __init__(self, clave):
+        super().__init__(clave)
+        # límite de la última llamada a vencidas() y rutas que entraron con
+        # una marca anterior a ese límite, que el rango siguiente no cubre
+        self.limite = None
+        self.tardias = {}
+
+    def agregar(self, ruta):
+        super().agregar(ruta)
+        self._revisar(ruta)
+
+    def agregar_lote(self, rutas):
+        rutas = list(rutas)
+        super().agregar_lote(rutas)
+        if self.limite is not None:
+            for ruta in rutas:
+                self._revisar(ruta)
+
+    def quitar(self, id_ruta):
+        self.tardias.pop(id_ruta, None)
+        return super().quitar(id_ruta)
+
+    def actualizar(self, rutas):
+        super().actualizar(rutas)
+        if self.limite is not None:
+            for ruta in rutas.values():
+                self._revisar(ruta)
+
+    def _revisar(self, ruta):
+        if self.limite is not None:
+            if self.llaves[ruta.id][0] < self.limite:
+                self.tardias[ruta.id] = ruta
+            else:
+                self.tardias.pop(ruta.id, None)
+
+    def anteriores(self, limite, desde=None):
+        # rutas actualizadas por última vez antes de limite (y desde la marca
+        # desde en adelante, si se indica), de la más vieja a la más reciente
+        inicio = (float("-inf"), float("-inf")) if desde is None else (desde, float("-inf"))
+        return self._entre(inicio, (limite, float("-inf")))
+
+    def vencidas(self, limite):
+        # rutas con marca anterior a limite que no se retornaron en una
+        # llamada anterior, de la más vieja a la más reciente; solo se
+        # recorre el rango entre el límite anterior y el nuevo
+        tardias = [ruta for id_ruta, ruta in self.tardias.items()
+                   if self.llaves[id_ruta][0] < limite]
+        for ruta in tardias:
+            del self.tardias[ruta.id]
+        tardias.sort(key=lambda ruta: self.llaves[ruta.id])
+        if self.limite is not None and self.limite >= limite:
+            return tardias
+        desde, self.limite = self.limite, limite
+        return tardias + self.anteriores(limite, desde)
+
+    def mas_antigua(self):
+        return self.select(0)
@@ -0,0 +1,220 @@
+"""
+Módulo con la persistencia del sistema de transporte en una base de datos SQLite local.
+
+Cada cambio de una ruta se anota en memoria (una lista para el diario y un diccionario con las rutas modificadas) y un hilo de fondo los vacía cada *intervalo* segundos en una sola transacción: los cambios entran a la tabla *diario* y las rutas modificadas se escriben en la tabla *rutas* con un upsert por lotes (executemany con sentencias fijas, que sqlite3 prepara una vez y reutiliza). La base usa el modo WAL, así el camino de cada evento nunca espera por el disco.
+
+Con *checkpoint_cada* mayor a 1 el estado de las rutas se escribe solo cada tantos vaciados y entre medio la base tiene el estado del último checkpoint más la cola del diario; al recuperar se cargan las rutas en bloque y se reaplica esa cola.
+"""
+# native python modules
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+
+# campos de la tabla de rutas, en el orden de los campos de Ruta
+# :data: CAMPOS_RUTA
+CAMPOS_RUTA: tuple = ("id", "nombre", "origen", "destino",
+                      "densidad_pasajeros", "retraso_acumulado",
+                      "importancia_conexion", "recursos_disponibles",
+                      "ultima_actualizacion")
+"""
+Tupla con las columnas de la tabla *rutas*, la fecha de actualización se guarda como timestamp.
+"""
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS rutas (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    origen TEXT NOT NULL,
+    destino TEXT NOT NULL,
+    densidad_pasajeros REAL NOT NULL,
+    retraso_acumulado INTEGER NOT NULL,
+    importancia_conexion REAL NOT NULL,
+    recursos_disponibles INTEGER NOT NULL,
+    ultima_actualizacion REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS diario (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id_ruta INTEGER NOT NULL,
+    campo TEXT NOT NULL,
+    valor,
+    marca REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    llave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+_UPSERT_RUTA = (f"INSERT INTO rutas ({', '.join(CAMPOS_RUTA)}) "
+                f"VALUES ({', '.join('?' * len(CAMPOS_RUTA))}) "
+                f"ON CONFLICT(id) DO UPDATE SET "
+                f"{', '.join(f'{campo} = excluded.{campo}' for campo in CAMPOS_RUTA[1:])}")
+_INSERTAR_DIARIO = "INSERT INTO diario (id_ruta, campo, valor, marca) VALUES (?, ?, ?, ?)"
+_GUARDAR_META = "INSERT OR REPLACE INTO meta (llave, valor) VALUES (?, ?)"
+_LEER_META = "SELECT valor FROM meta WHERE llave = ?"
+_LEER_RUTAS = f"SELECT {', '.join(CAMPOS_RUTA)} FROM rutas"
+_LEER_DIARIO = "SELECT seq, id_ruta, campo, valor, marca FROM diario WHERE seq > ? ORDER BY seq"
+_ULTIMO_SEQ = "SELECT COALESCE(MAX(seq), 0) FROM diario"
+
+
+def _fila(ruta):
+    return (ruta.id, ruta.nombre, ruta.origen, ruta.destino,
+            ruta.densidad_pasajeros, ruta.retraso_acumulado,
+            ruta.importancia_conexion, ruta.recursos_disponibles,
+            ruta.ultima_actualizacion.timestamp())
+
+
+def _valor_sql(valor):
+    if isinstance(valor, datetime):
+        return valor.timestamp()
+    return valor
+
+
+def conectar(path):
+    conexion = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    # con WAL, NORMAL solo sincroniza el disco en los checkpoints del WAL
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+
+class PersistenciaSQLite:
+    def __init__(self, path, intervalo=1.0, checkpoint_cada=1):
+        self.path = path
+        self.intervalo = intervalo
+        self.checkpoint_cada = checkpoint_cada
+        self.conexion = conectar(path)
+        # cambios (id, campo, valor, marca), rutas modificadas y rutas
+        # nuevas pendientes; las nuevas no están en el diario y se escriben
+        # en cada vaciado. Los valores del diario son absolutos, reaplicar un
+        # cambio que ya está en la tabla de rutas no altera el resultado
+        self._diario = []
+        self._sucias = {}
+        self._nuevas = {}
+        self._pesos = None
+        self._vaciados = 0
+        # _pendientes protege los buffers y se toma un instante en cada
+        # evento; _disco serializa las transacciones
+        self._pendientes = threading.Lock()
+        self._disco = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.estadisticas = {"vaciados": 0, "cambios": 0, "rutas": 0, "checkpoints": 0}
+
+    # --- camino de cada evento: solo memoria ---
+
+    def registrar_lote(self, cambios, marca, rutas):
+        # cambios: [(id, campo, valor)] de un actualizar_ruta o aplicar_lote;
+        # rutas: {id: ruta}
+        with self._pendientes:
+            self._diario.extend((id_ruta, campo, valor, marca) for id_ruta, campo, valor in cambios)
+            self._sucias.update(rutas)
+
+    def registrar_rutas(self, rutas):
+        # rutas nuevas o reemplazadas, van directo a la tabla de rutas
+        with self._pendientes:
+            for ruta in rutas:
+                self._nuevas[ruta.id] = ruta
+
+    def registrar_pesos(self, factores):
+        with self._pendientes:
+            self._pesos = tuple(factores)
+
+    # --- hilo de fondo ---
+
+    def iniciar(self):
+        if self._hilo is None:
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, name="persistencia", daemon=True)
+            self._hilo.start()
+
+    def _ciclo(self):
+        while not self._detener.wait(self.intervalo):
+            self.vaciar()
+
+    def vaciar(self, checkpoint=None, reiniciar=False):
+        # una transacción con todo lo pendiente; retorna cuántos cambios
+        # del diario se escribieron. Con reiniciar se borran antes las rutas
+        # y el diario guardados
+        with self._disco:
+            self._vaciados += 1
+            if checkpoint is None:
+                checkpoint = self._vaciados % self.checkpoint_cada == 0
+            with self._pendientes:
+                diario, self._diario = self._diario, []
+                pesos, self._pesos = self._pesos, None
+                nuevas, self._nuevas = self._nuevas, {}
+                if checkpoint:
+                    sucias, self._sucias = self._sucias, {}
+                    sucias.update(nuevas)
+                else:
+                    sucias = nuevas
+            if not diario and not sucias and pesos is None and not reiniciar:
+                return 0
+            # las filas se leen de las rutas al vaciar, con su estado más reciente
+            filas = [_fila(ruta) for ruta in sucias.values()]
+            conexion = self.conexion
+            conexion.execute("BEGIN")
+            try:
+                if reiniciar:
+                    conexion.execute("DELETE FROM rutas")
+                    conexion.execute("DELETE FROM diario")
+                conexion.executemany(_INSERTAR_DIARIO,
+                                     [(id_ruta, campo, _valor_sql(valor), _valor_sql(marca))
+                                      for id_ruta, campo, valor, marca in diario])
+                if filas:
+                    conexion.executemany(_UPSERT_RUTA, filas)
+                if pesos is not None:
+                    conexion.execute(_GUARDAR_META, ("pesos", json.dumps(pesos)))
+                if checkpoint:
+                    # el estado de las rutas incluye todo el diario escrito
+                    seq = conexion.execute(_ULTIMO_SEQ).fetchone()[0]
+                    conexion.execute(_GUARDAR_META, ("checkpoint", str(seq)))
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+            self.estadisticas["vaciados"] += 1
+            self.estadisticas["cambios"] += len(diario)
+            self.estadisticas["rutas"] += len(filas)
+            self.estadisticas["checkpoints"] += bool(checkpoint)
+            return len(diario)
+
+    def escribir_todo(self, rutas, factores):
+        # estado completo en una transacción, al empezar a persistir; el
+        # diario anterior ya queda incluido en este estado
+        with self._pendientes:
+            self._diario = []
+            self._sucias = {}
+            self._nuevas = {ruta.id: ruta for ruta in rutas}
+            self._pesos = tuple(factores)
+        self.vaciar(checkpoint=True, reiniciar=True)
+
+    def cerrar(self):
+        if self._hilo is not None:
+            self._detener.set()
+            self._hilo.join()
+            self._hilo = None
+        self.vaciar(checkpoint=True)
+        self.conexion.close()
+
+    # --- recuperación ---
+
+    @staticmethod
+    def leer(path):
+        # retorna (factores o None, filas de rutas, cola del diario) donde la
+        # cola son los cambios posteriores al último checkpoint
+        conexion = conectar(path)
+        try:
+            pesos = conexion.execute(_LEER_META, ("pesos",)).fetchone()
+            checkpoint = conexion.execute(_LEER_META, ("checkpoint",)).fetchone()
+            seq = int(checkpoint[0]) if checkpoint else 0
+            filas = conexion.execute(_LEER_RUTAS).fetchall()
+            cola = conexion.execute(_LEER_DIARIO, (seq,)).fetchall()
+        finally:
+            conexion.close()
+        factores = tuple(json.loads(pesos[0])) if pesos else None
+        return factores, filas, cola
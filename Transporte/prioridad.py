@@ -0,0 +1,14 @@
+"""
+Módulo con la fórmula de prioridad de las rutas del sistema de transporte.
+
+Es la única definición de la fórmula: la usan la caché de cada Ruta, la reconstrucción del heap al cambiar los pesos y el almacenamiento columnar. Solo usa operaciones aritméticas, así que acepta tanto números como arreglos de NumPy (una sola expresión vectorizada sobre muchas rutas).
+"""
+
+
+def prioridad_ruta(factores, densidad, retraso, importancia, recursos):
+    # factores: (demanda, retraso, conectividad, recursos), ver Pesos.factores
+    demanda, factor_retraso, conectividad, factor_recursos = factores
+    return (densidad * demanda) + \
+           (retraso * factor_retraso) + \
+           (importancia * conectividad) - \
+           (recursos * factor_recursos)
@@ -0,0 +1,86 @@
+"""
+Módulo con la red de terminales del sistema de transporte y la propagación de retrasos entre rutas.
+
+Dos rutas son vecinas si comparten una terminal (origen o destino). Un retraso en una ruta se reparte a sus vecinas multiplicado por un factor de decaimiento en cada salto, hasta que el incremento cae por debajo de un mínimo. La propagación es un recorrido por anchura que solo visita la frontera afectada: cada ruta y cada terminal se expanden una sola vez.
+"""
+
+
+class RedTerminales:
+    def __init__(self):
+        # terminal -> ids de las rutas que salen o llegan a ella
+        self.terminales = {}
+        # id de la ruta -> (origen, destino)
+        self.extremos = {}
+
+    def agregar(self, id_ruta, origen, destino):
+        if id_ruta in self.extremos:
+            self.quitar(id_ruta)
+        self.extremos[id_ruta] = (origen, destino)
+        self.terminales.setdefault(origen, set()).add(id_ruta)
+        self.terminales.setdefault(destino, set()).add(id_ruta)
+
+    def agregar_lote(self, rutas):
+        for ruta in rutas:
+            self.agregar(ruta.id, ruta.origen, ruta.destino)
+
+    def quitar(self, id_ruta):
+        extremos = self.extremos.pop(id_ruta, None)
+        if extremos is None:
+            return False
+        for terminal in extremos:
+            rutas = self.terminales.get(terminal)
+            if rutas is not None:
+                rutas.discard(id_ruta)
+                if not rutas:
+                    del self.terminales[terminal]
+        return True
+
+    def mover(self, id_ruta, origen=None, destino=None):
+        # cambia un extremo de la ruta y conserva el otro
+        actual_origen, actual_destino = self.extremos[id_ruta]
+        self.agregar(id_ruta,
+                     actual_origen if origen is None else origen,
+                     actual_destino if destino is None else destino)
+
+    def rutas_en(self, terminal):
+        return self.terminales.get(terminal, set())
+
+    def vecinas(self, id_ruta):
+        vistas = {id_ruta}
+        for terminal in self.extremos.get(id_ruta, ()):
+            for vecina in self.terminales.get(terminal, ()):
+                if vecina not in vistas:
+                    vistas.add(vecina)
+                    yield vecina
+
+    def propagar(self, id_ruta, retraso, factor=0.5, minimo=1, max_saltos=None):
+        # retorna {id: incremento entero} para las vecinas alcanzadas, sin la
+        # ruta de origen; en el salto h el incremento es retraso * factor**h
+        # y la propagación se corta cuando baja de minimo
+        if id_ruta not in self.extremos or not 0 < factor < 1:
+            return {}
+        incrementos = {}
+        visitadas = {id_ruta}
+        expandidas = set()
+        frontera = [id_ruta]
+        valor = retraso
+        saltos = 0
+        while frontera and (max_saltos is None or saltos < max_saltos):
+            valor *= factor
+            saltos += 1
+            incremento = int(valor)
+            if incremento < minimo:
+                break
+            siguiente = []
+            for actual in frontera:
+                for terminal in self.extremos[actual]:
+                    if terminal in expandidas:
+                        continue
+                    expandidas.add(terminal)
+                    for vecina in self.terminales[terminal]:
+                        if vecina not in visitadas:
+                            visitadas.add(vecina)
+                            incrementos[vecina] = incremento
+                            siguiente.append(vecina)
+            frontera = siguiente
+        return incrementos
@@ -0,0 +1,136 @@
+"""
+Módulo con la tabla de decisión que asigna una acción de optimización a cada ruta.
+
+Cada regla es una lista de condiciones (campo, operador, umbral) unidas con "y" más la acción que se recomienda si todas se cumplen. Las reglas se evalúan en orden y gana la primera que se cumple; si ninguna se cumple se usa la acción por defecto. La tabla se compila una vez en dos formas equivalentes: una evaluación escalar para una ruta y una clasificación vectorizada (máscaras de NumPy con np.select) para toda la red.
+
+*IMPORTANTE:* NumPy es una dependencia opcional, solo se requiere para la clasificación vectorizada.
+"""
+# native python modules
+import json
+import operator
+
+# custom modules
+from Transporte.columnar import COLUMNAS
+
+# optional modules
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# operadores permitidos en las condiciones de una regla
+# :data: OPERADORES
+OPERADORES: dict = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+"""
+Diccionario con los operadores de comparación que se pueden usar en las condiciones y su función equivalente, válida tanto para números como para arreglos de NumPy.
+"""
+
+# reglas originales de _determinar_accion_optimizacion
+# :data: REGLAS_POR_DEFECTO
+REGLAS_POR_DEFECTO: tuple = (
+    ((("densidad_pasajeros", ">", 0.8), ("recursos_disponibles", "<", 5)),
+     "Aumentar frecuencia de vehículos"),
+    ((("retraso_acumulado", ">", 10),),
+     "Implementar ruta express"),
+    ((("importancia_conexion", ">", 0.7), ("retraso_acumulado", ">", 5)),
+     "Priorizar sincronización de conexiones"),
+)
+"""
+Tupla con las reglas (condiciones, acción) que usa el sistema de transporte si no se cargan otras.
+"""
+
+# acción cuando ninguna regla se cumple
+# :data: ACCION_POR_DEFECTO
+ACCION_POR_DEFECTO: str = "Monitoreo continuo"
+"""
+Acción que se recomienda cuando ninguna regla de la tabla se cumple.
+"""
+
+
+class TablaDecision:
+    def __init__(self, reglas=REGLAS_POR_DEFECTO, defecto=ACCION_POR_DEFECTO):
+        self.reglas = []
+        for condiciones, accion in reglas:
+            compiladas = []
+            for campo, simbolo, umbral in condiciones:
+                if campo not in COLUMNAS:
+                    raise ValueError(f"Campo no numérico en la regla '{accion}': {campo}")
+                if simbolo not in OPERADORES:
+                    raise ValueError(f"Operador desconocido en la regla '{accion}': {simbolo}")
+                compiladas.append((campo, simbolo, umbral))
+            self.reglas.append((tuple(compiladas), accion))
+        self.defecto = defecto
+        # las acciones se codifican por posición, el defecto va al final
+        self.acciones = [accion for _, accion in self.reglas] + [defecto]
+        # forma escalar: (lector del campo, operador, umbral) por condición
+        self._escalar = [(tuple((operator.attrgetter(campo), OPERADORES[simbolo], umbral)
+                                for campo, simbolo, umbral in condiciones), accion)
+                         for condiciones, accion in self.reglas]
+
+    @classmethod
+    def desde_json(cls, path):
+        # [{"si": [[campo, operador, umbral], ...], "accion": "..."}, ...]
+        # una fila sin "si" define la acción por defecto
+        with open(path, encoding="utf-8") as archivo:
+            filas = json.load(archivo)
+        reglas = []
+        defecto = ACCION_POR_DEFECTO
+        for fila in filas:
+            if fila.get("si"):
+                reglas.append((fila["si"], fila["accion"]))
+            else:
+                defecto = fila["accion"]
+        return cls(reglas, defecto)
+
+    def clasificar(self, ruta):
+        for condiciones, accion in self._escalar:
+            for leer, comparar, umbral in condiciones:
+                if not comparar(leer(ruta), umbral):
+                    break
+            else:
+                return accion
+        return self.defecto
+
+    def clasificar_columnas(self, columnas, n=None):
+        # columnas: {campo: arreglo}; retorna el código (posición en
+        # self.acciones) de la acción de cada fila
+        if np is None:
+            raise ImportError("La clasificación vectorizada requiere numpy instalado")
+        if n is None:
+            n = len(next(iter(columnas.values())))
+        mascaras = []
+        for condiciones, _ in self.reglas:
+            mascara = np.ones(n, dtype=bool)
+            for campo, simbolo, umbral in condiciones:
+                mascara &= OPERADORES[simbolo](columnas[campo][:n], umbral)
+            mascaras.append(mascara)
+        if not mascaras:
+            return np.zeros(n, dtype="int64")
+        codigos = list(range(len(self.reglas)))
+        return np.select(mascaras, codigos, default=len(self.reglas))
+
+    def clasificar_rutas(self, rutas):
+        # pasa una colección de objetos con los campos de Ruta a columnas y
+        # las clasifica en bloque
+        if np is None:
+            raise ImportError("La clasificación vectorizada requiere numpy instalado")
+        rutas = list(rutas)
+        campos = {campo for condiciones, _ in self.reglas for campo, _, _ in condiciones}
+        columnas = {campo: np.fromiter((getattr(ruta, campo) for ruta in rutas),
+                                       dtype=COLUMNAS[campo], count=len(rutas))
+                    for campo in campos}
+        return self.clasificar_columnas(columnas, len(rutas))
+
+    def agrupar(self, ids, codigos):
+        # {acción: arreglo de ids} a partir de los códigos de clasificar_*
+        ids = np.asarray(ids)
+        return {accion: ids[codigos == codigo]
+                for codigo, accion in enumerate(self.acciones)}
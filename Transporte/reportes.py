@@ -0,0 +1,196 @@
+"""
+Módulo con las salidas de reportes del sistema de transporte: planes de optimización y estado de la red.
+
+Cada salida recibe las filas una a una a medida que el iterador del plan o de las rutas las produce y las escribe de inmediato en el archivo, así la memoria no crece con el tamaño del reporte. Hay salidas CSV, JSON Lines y una tabla de texto de ancho fijo; la tabla con formato de *tabulate* necesita todas las filas para calcular los anchos, por eso es la única que las acumula.
+
+*IMPORTANTE:* tabulate es una dependencia opcional, solo se importa si se pide la salida "tabla".
+"""
+# native python modules
+import abc
+import csv
+import json
+import sys
+
+
+# encabezados de los reportes
+# :data: ENCABEZADOS_PLAN
+ENCABEZADOS_PLAN: tuple = ("Ruta", "Acción sugerida", "Prioridad")
+"""
+Tupla con los encabezados del reporte del plan de optimización.
+"""
+
+# :data: ENCABEZADOS_RUTAS
+ENCABEZADOS_RUTAS: tuple = ("id", "nombre", "origen", "destino",
+                            "densidad_pasajeros", "retraso_acumulado",
+                            "importancia_conexion", "recursos_disponibles",
+                            "prioridad")
+"""
+Tupla con los encabezados del reporte del estado de la red, uno por campo de la ruta más su prioridad.
+"""
+
+
+def filas_plan(plan):
+    # plan: iterable de (ruta, acción); la prioridad va completa, las
+    # salidas de texto la muestran con sus decimales
+    for ruta, accion in plan:
+        yield (ruta.nombre, accion, ruta.calcular_prioridad())
+
+
+def filas_rutas(rutas):
+    for ruta in rutas:
+        yield (ruta.id, ruta.nombre, ruta.origen, ruta.destino,
+               ruta.densidad_pasajeros, ruta.retraso_acumulado,
+               ruta.importancia_conexion, ruta.recursos_disponibles,
+               ruta.calcular_prioridad())
+
+
+def filas_almacen(almacen, bloque=4096):
+    # mismas filas que filas_rutas leídas directo de un AlmacenColumnar
+    # (Transporte/columnar.py), de a bloques de filas para no convertir
+    # todas las columnas a la vez
+    for inicio in range(0, almacen.size, bloque):
+        fin = min(inicio + bloque, almacen.size)
+        yield from zip(almacen.ids[inicio:fin].tolist(),
+                       almacen.textos["nombre"][inicio:fin],
+                       almacen.textos["origen"][inicio:fin],
+                       almacen.textos["destino"][inicio:fin],
+                       almacen.columnas["densidad_pasajeros"][inicio:fin].tolist(),
+                       almacen.columnas["retraso_acumulado"][inicio:fin].tolist(),
+                       almacen.columnas["importancia_conexion"][inicio:fin].tolist(),
+                       almacen.columnas["recursos_disponibles"][inicio:fin].tolist(),
+                       almacen.prioridad[inicio:fin].tolist())
+
+
+class Salida(abc.ABC):
+    # Protocolo de una salida: abrir(encabezados), escribir(fila) por cada
+    # fila y cerrar() al final; volcar() hace las tres cosas con un iterador.
+    # Las subclases deben implementar escribir()
+    def __init__(self, archivo=None):
+        self.archivo = archivo if archivo is not None else sys.stdout
+        self.encabezados = ()
+
+    def abrir(self, encabezados):
+        self.encabezados = tuple(encabezados)
+
+    @abc.abstractmethod
+    def escribir(self, fila):
+        pass
+
+    def cerrar(self):
+        pass
+
+    def volcar(self, encabezados, filas):
+        self.abrir(encabezados)
+        n = 0
+        try:
+            for fila in filas:
+                self.escribir(fila)
+                n += 1
+        finally:
+            self.cerrar()
+        return n
+
+
+class SalidaCSV(Salida):
+    def __init__(self, archivo=None, delimitador=","):
+        super().__init__(archivo)
+        self.delimitador = delimitador
+        self._escritor = None
+
+    def abrir(self, encabezados):
+        super().abrir(encabezados)
+        self._escritor = csv.writer(self.archivo, delimiter=self.delimitador,
+                                    lineterminator="\n")
+        self._escritor.writerow(self.encabezados)
+
+    def escribir(self, fila):
+        self._escritor.writerow(fila)
+
+
+class SalidaJSONL(Salida):
+    # un objeto JSON por línea con los encabezados como llaves
+    def __init__(self, archivo=None):
+        super().__init__(archivo)
+        self._codificar = json.JSONEncoder(ensure_ascii=False, default=str).encode
+
+    def escribir(self, fila):
+        self.archivo.write(self._codificar(dict(zip(self.encabezados, fila))))
+        self.archivo.write("\n")
+
+
+class SalidaAnchoFijo(Salida):
+    # tabla de texto compacta con anchos fijos por columna, los textos más
+    # largos se recortan; anchos por defecto de ANCHO_COLUMNA caracteres
+    ANCHO_COLUMNA = 16
+
+    def __init__(self, archivo=None, anchos=None, decimales=2):
+        super().__init__(archivo)
+        self.anchos = anchos
+        self.decimales = decimales
+        self._anchos = ()
+
+    def abrir(self, encabezados):
+        super().abrir(encabezados)
+        anchos = self.anchos or [self.ANCHO_COLUMNA] * len(self.encabezados)
+        self._anchos = tuple(anchos)
+        self.archivo.write(self._linea(self.encabezados))
+        self.archivo.write(" ".join("-" * ancho for ancho in self._anchos) + "\n")
+
+    def escribir(self, fila):
+        self.archivo.write(self._linea(fila))
+
+    def _linea(self, fila):
+        celdas = []
+        for valor, ancho in zip(fila, self._anchos):
+            if isinstance(valor, float):
+                celdas.append(f"{valor:>{ancho}.{self.decimales}f}"[:ancho])
+            elif isinstance(valor, int):
+                celdas.append(f"{valor:>{ancho}}"[:ancho])
+            else:
+                celdas.append(f"{valor!s:<{ancho}}"[:ancho])
+        return " ".join(celdas).rstrip() + "\n"
+
+
+class SalidaTabla(Salida):
+    # tabla con formato de tabulate; acumula las filas hasta cerrar() porque
+    # los anchos dependen de todas ellas
+    def __init__(self, archivo=None, tablefmt="fancy_grid", decimales=2):
+        super().__init__(archivo)
+        self.tablefmt = tablefmt
+        self.decimales = decimales
+        self._filas = []
+
+    def abrir(self, encabezados):
+        super().abrir(encabezados)
+        self._filas = []
+
+    def escribir(self, fila):
+        self._filas.append(fila)
+
+    def cerrar(self):
+        from tabulate import tabulate
+        self.archivo.write(tabulate(self._filas, headers=self.encabezados,
+                                    tablefmt=self.tablefmt,
+                                    floatfmt=f".{self.decimales}f") + "\n")
+        self._filas = []
+
+
+# salidas disponibles por nombre de formato
+# :data: SALIDAS
+SALIDAS: dict = {
+    "csv": SalidaCSV,
+    "jsonl": SalidaJSONL,
+    "fijo": SalidaAnchoFijo,
+    "tabla": SalidaTabla,
+}
+"""
+Diccionario con los formatos de reporte disponibles y la clase de salida de cada uno.
+"""
+
+
+def crear_salida(formato, archivo=None, **opciones):
+    if isinstance(formato, Salida):
+        return formato
+    if formato not in SALIDAS:
+        raise ValueError(f"Formato de reporte desconocido: {formato}")
+    return SALIDAS[formato](archivo, **opciones)
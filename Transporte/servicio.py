@@ -0,0 +1,431 @@
+"""
+Módulo con el servicio de red del sistema de transporte: ingesta de eventos y consultas con asyncio sobre TCP.
+
+Cada línea que llega es un objeto JSON y cada una recibe exactamente una línea JSON de respuesta, en el mismo orden, así un cliente puede enviar muchas sin esperar las respuestas. Operaciones (campo "op"):
+
+    {"op": "evento", "tipo": "accidente", "cambios": [[id_ruta, valor], ...]}
+    {"op": "cambios", "cambios": [[id_ruta, campo, valor], ...]}
+    {"op": "critica"}
+    {"op": "plan", "k": 5}
+    {"op": "ruta", "id": 3}
+    {"op": "stats"}
+
+Los eventos van a una cola acotada; si se llena, la conexión que escribe espera (la presión llega hasta TCP) y las demás siguen atendidas. Una sola tarea escritora saca de la cola todo lo disponible (hasta juntar max_lote cambios), combina los cambios sobre la misma ruta y campo y los aplica con un solo aplicar_lote. Las consultas se responden en cuanto llegan con el último estado aplicado, sin pasar por la cola; como mucho esperan a que termine el lote en curso.
+
+Uso: python -m Transporte.servicio --rutas 10000 [--puerto 8765] [--carga 20000]
+"""
+# native python modules
+import argparse
+import asyncio
+import collections
+import json
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# custom modules
+from Transporte.sistema import (SistemaTransporte, SistemaTransporteColumnar, CAMBIOS_POR_EVENTO,
+                                CAMPOS_PRIORIDAD)
+from Transporte.benchmark.generadores import generar_red, generar_eventos
+
+
+# consultas cuyas latencias se conservan para los percentiles
+# :data: MUESTRAS_LATENCIA
+MUESTRAS_LATENCIA: int = 10000
+"""
+Cantidad de latencias recientes que se guardan por tipo de consulta para calcular p50 y p99.
+"""
+
+# campos de texto de una ruta que se pueden cambiar con la operación "cambios"
+# :data: CAMPOS_TEXTO
+CAMPOS_TEXTO: tuple = ("nombre", "origen", "destino")
+"""
+Campos de una ruta que aceptan texto; los de CAMPOS_PRIORIDAD aceptan números y el id no se puede cambiar.
+"""
+
+
+def ruta_a_dict(ruta):
+    if ruta is None:
+        return None
+    return {"id": ruta.id, "nombre": ruta.nombre, "origen": ruta.origen,
+            "destino": ruta.destino, "densidad_pasajeros": ruta.densidad_pasajeros,
+            "retraso_acumulado": ruta.retraso_acumulado,
+            "importancia_conexion": ruta.importancia_conexion,
+            "recursos_disponibles": ruta.recursos_disponibles,
+            "ultima_actualizacion": ruta.ultima_actualizacion.isoformat(),
+            "prioridad": ruta.calcular_prioridad()}
+
+
+def _es_numero(valor):
+    # bool es subclase de int pero no es un valor válido para una ruta
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool)
+
+
+def _percentil(ordenados, fraccion):
+    return ordenados[int(fraccion * (len(ordenados) - 1))]
+
+
+class _RutaPendiente:
+    # ruta vista a través de los cambios del lote que aún no se aplicaron
+    __slots__ = ("_vista", "_id")
+
+    def __init__(self, vista, id_ruta):
+        self._vista = vista
+        self._id = id_ruta
+
+    def __getattr__(self, campo):
+        valor = self._vista.pendientes.get((self._id, campo), self)
+        if valor is self:
+            return getattr(self._vista.sistema.rutas[self._id], campo)
+        return valor
+
+
+class _VistaPendiente:
+    # Las funciones de CAMBIOS_POR_EVENTO leen el valor actual de la ruta
+    # (p.ej. el retraso acumulado) para calcular el nuevo; al combinar
+    # varios eventos en un lote deben ver los cambios anteriores del mismo
+    # lote, por eso reciben esta vista en lugar del sistema
+    def __init__(self, sistema):
+        self.sistema = sistema
+        self.pendientes = {}
+
+    @property
+    def rutas(self):
+        return self
+
+    def __getitem__(self, id_ruta):
+        return _RutaPendiente(self, id_ruta)
+
+    def cambiar(self, id_ruta, campo, valor):
+        self.pendientes[(id_ruta, campo)] = valor
+
+    def cambios(self):
+        return [(id_ruta, campo, valor) for (id_ruta, campo), valor in self.pendientes.items()]
+
+
+class ServicioTransporte:
+    def __init__(self, sistema, max_cola=10000, max_lote=5000):
+        # max_cola: eventos en espera; max_lote: cambios por lote, acota lo
+        # que una consulta puede esperar a que termine el lote en curso
+        self.sistema = sistema
+        self.max_lote = max_lote
+        self.cola = asyncio.Queue(maxsize=max_cola)
+        self._servidor = None
+        self._escritor = None
+        self._conexiones = {}
+        self._inicio = None
+        self.contadores = {"eventos": 0, "rechazados": 0, "lotes": 0,
+                           "cambios_recibidos": 0, "cambios_aplicados": 0,
+                           "consultas": 0, "conexiones": 0, "lotes_fallidos": 0,
+                           "eventos_fallidos": 0}
+        self._latencias = collections.defaultdict(
+            lambda: collections.deque(maxlen=MUESTRAS_LATENCIA))
+        self._consultas = {
+            "critica": self._critica,
+            "plan": self._plan,
+            "ruta": self._ruta,
+            "stats": lambda pedido: self.estadisticas(),
+        }
+
+    async def iniciar(self, host="127.0.0.1", puerto=0):
+        self._inicio = time.perf_counter()
+        self._escritor = asyncio.create_task(self._escribir())
+        self._servidor = await asyncio.start_server(self._atender, host, puerto)
+        return self._servidor.sockets[0].getsockname()[:2]
+
+    async def detener(self):
+        # deja de aceptar conexiones, cierra las abiertas y aplica lo que
+        # quedaba en la cola
+        self._servidor.close()
+        for writer in self._conexiones.values():
+            writer.close()
+        await asyncio.gather(*self._conexiones, return_exceptions=True)
+        await self._servidor.wait_closed()
+        await self.cola.join()
+        self._escritor.cancel()
+        try:
+            await self._escritor
+        except asyncio.CancelledError:
+            pass
+
+    # --- conexiones ---
+
+    async def _atender(self, reader, writer):
+        self.contadores["conexiones"] += 1
+        tarea = asyncio.current_task()
+        self._conexiones[tarea] = writer
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                respuesta = await self._responder(linea)
+                writer.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+                # solo se espera al socket si el buffer de salida crece
+                if writer.transport.get_write_buffer_size() > 65536:
+                    await writer.drain()
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._conexiones[tarea]
+            writer.close()
+
+    async def _responder(self, linea):
+        try:
+            pedido = json.loads(linea)
+            op = pedido["op"]
+        except (ValueError, KeyError, TypeError) as exp:
+            return {"ok": False, "error": f"Pedido inválido: {exp}"}
+        if op == "evento" or op == "cambios":
+            return await self._encolar(op, pedido)
+        consulta = self._consultas.get(op)
+        if consulta is None:
+            return {"ok": False, "error": f"Operación desconocida: {op}"}
+        inicio = time.perf_counter_ns()
+        try:
+            resultado = consulta(pedido)
+        except (KeyError, TypeError, ValueError) as exp:
+            return {"ok": False, "error": str(exp)}
+        self._latencias[op].append(time.perf_counter_ns() - inicio)
+        self.contadores["consultas"] += 1
+        return {"ok": True, "resultado": resultado}
+
+    async def _encolar(self, op, pedido):
+        cambios = pedido.get("cambios")
+        if op == "evento":
+            tipo = pedido.get("tipo")
+            if tipo not in CAMBIOS_POR_EVENTO:
+                self.contadores["rechazados"] += 1
+                return {"ok": False, "error": f"Tipo de evento desconocido: {tipo}"}
+        else:
+            tipo = None
+        # (id_ruta, valor) por evento o (id_ruta, campo, valor) por cambio
+        largo = 3 if tipo is None else 2
+        if not isinstance(cambios, list) or not all(
+                isinstance(cambio, list) and len(cambio) == largo for cambio in cambios):
+            self.contadores["rechazados"] += 1
+            return {"ok": False, "error": f"Los cambios deben ser una lista de listas de {largo} valores"}
+        # se valida antes de confirmar: un cambio inválido haría fallar el
+        # lote entero en el escritor, cuando el cliente ya recibió ok
+        error = self._validar(tipo, cambios)
+        if error is not None:
+            self.contadores["rechazados"] += 1
+            return {"ok": False, "error": error}
+        # si la cola está llena esta conexión espera, las demás no
+        await self.cola.put((tipo, cambios))
+        self.contadores["eventos"] += 1
+        return {"ok": True}
+
+    def _validar(self, tipo, cambios):
+        # retorna el error del primer cambio inválido o None
+        rutas = self.sistema.rutas
+        for cambio in cambios:
+            if tipo is None:
+                id_ruta, campo, valor = cambio
+                if campo in CAMPOS_PRIORIDAD:
+                    if not _es_numero(valor):
+                        return f"El campo {campo} debe ser numérico: {valor!r}"
+                elif campo in CAMPOS_TEXTO:
+                    if not isinstance(valor, str):
+                        return f"El campo {campo} debe ser texto: {valor!r}"
+                else:
+                    return f"Campo no modificable: {campo}"
+            else:
+                id_ruta, valor = cambio
+                if not _es_numero(valor):
+                    return f"El valor del evento debe ser numérico: {valor!r}"
+            if not _es_numero(id_ruta) or id_ruta not in rutas:
+                return f"Ruta desconocida: {id_ruta!r}"
+        return None
+
+    # --- consultas ---
+
+    def _critica(self, pedido):
+        return ruta_a_dict(self.sistema.obtener_ruta_mas_critica())
+
+    def _plan(self, pedido):
+        plan = self.sistema.obtener_plan(int(pedido.get("k", 5)))
+        return [{"id": ruta.id, "nombre": ruta.nombre, "accion": accion,
+                 "prioridad": ruta.calcular_prioridad()} for ruta, accion in plan]
+
+    def _ruta(self, pedido):
+        id_ruta = pedido["id"]
+        if id_ruta not in self.sistema.rutas:
+            return None
+        return ruta_a_dict(self.sistema.rutas[id_ruta])
+
+    # --- escritor ---
+
+    async def _escribir(self):
+        cola = self.cola
+        while True:
+            lote = [await cola.get()]
+            n_cambios = len(lote[0][1])
+            while n_cambios < self.max_lote and not cola.empty():
+                lote.append(cola.get_nowait())
+                n_cambios += len(lote[-1][1])
+            try:
+                self._aplicar(lote)
+            except Exception:
+                # un lote que falla no detiene al escritor: sus eventos se
+                # aplican de a uno y solo se pierde el que falla
+                self.contadores["lotes_fallidos"] += 1
+                for evento in lote:
+                    try:
+                        self._aplicar([evento])
+                    except Exception:
+                        self.contadores["eventos_fallidos"] += 1
+            finally:
+                for _ in lote:
+                    cola.task_done()
+            # cede el turno para que las consultas pendientes se respondan
+            # antes del siguiente lote
+            await asyncio.sleep(0)
+
+    def _aplicar(self, lote):
+        rutas = self.sistema.rutas
+        vista = _VistaPendiente(self.sistema)
+        recibidos = 0
+        for tipo, cambios in lote:
+            for cambio in cambios:
+                recibidos += 1
+                if tipo is None:
+                    id_ruta, campo, valor = cambio
+                else:
+                    id_ruta, valor = cambio
+                    # ids desconocidos se descartan, igual que en aplicar_lote
+                    if id_ruta not in rutas:
+                        continue
+                    id_ruta, campo, valor = CAMBIOS_POR_EVENTO[tipo](vista, id_ruta, valor)
+                vista.cambiar(id_ruta, campo, valor)
+        cambios = vista.cambios()
+        self.sistema.aplicar_lote(cambios)
+        self.contadores["lotes"] += 1
+        self.contadores["cambios_recibidos"] += recibidos
+        self.contadores["cambios_aplicados"] += len(cambios)
+
+    def estadisticas(self):
+        segundos = time.perf_counter() - self._inicio if self._inicio else 0.0
+        latencias = {}
+        for op, muestras in self._latencias.items():
+            ordenados = sorted(muestras)
+            latencias[op] = {"p50_us": _percentil(ordenados, 0.50) / 1e3,
+                             "p99_us": _percentil(ordenados, 0.99) / 1e3}
+        return dict(self.contadores, cola=self.cola.qsize(), segundos=segundos,
+                    eventos_por_segundo=self.contadores["eventos"] / segundos if segundos else None,
+                    latencias_us=latencias)
+
+
+# --- generador de carga ---
+
+async def _enviar_eventos(host, puerto, eventos):
+    # una conexión que envía todos sus eventos sin esperar respuestas y las
+    # lee en paralelo
+    reader, writer = await asyncio.open_connection(host, puerto)
+
+    async def leer():
+        errores = 0
+        for _ in eventos:
+            respuesta = json.loads(await reader.readline())
+            errores += not respuesta["ok"]
+        return errores
+
+    lector = asyncio.create_task(leer())
+    for tipo, cambios in eventos:
+        writer.write(json.dumps({"op": "evento", "tipo": tipo, "cambios": cambios},
+                                ensure_ascii=False).encode("utf-8") + b"\n")
+        await writer.drain()
+    errores = await lector
+    writer.close()
+    await writer.wait_closed()
+    return errores
+
+
+async def _consultar(host, puerto, n_consultas, ops=("critica", "plan", "ruta"), n_rutas=1):
+    # una conexión que mide la latencia de ida y vuelta de cada consulta
+    reader, writer = await asyncio.open_connection(host, puerto)
+    tiempos = collections.defaultdict(list)
+    for i in range(n_consultas):
+        op = ops[i % len(ops)]
+        pedido = {"op": op, "id": i % n_rutas} if op == "ruta" else {"op": op}
+        inicio = time.perf_counter_ns()
+        writer.write(json.dumps(pedido).encode("utf-8") + b"\n")
+        await reader.readline()
+        tiempos[op].append(time.perf_counter_ns() - inicio)
+    writer.close()
+    await writer.wait_closed()
+    return tiempos
+
+
+async def generar_carga(host, puerto, n_rutas, n_eventos=20000, n_consultas=2000,
+                        conexiones=4, semilla=0):
+    # eventos sintéticos repartidos en varias conexiones mientras otra mide
+    # las consultas; retorna eventos por segundo y latencias p50/p99 en us
+    eventos = generar_eventos(n_rutas, n_eventos, semilla)
+    partes = [eventos[i::conexiones] for i in range(conexiones)]
+    inicio = time.perf_counter()
+    envios = [asyncio.create_task(_enviar_eventos(host, puerto, parte)) for parte in partes]
+    consultas = asyncio.create_task(_consultar(host, puerto, n_consultas, n_rutas=n_rutas))
+    errores = sum(await asyncio.gather(*envios))
+    segundos = time.perf_counter() - inicio
+    tiempos = await consultas
+    resultado = {"eventos": n_eventos, "errores": errores, "segundos": segundos,
+                 "eventos_por_segundo": n_eventos / segundos, "consultas": {}}
+    for op, muestras in tiempos.items():
+        muestras.sort()
+        resultado["consultas"][op] = {"n": len(muestras),
+                                      "p50_us": _percentil(muestras, 0.50) / 1e3,
+                                      "p99_us": _percentil(muestras, 0.99) / 1e3}
+    return resultado
+
+
+def _correr_carga(*args):
+    return asyncio.run(generar_carga(*args))
+
+
+async def _servir(args):
+    clase = SistemaTransporteColumnar if args.columnar else SistemaTransporte
+    sistema = clase()
+    sistema.agregar_rutas(generar_red(args.rutas, args.semilla))
+    servicio = ServicioTransporte(sistema, args.max_cola, args.max_lote)
+    host, puerto = await servicio.iniciar(args.host, args.puerto)
+    print(f"Servicio en {host}:{puerto} con {args.rutas} rutas", flush=True)
+    if args.carga:
+        # el generador corre en otro proceso para no competir por el event
+        # loop del servicio
+        ctx = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as ejecutor:
+            resultado = await asyncio.get_running_loop().run_in_executor(
+                ejecutor, _correr_carga, host, puerto, args.rutas, args.carga,
+                args.consultas, args.conexiones, args.semilla)
+        await servicio.detener()
+        resultado["servidor"] = servicio.estadisticas()
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    else:
+        await asyncio.Event().wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Transporte.servicio",
+                                     description="Servicio TCP de eventos y consultas del sistema de transporte")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--rutas", type=int, default=10000, help="rutas de la red sintética")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--columnar", action="store_true", help="usar SistemaTransporteColumnar")
+    parser.add_argument("--max-cola", type=int, default=10000)
+    parser.add_argument("--max-lote", type=int, default=5000, help="cambios por lote del escritor")
+    parser.add_argument("--carga", type=int, default=0,
+                        help="eventos del generador de carga; sin él el servicio queda escuchando")
+    parser.add_argument("--consultas", type=int, default=2000)
+    parser.add_argument("--conexiones", type=int, default=4)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_servir(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Módulo con el motor de simulación de eventos discretos del sistema de transporte.
+
+Los eventos se guardan en una cola ordenada por tiempo construida sobre el heap del proyecto (DataStructs/Trees/heap.py en modo key) y se despachan a los manejadores registrados para cada tipo de evento. El reloj es simulado: avanza al tiempo de cada evento, medido en minutos desde el inicio de la simulación.
+"""
+# native python modules
+import time
+from datetime import datetime, timedelta
+
+# custom modules
+from DataStructs.Trees.heap import new_heap, insert, delete_min, get_min, is_empty, size
+
+
+def _tiempo_evento(evento):
+    return evento[0]
+
+
+class Simulador:
+    def __init__(self, inicio=None):
+        # fecha que corresponde al minuto 0 del reloj simulado
+        self.inicio = inicio or datetime.now()
+        self.reloj = 0.0
+        self.cola = new_heap(key=_tiempo_evento)
+        self.manejadores = {}
+        self.estadisticas = {"eventos": 0, "segundos": 0.0, "eventos_por_segundo": 0.0}
+
+    def fecha(self):
+        # fecha simulada actual, sirve como reloj de SistemaTransporte
+        return self.inicio + timedelta(minutes=self.reloj)
+
+    def registrar(self, tipo, manejador):
+        # manejador(simulador, datos) se invoca con cada evento del tipo dado
+        self.manejadores[tipo] = manejador
+
+    def programar(self, tiempo, tipo, datos=None):
+        if tiempo < self.reloj:
+            raise ValueError(f"No se puede programar un evento en el pasado: {tiempo} < {self.reloj}")
+        if tipo not in self.manejadores:
+            raise KeyError(f"No hay manejador registrado para el evento: {tipo}")
+        insert(self.cola, (tiempo, tipo, datos))
+
+    def programar_en(self, demora, tipo, datos=None):
+        self.programar(self.reloj + demora, tipo, datos)
+
+    def pendientes(self):
+        return size(self.cola)
+
+    def ejecutar(self, hasta=None, max_eventos=None):
+        # procesa eventos en orden de tiempo hasta vaciar la cola, pasar el
+        # tiempo límite o alcanzar max_eventos; retorna los eventos procesados
+        cola = self.cola
+        manejadores = self.manejadores
+        procesados = 0
+        t_inicio = time.perf_counter()
+        # sin límites las comparaciones del ciclo nunca cortan
+        limite = float("inf") if hasta is None else hasta
+        maximo = -1 if max_eventos is None else max_eventos
+        while procesados != maximo and not is_empty(cola):
+            if get_min(cola)[0] > limite:
+                break
+            tiempo, tipo, datos = delete_min(cola)
+            self.reloj = tiempo
+            manejadores[tipo](self, datos)
+            procesados += 1
+        if hasta is not None and hasta > self.reloj:
+            self.reloj = hasta
+        segundos = time.perf_counter() - t_inicio
+        self.estadisticas["eventos"] += procesados
+        self.estadisticas["segundos"] += segundos
+        if self.estadisticas["segundos"] > 0:
+            self.estadisticas["eventos_por_segundo"] = \
+                self.estadisticas["eventos"] / self.estadisticas["segundos"]
+        return procesados
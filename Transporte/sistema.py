@@ -0,0 +1,29 @@
+"""
+Módulo que carga el sistema de transporte definido en "heaps transp.py" para que el resto del paquete pueda importarlo.
+
+El nombre del archivo tiene un espacio y no se puede importar directamente, por eso se carga desde su ruta y se registra como el módulo *heaps_transp*, lo que además permite serializar sus clases entre procesos.
+"""
+# native python modules
+import importlib.util
+import os
+import sys
+
+_NOMBRE = "heaps_transp"
+_RUTA = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                     "heaps transp.py")
+
+if _NOMBRE in sys.modules:
+    modulo = sys.modules[_NOMBRE]
+else:
+    _spec = importlib.util.spec_from_file_location(_NOMBRE, _RUTA)
+    modulo = importlib.util.module_from_spec(_spec)
+    sys.modules[_NOMBRE] = modulo
+    _spec.loader.exec_module(modulo)
+
+Ruta = modulo.Ruta
+SistemaTransporte = modulo.SistemaTransporte
+SistemaTransporteColumnar = modulo.SistemaTransporteColumnar
+CAMBIOS_POR_EVENTO = modulo.CAMBIOS_POR_EVENTO
+CAMPOS_PRIORIDAD = modulo.CAMPOS_PRIORIDAD
+cambios_evento = modulo.cambios_evento
+registrar_eventos = modulo.registrar_eventos
@@ -0,0 +1,150 @@
+﻿"""
+Módulo de instrumentación opcional para los heaps del proyecto y las clases que los usan.
+
+Al activarla se reemplazan, en tiempo de ejecución, las funciones internas de *DataStructs/Trees/heap.py* e *idxheap.py* (_swim, _sink, _greater, _exchange, _build) y los métodos públicos de las clases indicadas por versiones que cuentan operaciones y registran la latencia de cada llamada. En modo key los recorridos _swim_key/_sink_key no se reemplazan: reportan sus comparaciones e intercambios a través del gancho _contar de cada módulo. Las inserciones y extracciones de heap.py en modo key usan heapq directamente y no se cuentan. Al desactivarla se restauran las funciones originales, por lo que mientras está apagada no agrega ningún costo.
+
+Uso::
+
+    instrumentacion.activar(SistemaTransporte, Ruta)
+    ...
+    print(instrumentacion.stats())
+    instrumentacion.desactivar()
+"""
+# native python modules
+import bisect
+import time
+from types import FunctionType
+
+# custom modules
+from DataStructs.Trees import heap as hp
+from DataStructs.Trees import idxheap as ih
+
+
+# límites superiores (en microsegundos) de los intervalos del histograma de latencias
+# :data: LIMITES_US
+LIMITES_US: tuple = (1, 2, 5, 10, 20, 50, 100, 200, 500,
+                     1000, 2000, 5000, 10000, 50000, 100000, 500000,
+                     1000000, 10000000, float("inf"))
+"""
+Tupla con los límites superiores en microsegundos de cada intervalo del histograma de latencias.
+"""
+
+_estado = {"activa": False}
+_contadores = {}
+_latencias = {}
+_originales = []
+_fuentes = {}
+
+
+def contar(nombre: str, n: int = 1) -> None:
+    _contadores[nombre] = _contadores.get(nombre, 0) + n
+
+
+def registrar_latencia(nombre: str, ns: int) -> None:
+    registro = _latencias.get(nombre)
+    if registro is None:
+        registro = {"llamadas": 0, "total_ns": 0, "histograma": [0] * len(LIMITES_US)}
+        _latencias[nombre] = registro
+    registro["llamadas"] += 1
+    registro["total_ns"] += ns
+    registro["histograma"][bisect.bisect_left(LIMITES_US, ns / 1e3)] += 1
+
+
+def agregar_fuente(nombre: str, fuente) -> None:
+    # fuente: diccionario o función sin argumentos que retorna un
+    # diccionario de contadores propios, se copia en cada stats()
+    _fuentes[nombre] = fuente
+
+
+def medir(nombre: str, funcion):
+    reloj = time.perf_counter_ns
+
+    def medida(*args, **kwargs):
+        inicio = reloj()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            registrar_latencia(nombre, reloj() - inicio)
+    medida.__wrapped__ = funcion
+    medida.__name__ = getattr(funcion, "__name__", nombre)
+    medida.__doc__ = getattr(funcion, "__doc__", None)
+    return medida
+
+
+def _reemplazar(objeto, atributo, nuevo) -> None:
+    _originales.append((objeto, atributo, getattr(objeto, atributo)))
+    setattr(objeto, atributo, nuevo)
+
+
+def activar(*clases) -> None:
+    if _estado["activa"]:
+        return
+    _estado["activa"] = True
+    for modulo, nombre in ((hp, "heap"), (ih, "idxheap")):
+        _reemplazar(modulo, "_greater", _contado(f"{nombre}.comparaciones", modulo._greater))
+        _reemplazar(modulo, "_exchange", _contado(f"{nombre}.intercambios", modulo._exchange))
+        _reemplazar(modulo, "_swim", medir(f"{nombre}._swim", modulo._swim))
+        _reemplazar(modulo, "_sink", medir(f"{nombre}._sink", modulo._sink))
+        # en modo key los recorridos cuentan por su cuenta con este gancho
+        _reemplazar(modulo, "_contar", contar)
+    _reemplazar(hp, "heapify", _contado("heap.reconstrucciones", medir("heap.heapify", hp.heapify)))
+    _reemplazar(ih, "_build", _contado("idxheap.reconstrucciones", medir("idxheap._build", ih._build)))
+    # métodos públicos definidos en cada clase (no heredados ni classmethods)
+    for clase in clases:
+        for atributo, valor in list(vars(clase).items()):
+            if isinstance(valor, FunctionType) and not atributo.startswith("_"):
+                _reemplazar(clase, atributo, medir(f"{clase.__name__}.{atributo}", valor))
+
+
+def desactivar() -> None:
+    while _originales:
+        objeto, atributo, original = _originales.pop()
+        setattr(objeto, atributo, original)
+    _estado["activa"] = False
+
+
+def activa() -> bool:
+    return _estado["activa"]
+
+
+def reiniciar() -> None:
+    _contadores.clear()
+    _latencias.clear()
+
+
+def stats() -> dict:
+    latencias = {}
+    for nombre, registro in _latencias.items():
+        latencias[nombre] = {
+            "llamadas": registro["llamadas"],
+            "total_us": registro["total_ns"] / 1e3,
+            "media_us": registro["total_ns"] / 1e3 / registro["llamadas"],
+            "p50_us": _percentil(registro["histograma"], 0.50),
+            "p99_us": _percentil(registro["histograma"], 0.99),
+            "histograma": {str(limite): n for limite, n
+                           in zip(LIMITES_US, registro["histograma"]) if n},
+        }
+    fuentes = {nombre: dict(fuente() if callable(fuente) else fuente)
+               for nombre, fuente in _fuentes.items()}
+    return {"activa": _estado["activa"], "contadores": dict(_contadores),
+            "latencias": latencias, "fuentes": fuentes}
+
+
+def _percentil(histograma, fraccion):
+    # límite superior del intervalo donde cae el percentil
+    objetivo = fraccion * sum(histograma)
+    acumulado = 0
+    for limite, n in zip(LIMITES_US, histograma):
+        acumulado += n
+        if n and acumulado >= objetivo:
+            return limite
+    return None
+
+
+def _contado(nombre, funcion):
+    def contada(*args, **kwargs):
+        _contadores[nombre] = _contadores.get(nombre, 0) + 1
+        return funcion(*args, **kwargs)
+    contada.__wrapped__ = funcion
+    return contada
+
@@ -0,0 +1,32 @@
+﻿"""
+Módulo con utilidades de memoria para las cargas masivas del proyecto.
+
+Las cargas y reconstrucciones grandes (snapshots, heaps, índices) crean cientos de miles de objetos sin ciclos; mientras se crean, el recolector de basura de Python los recorre una y otra vez y solo agrega pausas. *pausar_gc()* lo detiene durante el bloque y al salir lo deja como estaba. No conviene usarlo en operaciones pequeñas y frecuentes, donde el recolector casi no corre.
+"""
+# native python modules
+import gc
+from contextlib import contextmanager
+
+
+# tamaño a partir del cual un lote pausa el recolector
+# :data: LOTE_MINIMO_GC
+LOTE_MINIMO_GC: int = 1000
+"""
+Cantidad mínima de elementos de un lote para que *pausar_gc(lote)* detenga el recolector; con menos el recolector casi no corre y apagarlo y prenderlo solo agrega trabajo.
+"""
+
+
+@contextmanager
+def pausar_gc(lote=None):
+    # sin lote se pausa siempre; con lote (una colección con len()) solo si
+    # tiene al menos LOTE_MINIMO_GC elementos
+    if lote is not None and len(lote) < LOTE_MINIMO_GC:
+        yield
+        return
+    activo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if activo:
+            gc.enable()
@@ -1,13 +1,106 @@
+﻿import functools
+import heapq
+import itertools
+import mmap
+import operator
+import struct
+import weakref
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta
+from typing import ClassVar
+from Utils import instrumentacion
+from Utils.memoria import pausar_gc
+from DataStructs.Trees.idxheap import new_idx_heap, insert, insert_all, update_key, update_keys, contains_key, remove_key, delete_min, get_min, is_empty, top_k, dump, restore, copy
+from Transporte.columnar import AlmacenColumnar, RutaColumnar, VistaRutas
+from Transporte.simulacion import Simulador
+from Transporte.reglas import TablaDecision
+from Transporte.red import RedTerminales
+from Transporte.indices import IndicesRutas
+from Transporte.orden import IndiceActualizacion, IndicePrioridad
+from Transporte.persistencia import PersistenciaSQLite
+from Transporte.prioridad import prioridad_ruta
+from Transporte.reportes import ENCABEZADOS_PLAN, ENCABEZADOS_RUTAS, crear_salida, filas_almacen, filas_plan, filas_rutas
 
+# Pesos de cada campo en la prioridad de una ruta
+FACTOR_DEMANDA = 10
+FACTOR_RETRASO = 5
+FACTOR_CONECTIVIDAD = 3
+FACTOR_RECURSOS = 2
 
-from dataclasses import dataclass
-from datetime import datetime
-from DataStructs.List import arlt
-from Utils.error import error_handler as err
-from DataStructs.Trees.heap import new_heap, insert, delete_min, get_min, is_empty
-from tabulate import tabulate
+# Formato del snapshot binario: una cabecera (marca, total de rutas, rutas
+# en el heap, secuencia del heap, factores de la prioridad) y un registro de ancho fijo por ruta
+# (id, densidad, retraso, importancia, recursos, timestamp, prioridad,
+# secuencia en el heap o -1, nombre, origen, destino)
+MARCA_SNAPSHOT = b"STRP0002"
+CABECERA_SNAPSHOT = struct.Struct("<8sqqqdddd")
+REGISTRO_SNAPSHOT = struct.Struct("<qdqdqddq64s64s64s")
 
-@dataclass
+# Campos de Ruta que intervienen en el cálculo de la prioridad
+CAMPOS_PRIORIDAD = ("densidad_pasajeros", "retraso_acumulado",
+                    "importancia_conexion", "recursos_disponibles")
+
+# Versiones de los pesos, únicas entre todos los objetos Pesos
+_VERSIONES_PESOS = itertools.count(1)
+
+
+class Pesos:
+    # Factores de la prioridad compartidos por un sistema y sus rutas. Cada
+    # cambio toma una versión nueva, lo que invalida las prioridades en caché,
+    # y avisa a los sistemas que los usan para que reordenen sus rutas
+    NOMBRES = ("demanda", "retraso", "conectividad", "recursos")
+
+    def __init__(self, demanda=FACTOR_DEMANDA, retraso=FACTOR_RETRASO,
+                 conectividad=FACTOR_CONECTIVIDAD, recursos=FACTOR_RECURSOS):
+        self.demanda = demanda
+        self.retraso = retraso
+        self.conectividad = conectividad
+        self.recursos = recursos
+        self.version = next(_VERSIONES_PESOS)
+        self._sistemas = weakref.WeakSet()
+
+    @property
+    def factores(self):
+        return (self.demanda, self.retraso, self.conectividad, self.recursos)
+
+    def prioridad(self, densidad, retraso, importancia, recursos):
+        # prioridad con estos pesos; acepta números o arreglos de NumPy
+        return prioridad_ruta(self.factores, densidad, retraso, importancia, recursos)
+
+    def actualizar(self, **factores):
+        # cambia estos pesos para todos los sistemas que los usan
+        self._validar(factores)
+        for nombre, valor in factores.items():
+            setattr(self, nombre, valor)
+        self.version = next(_VERSIONES_PESOS)
+        for sistema in list(self._sistemas):
+            sistema._reponderar()
+
+    def copiar(self, **factores):
+        # pesos nuevos con los mismos factores salvo los indicados, sin
+        # sistemas suscritos
+        self._validar(factores)
+        return Pesos(**dict(zip(self.NOMBRES, self.factores), **factores))
+
+    def _validar(self, factores):
+        for nombre in factores:
+            if nombre not in self.NOMBRES:
+                raise ValueError(f"Peso desconocido: {nombre}")
+
+    def __reduce__(self):
+        # al serializar (p.ej. rutas enviadas a otro proceso) los pesos
+        # globales siguen siendo los globales del proceso que los recibe
+        if self is PESOS:
+            return "PESOS"
+        return (Pesos, self.factores)
+
+    def __repr__(self):
+        return f"Pesos({', '.join(f'{n}={v}' for n, v in zip(self.NOMBRES, self.factores))}, version={self.version})"
+
+
+# Pesos por defecto, compartidos por las rutas y los sistemas que no definen otros
+PESOS = Pesos()
+
+@dataclass(slots=True)
 class Ruta:
     id: int
     nombre: str
@@ -18,59 +111,502 @@ class Ruta:
     importancia_conexion: float
     recursos_disponibles: int
     ultima_actualizacion: datetime
+    # Prioridad en caché, se recalcula solo si cambia algún campo de
+    # CAMPOS_PRIORIDAD o la versión de los pesos
+    _prioridad: float = field(default=0.0, init=False, repr=False, compare=False)
+    _sucia: bool = field(default=True, init=False, repr=False, compare=False)
+    _pesos: Pesos = field(default=PESOS, init=False, repr=False, compare=False)
+    _version: int = field(default=0, init=False, repr=False, compare=False)
+
+    # Cálculos de prioridad realizados y evitados gracias a la caché
+    estadisticas_prioridad: ClassVar[dict] = {"calculados": 0, "evitados": 0}
+
+    def __setattr__(self, nombre, valor):
+        object.__setattr__(self, nombre, valor)
+        if nombre in CAMPOS_PRIORIDAD:
+            object.__setattr__(self, "_sucia", True)
 
     def calcular_prioridad(self):
-        FACTOR_DEMANDA = 10
-        FACTOR_RETRASO = 5
-        FACTOR_CONECTIVIDAD = 3
-        FACTOR_RECURSOS = 2
+        pesos = self._pesos
+        if not self._sucia and self._version == pesos.version:
+            Ruta.estadisticas_prioridad["evitados"] += 1
+            return self._prioridad
+
+        prioridad = pesos.prioridad(self.densidad_pasajeros, self.retraso_acumulado,
+                                    self.importancia_conexion, self.recursos_disponibles)
+        object.__setattr__(self, "_prioridad", prioridad)
+        object.__setattr__(self, "_sucia", False)
+        object.__setattr__(self, "_version", pesos.version)
+        Ruta.estadisticas_prioridad["calculados"] += 1
+        return prioridad
+
+    @classmethod
+    def restaurar(cls, campos, prioridad, pesos=PESOS):
+        # Crea la ruta con una prioridad ya conocida (p.ej. desde un snapshot)
+        # sin pasar por __init__/__setattr__ ni recalcular la prioridad
+        ruta = object.__new__(cls)
+        for asignar, valor in zip(_ASIGNAR_CAMPOS, campos):
+            asignar(ruta, valor)
+        _ASIGNAR_PRIORIDAD(ruta, prioridad)
+        _ASIGNAR_SUCIA(ruta, False)
+        _ASIGNAR_PESOS(ruta, pesos)
+        _ASIGNAR_VERSION(ruta, pesos.version)
+        return ruta
+
+    def copiar(self, pesos=None):
+        # Copia con la prioridad en caché ya válida, para copy-on-write; con
+        # pesos la copia pasa a usarlos y, si sus factores son otros, la
+        # caché queda vencida por la versión
+        anteriores = self._pesos
+        ruta = Ruta.restaurar(_LEER_CAMPOS(self), self.calcular_prioridad(), anteriores)
+        if pesos is not None and pesos is not anteriores:
+            _ASIGNAR_PESOS(ruta, pesos)
+            if pesos.factores == anteriores.factores:
+                _ASIGNAR_VERSION(ruta, pesos.version)
+        return ruta
+
+
+# Descriptores de los slots de Ruta, asignan sin invocar Ruta.__setattr__
+_ASIGNAR_CAMPOS = [Ruta.__dict__[campo.name].__set__ for campo in fields(Ruta) if campo.init]
+_LEER_CAMPOS = operator.attrgetter(*(campo.name for campo in fields(Ruta) if campo.init))
+_ASIGNAR_PRIORIDAD = Ruta.__dict__["_prioridad"].__set__
+_ASIGNAR_SUCIA = Ruta.__dict__["_sucia"].__set__
+_ASIGNAR_PESOS = Ruta.__dict__["_pesos"].__set__
+_ASIGNAR_VERSION = Ruta.__dict__["_version"].__set__
+
+# Los contadores de la caché de prioridad aparecen en instrumentacion.stats()
+instrumentacion.agregar_fuente("prioridad", Ruta.estadisticas_prioridad)
+
+
+def clave_ruta_critica(ruta):
+    # El heap es de mínimos: la ruta con mayor prioridad queda en la cima
+    return -ruta.calcular_prioridad()
+
+def clave_actualizacion(ruta):
+    return ruta.ultima_actualizacion.timestamp()
+
+def _texto_fijo(texto):
+    datos = texto.encode("utf-8")
+    if len(datos) > 64:
+        raise ValueError(f"Texto demasiado largo para el snapshot: {texto!r}")
+    return datos
+
+
+def _empacar_ruta(ruta, seq):
+    return REGISTRO_SNAPSHOT.pack(ruta.id, ruta.densidad_pasajeros, ruta.retraso_acumulado,
+                                  ruta.importancia_conexion, ruta.recursos_disponibles,
+                                  ruta.ultima_actualizacion.timestamp(),
+                                  ruta.calcular_prioridad(), seq,
+                                  _texto_fijo(ruta.nombre), _texto_fijo(ruta.origen),
+                                  _texto_fijo(ruta.destino))
+
+
+def _desempacar_ruta(registro, pesos=PESOS):
+    (id_ruta, densidad, retraso, importancia, recursos, marca_tiempo,
+     prioridad, _, nombre, origen, destino) = registro
+    return Ruta.restaurar((id_ruta, nombre.rstrip(b"\0").decode("utf-8"),
+                           origen.rstrip(b"\0").decode("utf-8"),
+                           destino.rstrip(b"\0").decode("utf-8"), densidad, retraso,
+                           importancia, recursos, datetime.fromtimestamp(marca_tiempo)),
+                          prioridad, pesos)
+
+
+def _escribir_snapshot(path, factores, n_rutas, seq, pendientes, procesadas):
+    # pendientes: [(seq, ruta)] en el orden del arreglo del heap;
+    # procesadas: rutas que ya salieron del heap
+    with open(path, "wb") as archivo:
+        archivo.write(CABECERA_SNAPSHOT.pack(MARCA_SNAPSHOT, n_rutas, len(pendientes),
+                                             seq, *factores))
+        for seq_ruta, ruta in pendientes:
+            archivo.write(_empacar_ruta(ruta, seq_ruta))
+        for ruta in procesadas:
+            archivo.write(_empacar_ruta(ruta, -1))
+
+
+def _leer_snapshot(path):
+    # retorna (pesos, rutas en el heap, secuencia del heap, registros)
+    with open(path, "rb") as archivo, \
+            mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        marca, n_rutas, n_heap, seq, *factores = CABECERA_SNAPSHOT.unpack_from(mapa, 0)
+        if marca != MARCA_SNAPSHOT:
+            raise ValueError(f"{path} no es un snapshot del sistema de transporte")
+        inicio = CABECERA_SNAPSHOT.size
+        fin = inicio + n_rutas * REGISTRO_SNAPSHOT.size
+        with memoryview(mapa)[inicio:fin] as vista:
+            registros = list(REGISTRO_SNAPSHOT.iter_unpack(vista))
+    # las prioridades guardadas son válidas con los pesos del snapshot
+    pesos = PESOS if tuple(factores) == PESOS.factores else Pesos(*factores)
+    return pesos, n_heap, seq, registros
 
-        return (self.densidad_pasajeros * FACTOR_DEMANDA) + \
-               (self.retraso_acumulado * FACTOR_RETRASO) + \
-               (self.importancia_conexion * FACTOR_CONECTIVIDAD) - \
-               (self.recursos_disponibles * FACTOR_RECURSOS)
 
 class SistemaTransporte:
-    def __init__(self):
+    # Reglas (campo, operador, umbral) -> acción del plan de optimización
+    tabla_decision = TablaDecision()
+
+    def __init__(self, pesos=None):
         self.rutas = {}
-        self.heap_rutas_criticas = new_heap(lambda r1, r2: -1 if r1.calcular_prioridad() > r2.calcular_prioridad() else (1 if r1.calcular_prioridad() < r2.calcular_prioridad() else 0)
-)
+        # Fuente de la hora de actualización, un simulador puede reemplazarla
+        self.reloj = datetime.now
+        self.heap_rutas_criticas = new_idx_heap(key=clave_ruta_critica)
+        # Pesos de la prioridad de todas las rutas del sistema, por defecto
+        # los globales (PESOS) compartidos con los demás sistemas
+        self.pesos = pesos or PESOS
+        self.pesos._sistemas.add(self)
+        # Planes de optimización vivos por k, ver suscribir_plan()
+        self._planes = {}
+        # Índice terminal -> rutas, se construye al usarlo por primera vez
+        self._red = None
+        # Índices por origen, destino y terminal con un heap por terminal,
+        # también se construyen con la primera consulta
+        self._indices = None
+        # Índice ordenado por (prioridad, id) para rangos, rank y select,
+        # también se construye con la primera consulta
+        self._orden = None
+        # Índice ordenado por (última actualización, id) para encontrar las
+        # rutas con datos viejos, también se construye con la primera consulta
+        self._frescura = None
+        # Persistencia en SQLite, ver persistir()
+        self._persistencia = None
+        # Copy-on-write entre escenarios, ver fork(): con _compartido el
+        # diccionario de rutas y el heap pueden ser de otro sistema, y si
+        # _propias no es None solo las rutas con id en _propias son de este
+        # sistema, las demás se copian antes de modificarlas
+        self._compartido = False
+        self._propias = None
+        # Pesos ajenos que usan las rutas compartidas con otros sistemas; el
+        # escenario está suscrito a ellos hasta que _reponderar las copia
+        self._seguidos = ()
+        # Escenarios vivos creados con fork() desde este sistema y, si este
+        # es a su vez un escenario, el sistema del que salió
+        self._forks = 0
+        self._origen = None
+
+    @property
+    def red(self):
+        if self._red is None:
+            self._red = RedTerminales()
+            self._red.agregar_lote(self.rutas.values())
+        return self._red
+
+    @property
+    def indices(self):
+        if self._indices is None:
+            self._indices = IndicesRutas(clave_ruta_critica)
+            self._indices.agregar_lote(self.rutas.values())
+        return self._indices
+
+    def ruta_mas_critica_en(self, terminal, tipo="terminal"):
+        # tipo: "origen", "destino" o "terminal" (origen o destino)
+        return self.indices.mas_critica(terminal, tipo)
+
+    def criticas_en(self, terminal, k=5, tipo="terminal"):
+        return self.indices.criticas(terminal, k, tipo)
+
+    def rutas_en(self, terminal, tipo="terminal"):
+        return self.indices.rutas(terminal, tipo)
+
+    @property
+    def orden(self):
+        if self._orden is None:
+            self._orden = IndicePrioridad(clave_ruta_critica)
+            self._orden.agregar_lote(self.rutas.values())
+        return self._orden
+
+    def rango_prioridad(self, minima, maxima):
+        # Rutas con prioridad entre minima y maxima (inclusive), de la más
+        # crítica a la menos crítica
+        return self.orden.rango(minima, maxima)
+
+    def rank(self, id_ruta):
+        # Posición de la ruta en el orden de prioridad, 0 es la más crítica
+        return self.orden.rank(id_ruta)
+
+    def select(self, k):
+        # k-ésima ruta más crítica (desde 0), procesada o no
+        return self.orden.select(k)
+
+    def percentil(self, id_ruta):
+        return self.orden.percentil(id_ruta)
+
+    @property
+    def frescura(self):
+        if self._frescura is None:
+            self._frescura = IndiceActualizacion(clave_actualizacion)
+            self._frescura.agregar_lote(self.rutas.values())
+        return self._frescura
+
+    def rutas_sin_actualizar(self, minutos, ahora=None):
+        # Rutas sin actualizar en los últimos minutos (según el reloj del
+        # sistema), de la más vieja a la más reciente, en O(log n + salida)
+        limite = (ahora or self.reloj()) - timedelta(minutes=minutos)
+        return self.frescura.anteriores(limite.timestamp())
+
+    def marcar_obsoletas(self, minutos, ahora=None, expirar=False):
+        # Para un vigilante que corre cada pocos segundos: retorna solo las
+        # rutas que quedaron sin actualizar por más de minutos desde la pasada
+        # anterior, en O(log n + nuevas). Una ruta que se actualiza sale del
+        # intervalo y vuelve a aparecer si otra vez queda vieja. Con expirar
+        # las rutas además dejan de estar pendientes en el heap de rutas
+        # críticas (como con procesar_ruta_critica) hasta su próximo cambio
+        limite = (ahora or self.reloj()) - timedelta(minutes=minutos)
+        obsoletas = self.frescura.vencidas(limite.timestamp())
+        if expirar and obsoletas:
+            self._expirar(obsoletas)
+        return obsoletas
+
+    def _expirar(self, rutas):
+        if self._compartido:
+            self._separar()
+        ids = [ruta.id for ruta in rutas if contains_key(self.heap_rutas_criticas, ruta.id)]
+        for id_ruta in ids:
+            remove_key(self.heap_rutas_criticas, id_ruta)
+        if self._planes and ids:
+            self._notificar_planes(ids)
 
 
     def agregar_ruta(self, ruta):
+        if self._compartido:
+            self._separar()
+        if self._propias is not None:
+            self._propias.add(ruta.id)
+        if ruta._pesos is not self.pesos:
+            _ASIGNAR_PESOS(ruta, self.pesos)
         self.rutas[ruta.id] = ruta
-        insert(self.heap_rutas_criticas, ruta)
+        if contains_key(self.heap_rutas_criticas, ruta.id):
+            update_key(self.heap_rutas_criticas, ruta.id, ruta)
+        else:
+            insert(self.heap_rutas_criticas, ruta.id, ruta)
+        self._sincronizar_nuevas((ruta.id,))
+
+    def agregar_rutas(self, lote):
+        # Carga masiva: las rutas nuevas entran al heap con una sola
+        # construcción O(n) en vez de una inserción por ruta
+        if self._compartido:
+            self._separar()
+        nuevas = {}
+        ids = set()
+        for ruta in lote:
+            ids.add(ruta.id)
+            if ruta._pesos is not self.pesos:
+                _ASIGNAR_PESOS(ruta, self.pesos)
+            self.rutas[ruta.id] = ruta
+            if contains_key(self.heap_rutas_criticas, ruta.id):
+                update_key(self.heap_rutas_criticas, ruta.id, ruta)
+            else:
+                nuevas[ruta.id] = ruta
+        insert_all(self.heap_rutas_criticas, nuevas.items())
+        if self._propias is not None:
+            self._propias.update(ids)
+        self._sincronizar_nuevas(ids)
 
     def actualizar_ruta(self, id_ruta, **kwargs):
         if id_ruta not in self.rutas:
             return False
 
         ruta = self.rutas[id_ruta]
+        if self._propias is not None and id_ruta not in self._propias:
+            ruta = self._copiar_al_escribir(id_ruta)
 
         # Actualizamos los atributos que se pasaron como kwargs
         for attr, value in kwargs.items():
             if hasattr(ruta, attr):
                 setattr(ruta, attr, value)
 
-        ruta.ultima_actualizacion = datetime.now()
+        ruta.ultima_actualizacion = self.reloj()
+        if self._red is not None and ("origen" in kwargs or "destino" in kwargs):
+            self._red.agregar(id_ruta, ruta.origen, ruta.destino)
 
-        # Se reconstruye el heap excluyendo la ruta actualizada
-        cmp_func = self.heap_rutas_criticas["cmp_function"]
-        nueva_heap = new_heap(cmp_func)
+        self._reubicar({id_ruta: ruta}, [(id_ruta, campo, valor) for campo, valor in kwargs.items()],
+                       ruta.ultima_actualizacion)
 
-        for i in range(self.heap_rutas_criticas["size"]):
-            r = arlt.get_element(self.heap_rutas_criticas["elements"], i)
-            if r is not None and r.id != id_ruta:
-                insert(nueva_heap, r)
+        return True
 
-        # Se inserta la ruta actualizada nuevamente
-        insert(nueva_heap, ruta)
+    def aplicar_lote(self, cambios):
+        # Aplica muchos cambios (id_ruta, campo, valor) en una sola pasada y
+        # repara el heap una vez al final; el resultado es el mismo que
+        # llamar actualizar_ruta por cada cambio
+        ahora = self.reloj()
+        tocadas = {}
+        movidas = []
+        if self._persistencia is not None:
+            cambios = list(cambios)
+        for id_ruta, campo, valor in cambios:
+            ruta = self.rutas.get(id_ruta)
+            if ruta is None:
+                continue
+            if self._propias is not None and id_ruta not in self._propias:
+                ruta = self._copiar_al_escribir(id_ruta)
+            if hasattr(ruta, campo):
+                setattr(ruta, campo, valor)
+            if campo == "origen" or campo == "destino":
+                movidas.append(id_ruta)
+            tocadas[id_ruta] = ruta
 
-        # Se reemplaza el heap antiguo
-        self.heap_rutas_criticas = nueva_heap
+        for ruta in tocadas.values():
+            ruta.ultima_actualizacion = ahora
+        if self._red is not None:
+            for id_ruta in movidas:
+                ruta = self.rutas[id_ruta]
+                self._red.agregar(id_ruta, ruta.origen, ruta.destino)
 
-        return True
+        self._reubicar(tocadas, cambios, ahora)
+
+        return len(tocadas)
+
+    def _reubicar(self, tocadas, cambios=None, ahora=None):
+        # Solo se reubican las rutas afectadas dentro del heap; las que ya
+        # fueron procesadas (extraídas del heap) se vuelven a insertar
+        presentes = []
+        ausentes = []
+        for id_ruta, ruta in tocadas.items():
+            if contains_key(self.heap_rutas_criticas, id_ruta):
+                presentes.append(id_ruta)
+            else:
+                ausentes.append((id_ruta, ruta))
+        if len(presentes) == 1:
+            update_key(self.heap_rutas_criticas, presentes[0])
+        elif presentes:
+            update_keys(self.heap_rutas_criticas, presentes)
+        if ausentes:
+            insert_all(self.heap_rutas_criticas, ausentes)
+        self._sincronizar(tocadas, cambios, ahora)
+
+    def _sincronizar(self, tocadas, cambios=None, ahora=None):
+        # Lleva las rutas modificadas ({id: ruta}) a las estructuras
+        # opcionales que existan; cambios [(id_ruta, campo, valor)] con su
+        # hora ahora son los que se anotan en la persistencia
+        for indice in (self._indices, self._orden, self._frescura):
+            if indice is not None:
+                indice.actualizar(tocadas)
+        if self._persistencia is not None and cambios is not None:
+            self._persistencia.registrar_lote(cambios, ahora, tocadas)
+        if self._planes:
+            self._notificar_planes(tocadas)
+
+    def _sincronizar_nuevas(self, ids):
+        # Igual que _sincronizar para rutas nuevas o reemplazadas, que entran
+        # con la carga por lote de cada estructura
+        indices = [indice for indice in (self._red, self._indices, self._orden, self._frescura)
+                   if indice is not None]
+        if indices or self._persistencia is not None:
+            rutas = [self.rutas[id_ruta] for id_ruta in ids]
+            for indice in indices:
+                indice.agregar_lote(rutas)
+            if self._persistencia is not None:
+                self._persistencia.registrar_rutas(rutas)
+        if self._planes:
+            self._notificar_planes(ids)
 
+    def fork(self):
+        # Escenario hipotético sobre el estado actual: el sistema nuevo
+        # comparte con este el diccionario de rutas, el heap y los objetos
+        # Ruta, y cada uno copia lo que va a modificar la primera vez (el
+        # diccionario y el heap son copias superficiales, las rutas se copian
+        # una a una). El escenario tiene su propia copia de los pesos; los
+        # índices, planes y la persistencia no pasan al escenario. Cuando el
+        # último escenario se libera, este sistema deja de copiar al escribir
+        escenario = type(self)(pesos=self.pesos.copiar())
+        escenario.reloj = self.reloj
+        if "tabla_decision" in vars(self):
+            escenario.tabla_decision = self.tabla_decision
+        escenario.rutas = self.rutas
+        escenario.heap_rutas_criticas = self.heap_rutas_criticas
+        escenario._compartido = self._compartido = True
+        escenario._propias = set()
+        self._propias = set()
+        # las rutas compartidas calculan su prioridad con los pesos de este
+        # sistema o con los que este sigue por las suyas (fork de un fork):
+        # si alguno cambia en el lugar (actualizar), el escenario copia esas
+        # rutas con los suyos
+        escenario._seguidos = (self.pesos,) + self._seguidos
+        for pesos in escenario._seguidos:
+            pesos._sistemas.add(escenario)
+        # el escenario mantiene vivo a este sistema, así un fork de un fork
+        # no libera a la base mientras el nieto siga usando sus rutas
+        escenario._origen = self
+        self._forks += 1
+        weakref.finalize(escenario, self._liberar_fork)
+        return escenario
+
+    def _liberar_fork(self):
+        # sin escenarios vivos y sin origen ya no comparte nada: vuelve al
+        # modo normal, sin copias al escribir
+        self._forks -= 1
+        if not self._forks and self._origen is None:
+            self._compartido = False
+            self._propias = None
+
+    def prioridad_total(self):
+        return sum(ruta.calcular_prioridad() for ruta in self.rutas.values())
+
+    def _separar(self):
+        # primera escritura tras un fork: diccionario y heap propios
+        self.rutas = dict(self.rutas)
+        self.heap_rutas_criticas = copy(self.heap_rutas_criticas)
+        self._compartido = False
+
+    def _copiar_al_escribir(self, id_ruta):
+        # la ruta puede estar compartida con otro escenario: se reemplaza por
+        # una copia en las rutas y en el heap antes de modificarla
+        if self._compartido:
+            self._separar()
+        ruta = self.rutas[id_ruta].copiar(self.pesos)
+        self.rutas[id_ruta] = ruta
+        self._propias.add(id_ruta)
+        if contains_key(self.heap_rutas_criticas, id_ruta):
+            update_key(self.heap_rutas_criticas, id_ruta, ruta)
+        return ruta
+
+    def cambiar_pesos(self, **factores):
+        # p.ej. cambiar_pesos(demanda=12, recursos=1); los pesos se copian al
+        # escribir: solo este sistema pasa a los nuevos y se reordena una vez,
+        # los demás que compartían los anteriores no cambian. Para cambiar
+        # los de todos los sistemas suscritos, PESOS.actualizar(...)
+        pesos = self.pesos.copiar(**factores)
+        self.pesos._sistemas.discard(self)
+        self.pesos = pesos
+        pesos._sistemas.add(self)
+        self._reponderar()
+
+    def _reponderar(self):
+        # Las llaves del heap se recalculan en una sola pasada con los pesos
+        # locales y el heap se reconstruye una vez en O(n); la caché de cada
+        # ruta queda vencida por la versión y se actualiza al consultarla
+        if self._compartido:
+            self._separar()
+        pesos = self.pesos
+        rutas = self.rutas
+        # tras cambiar_pesos las rutas todavía apuntan a los pesos
+        # anteriores; las que comparte un escenario se copian antes
+        copiadas = {}
+        for id_ruta in [id_ruta for id_ruta, ruta in rutas.items() if ruta._pesos is not pesos]:
+            if self._propias is not None and id_ruta not in self._propias:
+                rutas[id_ruta] = copiadas[id_ruta] = rutas[id_ruta].copiar(pesos)
+                self._propias.add(id_ruta)
+            else:
+                _ASIGNAR_PESOS(rutas[id_ruta], pesos)
+        if copiadas and self._frescura is not None:
+            self._frescura.actualizar(copiadas)
+        # ya ninguna ruta usa pesos ajenos
+        for seguidos in self._seguidos:
+            seguidos._sistemas.discard(self)
+        self._seguidos = ()
+        factores = pesos.factores
+        claves, entradas, seq = dump(self.heap_rutas_criticas)
+        with pausar_gc():
+            entradas = [(-prioridad_ruta(factores, ruta.densidad_pasajeros,
+                                         ruta.retraso_acumulado, ruta.importancia_conexion,
+                                         ruta.recursos_disponibles), seq_ruta, ruta)
+                        for ruta, (_, seq_ruta, _) in zip(map(rutas.__getitem__, claves), entradas)]
+            restore(self.heap_rutas_criticas, claves, entradas, seq, ordered=False)
+        # los heaps de los índices y el índice ordenado quedaron con las
+        # llaves viejas
+        self._indices = None
+        self._orden = None
+        if self._persistencia is not None:
+            self._persistencia.registrar_pesos(self.pesos.factores)
+        for k, plan in self._planes.items():
+            self._refrescar_plan(k, plan, ())
 
     def obtener_ruta_mas_critica(self):
         if is_empty(self.heap_rutas_criticas):
@@ -80,36 +616,534 @@ class SistemaTransporte:
     def procesar_ruta_critica(self):
         if is_empty(self.heap_rutas_criticas):
             return None
-        return delete_min(self.heap_rutas_criticas)
+        if self._compartido:
+            self._separar()
+        ruta = delete_min(self.heap_rutas_criticas)
+        if self._planes:
+            self._notificar_planes((ruta.id,))
+        return ruta
+
+    def asignar_vehiculos(self, vehiculos):
+        # Reparte una flota de vehículos de a uno: cada vehículo va a la ruta
+        # más crítica pendiente (la raíz del heap), que baja de prioridad y se
+        # reubica con update_key en O(log n); en total O(V log n). Retorna
+        # {id_ruta: vehículos asignados}
+        if self._compartido:
+            self._separar()
+        heap = self.heap_rutas_criticas
+        asignacion = {}
+        tocadas = {}
+        for _ in range(vehiculos):
+            if is_empty(heap):
+                break
+            ruta = get_min(heap)
+            id_ruta = ruta.id
+            if self._propias is not None and id_ruta not in self._propias:
+                ruta = self._copiar_al_escribir(id_ruta)
+            ruta.recursos_disponibles += 1
+            update_key(heap, id_ruta)
+            asignacion[id_ruta] = asignacion.get(id_ruta, 0) + 1
+            tocadas[id_ruta] = ruta
+        if not tocadas:
+            return asignacion
 
-    def simular_evento_trafico(self, id_ruta, retraso_adicional):
+        # el heap ya quedó en orden, falta lo mismo que en aplicar_lote
+        ahora = self.reloj()
+        for ruta in tocadas.values():
+            ruta.ultima_actualizacion = ahora
+        self._sincronizar(tocadas, [(id_ruta, "recursos_disponibles", ruta.recursos_disponibles)
+                                    for id_ruta, ruta in tocadas.items()], ahora)
+        return asignacion
+
+    def simular_evento_trafico(self, id_ruta, retraso_adicional, propagar=None, minimo=1):
+        # Con propagar (factor de decaimiento entre 0 y 1) parte del retraso
+        # pasa a las rutas que comparten terminal, salto a salto, hasta que
+        # el incremento baja de minimo; todo se aplica en un solo lote
         if id_ruta in self.rutas:
             ruta = self.rutas[id_ruta]
-            return self.actualizar_ruta(id_ruta, retraso_acumulado=ruta.retraso_acumulado + retraso_adicional)
+            if not propagar:
+                return self.actualizar_ruta(id_ruta, retraso_acumulado=ruta.retraso_acumulado + retraso_adicional)
+            incrementos = self.red.propagar(id_ruta, retraso_adicional, propagar, minimo)
+            incrementos[id_ruta] = retraso_adicional
+            self.aplicar_lote(self._cambios_retraso(incrementos))
+            return True
         return False
 
-    def generar_plan_optimizacion(self):
-        plan = []
-        copia = [arlt.get_element(self.heap_rutas_criticas["elements"], i)
-                 for i in range(self.heap_rutas_criticas["size"])]
-        copia.sort(key=lambda r: r.calcular_prioridad())
+    def _cambios_retraso(self, incrementos):
+        rutas = self.rutas
+        return [(id_ruta, "retraso_acumulado", rutas[id_ruta].retraso_acumulado + incremento)
+                for id_ruta, incremento in incrementos.items()]
+
+    def guardar_snapshot(self, path):
+        # Primero se escriben las rutas en el orden del arreglo del heap y
+        # luego las que ya fueron procesadas, así al cargar no hay que
+        # recalcular prioridades ni reconstruir el heap
+        claves, entradas, seq = dump(self.heap_rutas_criticas)
+        _escribir_snapshot(path, self.pesos.factores, len(self.rutas), seq,
+                           [(seq_ruta, ruta) for _, seq_ruta, ruta in entradas],
+                           (ruta for id_ruta, ruta in self.rutas.items()
+                            if not contains_key(self.heap_rutas_criticas, id_ruta)))
+
+    @classmethod
+    def cargar_snapshot(cls, path):
+        pesos, n_heap, seq, registros = _leer_snapshot(path)
+        sistema = cls(pesos=pesos)
+        with pausar_gc():
+            claves = []
+            entradas = []
+            for pos, registro in enumerate(registros):
+                ruta = _desempacar_ruta(registro, sistema.pesos)
+                sistema.rutas[ruta.id] = ruta
+                if pos < n_heap:
+                    # la llave del heap es la prioridad negada (clave_ruta_critica)
+                    claves.append(ruta.id)
+                    entradas.append((-ruta._prioridad, registro[7], ruta))
+            restore(sistema.heap_rutas_criticas, claves, entradas, seq)
+        return sistema
+
+    def persistir(self, path, intervalo=1.0, checkpoint_cada=1):
+        # Guarda el estado completo en la base SQLite de path y desde ahí
+        # anota cada cambio en memoria; un hilo de fondo lo escribe cada
+        # intervalo segundos en una transacción (ver Transporte/persistencia.py)
+        persistencia = PersistenciaSQLite(path, intervalo, checkpoint_cada)
+        persistencia.escribir_todo(self.rutas.values(), self.pesos.factores)
+        self._adjuntar_persistencia(persistencia)
+        return persistencia
+
+    def dejar_de_persistir(self):
+        # escribe lo pendiente y cierra la base
+        if self._persistencia is not None:
+            self._persistencia.cerrar()
+            self._persistencia = None
+
+    def _adjuntar_persistencia(self, persistencia):
+        if self._persistencia is not None:
+            self._persistencia.cerrar()
+        self._persistencia = persistencia
+        persistencia.iniciar()
+
+    @classmethod
+    def recuperar(cls, path, intervalo=1.0, checkpoint_cada=1):
+        # Reconstruye el sistema desde la base: las rutas del último
+        # checkpoint entran con una sola carga masiva y la cola del diario se
+        # reaplica con un solo aplicar_lote. Todas las rutas quedan pendientes
+        # (el heap no distingue las ya procesadas) y el sistema sigue
+        # persistiendo en la misma base
+        factores, filas, cola = PersistenciaSQLite.leer(path)
+        if factores is None or factores == PESOS.factores:
+            pesos = PESOS
+        else:
+            pesos = Pesos(*factores)
+        sistema = cls(pesos=pesos)
+
+        with pausar_gc():
+            rutas = [Ruta(*fila[:-1], datetime.fromtimestamp(fila[-1])) for fila in filas]
+        sistema.agregar_rutas(rutas)
+        if cola:
+            sistema._reaplicar(cola)
+
+        persistencia = PersistenciaSQLite(path, intervalo, checkpoint_cada)
+        # el checkpoint nuevo incluye la cola reaplicada
+        persistencia.registrar_rutas(sistema.rutas[id_ruta]
+                                     for id_ruta in {fila[1] for fila in cola}
+                                     if id_ruta in sistema.rutas)
+        persistencia.vaciar(checkpoint=True)
+        sistema._adjuntar_persistencia(persistencia)
+        return sistema
 
-        for i in range(min(5, len(copia))):
-            ruta = copia[i]
+    def _reaplicar(self, cola):
+        # cola: [(seq, id_ruta, campo, valor, marca)] en orden; cada ruta
+        # conserva la hora de su último cambio
+        cambios = []
+        marcas = {}
+        for _, id_ruta, campo, valor, marca in cola:
+            if campo == "ultima_actualizacion":
+                valor = datetime.fromtimestamp(valor)
+            cambios.append((id_ruta, campo, valor))
+            marcas[id_ruta] = marca
+        self.aplicar_lote(cambios)
+        for id_ruta, marca in marcas.items():
+            if id_ruta in self.rutas:
+                self.rutas[id_ruta].ultima_actualizacion = datetime.fromtimestamp(marca)
+        if self._frescura is not None:
+            self._frescura.actualizar({id_ruta: self.rutas[id_ruta]
+                                       for id_ruta in marcas if id_ruta in self.rutas})
+
+    def generar_plan_optimizacion(self, k=5):
+        plan = []
+        for ruta in self._ranking(k):
             accion = self._determinar_accion_optimizacion(ruta)
             plan.append((ruta, accion))
 
         return plan
 
-    def _determinar_accion_optimizacion(self, ruta):
-        if ruta.densidad_pasajeros > 0.8 and ruta.recursos_disponibles < 5:
-            return "Aumentar frecuencia de vehículos"
-        elif ruta.retraso_acumulado > 10:
-            return "Implementar ruta express"
-        elif ruta.importancia_conexion > 0.7 and ruta.retraso_acumulado > 5:
-            return "Priorizar sincronización de conexiones"
+    def exportar_plan(self, formato="tabla", archivo=None, k=5):
+        # formato: "csv", "jsonl", "fijo", "tabla" o una Salida ya creada;
+        # retorna la cantidad de filas escritas
+        salida = crear_salida(formato, archivo)
+        return salida.volcar(ENCABEZADOS_PLAN, filas_plan(self.generar_plan_optimizacion(k)))
+
+    def exportar_rutas(self, formato="csv", archivo=None):
+        # Estado de toda la red; las filas se escriben mientras se recorren
+        # las rutas, sin armar la tabla completa en memoria
+        salida = crear_salida(formato, archivo)
+        return salida.volcar(ENCABEZADOS_RUTAS, filas_rutas(self.rutas.values()))
+
+    def _ranking(self, k):
+        # Las k rutas más críticas se leen directamente del heap, de mayor a
+        # menor prioridad, sin copiar ni ordenar todas las rutas
+        return top_k(self.heap_rutas_criticas, k)
+
+    def suscribir_plan(self, callback, k=5):
+        # El plan de las k rutas más críticas se mantiene como estado vivo y
+        # callback(diferencias) recibe solo lo que cambió: rutas que entran
+        # {"entran": [(ruta, accion)], "salen": [id_ruta],
+        #  "cambian": [(ruta, accion_anterior, accion_nueva)]}
+        plan = self._planes.get(k)
+        if plan is None:
+            plan = {"plan": [], "acciones": {}, "umbral": float("-inf"),
+                    "suscriptores": []}
+            self._planes[k] = plan
+            self._refrescar_plan(k, plan, ())
+        plan["suscriptores"].append(callback)
+        return list(plan["plan"])
+
+    def cancelar_suscripcion(self, callback, k=5):
+        plan = self._planes.get(k)
+        if plan is None or callback not in plan["suscriptores"]:
+            return False
+        plan["suscriptores"].remove(callback)
+        if not plan["suscriptores"]:
+            del self._planes[k]
+        return True
+
+    def obtener_plan(self, k=5):
+        plan = self._planes.get(k)
+        if plan is None:
+            return self.generar_plan_optimizacion(k)
+        return list(plan["plan"])
+
+    def _notificar_planes(self, ids):
+        # Un plan solo se recalcula si una ruta afectada ya está en él o si
+        # su nueva prioridad alcanza la de la k-ésima ruta del plan; en otro
+        # caso el costo es una comparación por ruta afectada
+        for k, plan in self._planes.items():
+            acciones = plan["acciones"]
+            umbral = plan["umbral"]
+            for id_ruta in ids:
+                if id_ruta in acciones or (
+                        id_ruta in self.rutas and
+                        self.rutas[id_ruta].calcular_prioridad() >= umbral):
+                    self._refrescar_plan(k, plan, ids)
+                    break
+
+    def _refrescar_plan(self, k, plan, ids):
+        # La acción solo se vuelve a calcular para las rutas nuevas en el
+        # plan y las que fueron modificadas
+        anteriores = plan["acciones"]
+        nuevo = []
+        acciones = {}
+        entran = []
+        cambian = []
+        for ruta in self._ranking(k):
+            if ruta.id in anteriores and ruta.id not in ids:
+                accion = anteriores[ruta.id]
+            else:
+                accion = self._determinar_accion_optimizacion(ruta)
+                if ruta.id not in anteriores:
+                    entran.append((ruta, accion))
+                elif accion != anteriores[ruta.id]:
+                    cambian.append((ruta, anteriores[ruta.id], accion))
+            acciones[ruta.id] = accion
+            nuevo.append((ruta, accion))
+        salen = [ruta.id for ruta, _ in plan["plan"] if ruta.id not in acciones]
+        plan["plan"] = nuevo
+        plan["acciones"] = acciones
+        if len(nuevo) < k:
+            plan["umbral"] = float("-inf")
         else:
-            return "Monitoreo continuo"
+            plan["umbral"] = nuevo[-1][0].calcular_prioridad()
+        if entran or salen or cambian:
+            diferencias = {"entran": entran, "salen": salen, "cambian": cambian}
+            for callback in list(plan["suscriptores"]):
+                callback(diferencias)
+
+    def _determinar_accion_optimizacion(self, ruta):
+        return self.tabla_decision.clasificar(ruta)
+
+    def cargar_reglas(self, tabla):
+        # tabla: TablaDecision o ruta a un JSON de reglas; los planes vivos
+        # vuelven a evaluar la acción de todas sus rutas
+        if not isinstance(tabla, TablaDecision):
+            tabla = TablaDecision.desde_json(tabla)
+        self.tabla_decision = tabla
+        for k, plan in self._planes.items():
+            self._refrescar_plan(k, plan, plan["acciones"].keys())
+
+    def clasificar_red(self):
+        # Acción recomendada para todas las rutas en bloque: {acción: ids}
+        codigos = self.tabla_decision.clasificar_rutas(self.rutas.values())
+        return self.tabla_decision.agrupar(list(self.rutas), codigos)
+
+class SistemaTransporteColumnar(SistemaTransporte):
+    # Misma API que SistemaTransporte sobre un almacenamiento columnar en
+    # NumPy: no hay objetos Ruta ni heap, la prioridad se calcula en bloque
+    # y las rutas críticas se eligen con argmax/argpartition
+    def __init__(self, capacidad=1024, pesos=None):
+        super().__init__(pesos)
+        # El almacén reemplaza al diccionario de rutas y al heap
+        self.almacen = AlmacenColumnar(self.pesos.factores, capacidad)
+        self.rutas = VistaRutas(self.almacen)
+        self.heap_rutas_criticas = None
+
+    def agregar_ruta(self, ruta):
+        self.almacen.agregar_lote([ruta])
+        self._sincronizar_nuevas((ruta.id,))
+
+    def agregar_rutas(self, lote):
+        lote = list(lote)
+        self.almacen.agregar_lote(lote)
+        self._sincronizar_nuevas({ruta.id for ruta in lote})
+
+    def actualizar_ruta(self, id_ruta, **kwargs):
+        if id_ruta not in self.rutas:
+            return False
+
+        ruta = self.rutas[id_ruta]
+
+        for attr, value in kwargs.items():
+            if hasattr(ruta, attr):
+                setattr(ruta, attr, value)
+
+        ruta.ultima_actualizacion = self.reloj()
+        if self._red is not None and ("origen" in kwargs or "destino" in kwargs):
+            self._red.agregar(id_ruta, ruta.origen, ruta.destino)
+
+        self._reubicar({id_ruta: ruta}, [(id_ruta, campo, valor) for campo, valor in kwargs.items()],
+                       ruta.ultima_actualizacion)
+        return True
+
+    def aplicar_lote(self, cambios):
+        # Los cambios se agrupan por columna y se escriben con asignaciones
+        # vectorizadas; la prioridad se recalcula una vez para las afectadas
+        tocadas = {}
+        columnas = {}
+        if self._persistencia is not None:
+            cambios = list(cambios)
+        for id_ruta, campo, valor in cambios:
+            slot = self.almacen.slots.get(id_ruta)
+            if slot is None:
+                continue
+            tocadas[id_ruta] = slot
+            if campo in self.almacen.columnas:
+                columnas.setdefault(campo, {})[slot] = valor
+            elif campo in self.almacen.textos or campo == "ultima_actualizacion":
+                self.almacen.escribir(slot, campo, valor)
+                if self._red is not None and (campo == "origen" or campo == "destino"):
+                    self._red.agregar(id_ruta, self.almacen.textos["origen"][slot],
+                                      self.almacen.textos["destino"][slot])
+
+        self.almacen.escribir_lote(columnas)
+        slots = list(tocadas.values())
+        ahora = self.reloj()
+        self.almacen.actualizacion[slots] = ahora.timestamp()
+        self.almacen.recalcular(slots)
+        self.almacen.activa[slots] = True
+        if self._indices is not None or self._orden is not None or \
+                self._frescura is not None or self._persistencia is not None:
+            # los índices y la persistencia guardan vistas, no slots
+            tocadas = {id_ruta: RutaColumnar(self.almacen, slot)
+                       for id_ruta, slot in tocadas.items()}
+        self._sincronizar(tocadas, cambios, ahora)
+
+        return len(tocadas)
+
+    def _reubicar(self, tocadas, cambios=None, ahora=None):
+        # Igual que en el heap, una ruta ya procesada vuelve a quedar pendiente
+        for id_ruta in tocadas:
+            self.almacen.activa[self.almacen.slots[id_ruta]] = True
+        self._sincronizar(tocadas, cambios, ahora)
+
+    def obtener_ruta_mas_critica(self):
+        slot = self.almacen.mas_critica()
+        if slot is None:
+            return None
+        return RutaColumnar(self.almacen, slot)
+
+    def procesar_ruta_critica(self):
+        slot = self.almacen.mas_critica()
+        if slot is None:
+            return None
+        self.almacen.activa[slot] = False
+        ruta = RutaColumnar(self.almacen, slot)
+        if self._planes:
+            self._notificar_planes((ruta.id,))
+        return ruta
+
+    def _expirar(self, rutas):
+        ids = [ruta.id for ruta in rutas]
+        self.almacen.activa[[self.almacen.slots[id_ruta] for id_ruta in ids]] = False
+        if self._planes:
+            self._notificar_planes(ids)
+
+    def asignar_vehiculos(self, vehiculos):
+        # Sin heap: solo las V rutas más críticas pueden recibir alguno de
+        # los V vehículos, se eligen con argpartition y el reparto se hace
+        # con un heapq sobre ellas, O(n + V log V); los recursos finales se
+        # escriben con un solo aplicar_lote
+        almacen = self.almacen
+        c = almacen.columnas
+        candidatas = [(-almacen.prioridad[slot].item(), slot) for slot in almacen.top_k(vehiculos)]
+        heapq.heapify(candidatas)
+        asignacion = {}
+        for _ in range(vehiculos if candidatas else 0):
+            _, slot = candidatas[0]
+            n = asignacion.get(slot, 0) + 1
+            asignacion[slot] = n
+            prioridad = prioridad_ruta(almacen.factores, c["densidad_pasajeros"][slot].item(),
+                                       c["retraso_acumulado"][slot].item(),
+                                       c["importancia_conexion"][slot].item(),
+                                       c["recursos_disponibles"][slot].item() + n)
+            heapq.heapreplace(candidatas, (-prioridad, slot))
+        self.aplicar_lote([(almacen.ids[slot].item(), "recursos_disponibles",
+                            c["recursos_disponibles"][slot].item() + n)
+                           for slot, n in asignacion.items()])
+        return {almacen.ids[slot].item(): n for slot, n in asignacion.items()}
+
+    def _ranking(self, k):
+        return [RutaColumnar(self.almacen, slot) for slot in self.almacen.top_k(k)]
+
+    def fork(self):
+        # Sin objetos Ruta ni heap que compartir, el escenario copia los
+        # arreglos del almacén en bloque (memcpy), no ruta por ruta; con su
+        # propia copia de los pesos
+        escenario = type(self)(pesos=self.pesos.copiar())
+        escenario.reloj = self.reloj
+        if "tabla_decision" in vars(self):
+            escenario.tabla_decision = self.tabla_decision
+        escenario.almacen = self.almacen.copiar()
+        escenario.rutas = VistaRutas(escenario.almacen)
+        return escenario
+
+    def guardar_snapshot(self, path):
+        # Mismo formato que con heap: las rutas pendientes van primero
+        # ordenadas por (-prioridad, slot), un arreglo ordenado ya es un
+        # heap válido, y el slot hace de secuencia; así el snapshot se puede
+        # cargar con cualquiera de los dos sistemas
+        almacen = self.almacen
+        pendientes = [(slot, RutaColumnar(almacen, slot)) for slot in almacen.top_k(almacen.size)]
+        procesadas = (RutaColumnar(almacen, slot) for slot in range(almacen.size)
+                      if not almacen.activa[slot])
+        _escribir_snapshot(path, self.pesos.factores, almacen.size, almacen.size,
+                           pendientes, procesadas)
+
+    @classmethod
+    def cargar_snapshot(cls, path):
+        # Las rutas entran al almacén en el orden del archivo con una sola
+        # carga por columnas; las procesadas quedan inactivas
+        pesos, _, _, registros = _leer_snapshot(path)
+        sistema = cls(capacidad=len(registros), pesos=pesos)
+        with pausar_gc():
+            sistema.almacen.agregar_lote(_desempacar_ruta(registro, pesos) for registro in registros)
+        procesadas = [slot for slot, registro in enumerate(registros) if registro[7] < 0]
+        sistema.almacen.activa[procesadas] = False
+        return sistema
+
+    def prioridad_total(self):
+        return float(self.almacen.prioridad[:self.almacen.size].sum())
+
+    def exportar_rutas(self, formato="csv", archivo=None):
+        # las filas salen de las columnas del almacén por bloques, sin vistas
+        salida = crear_salida(formato, archivo)
+        return salida.volcar(ENCABEZADOS_RUTAS, filas_almacen(self.almacen))
+
+    @property
+    def red(self):
+        # se construye leyendo las listas de texto del almacén, sin vistas
+        if self._red is None:
+            self._red = RedTerminales()
+            origenes = self.almacen.textos["origen"]
+            destinos = self.almacen.textos["destino"]
+            for id_ruta, slot in self.almacen.slots.items():
+                self._red.agregar(id_ruta, origenes[slot], destinos[slot])
+        return self._red
+
+    def _cambios_retraso(self, incrementos):
+        slots = self.almacen.slots
+        retrasos = self.almacen.columnas["retraso_acumulado"][
+            [slots[id_ruta] for id_ruta in incrementos]].tolist()
+        return [(id_ruta, "retraso_acumulado", retraso + incremento)
+                for (id_ruta, incremento), retraso in zip(incrementos.items(), retrasos)]
+
+    def _reponderar(self):
+        # una sola expresión vectorizada; no hay heap que reconstruir
+        self.almacen.factores = self.pesos.factores
+        self.almacen.recalcular()
+        self._indices = None
+        self._orden = None
+        if self._persistencia is not None:
+            self._persistencia.registrar_pesos(self.pesos.factores)
+        for k, plan in self._planes.items():
+            self._refrescar_plan(k, plan, ())
+
+    def clasificar_red(self):
+        # Las máscaras se evalúan directamente sobre las columnas del almacén
+        codigos = self.tabla_decision.clasificar_columnas(self.almacen.columnas,
+                                                          self.almacen.size)
+        return self.tabla_decision.agrupar(self.almacen.ids[:self.almacen.size], codigos)
+
+# Cambio que produce cada tipo de evento sobre una ruta: (id_ruta, valor) -> (id_ruta, campo, valor)
+def _cambio_densidad(sistema, id_ruta, valor):
+    return (id_ruta, "densidad_pasajeros", valor)
+
+def _cambio_retraso(sistema, id_ruta, valor):
+    return (id_ruta, "retraso_acumulado", sistema.rutas[id_ruta].retraso_acumulado + valor)
+
+def _cambio_recursos(sistema, id_ruta, valor):
+    return (id_ruta, "recursos_disponibles", sistema.rutas[id_ruta].recursos_disponibles + valor)
+
+def _cambio_conectividad(sistema, id_ruta, valor):
+    return (id_ruta, "importancia_conexion", valor)
+
+CAMBIOS_POR_EVENTO = {
+    "hora pico": _cambio_densidad,
+    "evento": _cambio_densidad,
+    "desaceleración": _cambio_densidad,
+    "accidente": _cambio_retraso,
+    "congestión": _cambio_retraso,
+    "refuerzo": _cambio_recursos,
+    "conectividad": _cambio_conectividad,
+}
+
+# Cambios que suman el valor del evento al de la ruta en lugar de reemplazarlo
+_CAMBIOS_INCREMENTO = (_cambio_retraso, _cambio_recursos)
+
+def cambios_evento(sistema, cambio, cambios):
+    # Cambios (id_ruta, campo, valor) de un evento [(id_ruta, valor)] para
+    # aplicar_lote; cada cambio se calcula con el estado previo al lote, por
+    # eso los incrementos sobre una misma ruta se suman antes, igual que si
+    # se aplicaran uno por uno
+    if cambio in _CAMBIOS_INCREMENTO:
+        incrementos = {}
+        for id_ruta, valor in cambios:
+            incrementos[id_ruta] = incrementos.get(id_ruta, 0) + valor
+        cambios = incrementos.items()
+    return [cambio(sistema, id_ruta, valor) for id_ruta, valor in cambios]
+
+def registrar_eventos(simulador, sistema, despues=None):
+    # Registra en el simulador un manejador por tipo de evento; cada evento
+    # lleva una lista [(id_ruta, valor)] que se aplica al sistema como un lote.
+    # despues(simulador, tipo, sistema) se invoca tras aplicar cada evento
+    for tipo, cambio in CAMBIOS_POR_EVENTO.items():
+        simulador.registrar(tipo, _manejador_evento(sistema, tipo, cambio, despues))
+    sistema.reloj = simulador.fecha
+
+def _manejador_evento(sistema, tipo, cambio, despues):
+    def manejar(simulador, cambios):
+        sistema.aplicar_lote(cambios_evento(sistema, cambio, cambios))
+        if despues is not None:
+            despues(simulador, tipo, sistema)
+    return manejar
 
 # Demostración
 def demostrar_sistema():
@@ -151,7 +1185,9 @@ def demostrar_sistema():
 if __name__ == "__main__":
     demostrar_sistema()
 
-def simular_dia_operativo():
+def simular_dia_operativo(formato="tabla", archivo=None):
+    # formato y archivo de la salida del plan tras cada evento, ver
+    # Transporte/reportes.py
     sistema = SistemaTransporte()
     now = datetime.now()
 
@@ -179,35 +1215,28 @@ def simular_dia_operativo():
         ("21:00", "desaceleración", [(1, 0.5), (2, 0.4), (5, 0.2)]),  # baja la densidad en la noche
     ]
 
-    print("\n=== Simulación de un día operativo ===\n")
+    medianoche = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    simulador = Simulador(inicio=medianoche)
+    registrar_eventos(simulador, sistema,
+                      despues=functools.partial(_mostrar_estado, formato=formato, archivo=archivo))
     for hora, tipo_evento, cambios in eventos:
-        print(f"\n[{hora}] Evento: {tipo_evento}")
-        for id_ruta, valor in cambios:
-            if tipo_evento in ["hora pico", "evento", "desaceleración"]:
-                sistema.actualizar_ruta(id_ruta, densidad_pasajeros=valor)
-            elif tipo_evento == "accidente":
-                sistema.simular_evento_trafico(id_ruta, valor)
-            elif tipo_evento == "refuerzo":
-                ruta = sistema.rutas[id_ruta]
-                sistema.actualizar_ruta(id_ruta, recursos_disponibles=ruta.recursos_disponibles + valor)
-            elif tipo_evento == "conectividad":
-                sistema.actualizar_ruta(id_ruta, importancia_conexion=valor)
-            elif tipo_evento == "congestión":
-                sistema.simular_evento_trafico(id_ruta, valor)
-
-        # Mostrar la ruta más crítica después de cada evento
-        ruta_critica = sistema.obtener_ruta_mas_critica()
-        if ruta_critica:
-            print(f"Ruta más crítica: {ruta_critica.nombre} - Prioridad = {ruta_critica.calcular_prioridad():.2f}")
-
-        # Mostrar plan de optimización tras evento
-        plan = sistema.generar_plan_optimizacion()
-        headers = ["Ruta", "Acción sugerida", "Prioridad"]
-        tabla = [
-            [ruta.nombre, accion, f"{ruta.calcular_prioridad():.2f}"]
-            for ruta, accion in plan
-        ]
-        print(tabulate(tabla, headers=headers, tablefmt="fancy_grid"))
+        horas, minutos = hora.split(":")
+        simulador.programar(int(horas) * 60 + int(minutos), tipo_evento, cambios)
+
+    print("\n=== Simulación de un día operativo ===\n")
+    simulador.ejecutar()
+
+
+def _mostrar_estado(simulador, tipo_evento, sistema, formato="tabla", archivo=None):
+    print(f"\n[{simulador.fecha():%H:%M}] Evento: {tipo_evento}")
+
+    # Mostrar la ruta más crítica después de cada evento
+    ruta_critica = sistema.obtener_ruta_mas_critica()
+    if ruta_critica:
+        print(f"Ruta más crítica: {ruta_critica.nombre} - Prioridad = {ruta_critica.calcular_prioridad():.2f}")
+
+    # Mostrar plan de optimización tras evento
+    sistema.exportar_plan(formato, archivo)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,43 @@
+import pytest
+
+from Transporte.benchmark.generadores import generar_red
+from Transporte.fragmentos import SistemaFragmentado
+from Transporte.sistema import SistemaTransporte
+
+
+def test_mismo_resultado_que_un_sistema():
+    rutas = generar_red(300, 4)
+    sistema = SistemaTransporte()
+    sistema.agregar_rutas(generar_red(300, 4))
+    with SistemaFragmentado(3) as fragmentado:
+        fragmentado.agregar_rutas(rutas)
+        cambios = [(i, "retraso_acumulado", i % 17) for i in range(0, 300, 7)]
+        fragmentado.aplicar_lote(cambios)
+        sistema.aplicar_lote(cambios)
+        plan = fragmentado.generar_plan_optimizacion(10)
+        esperado = sistema.generar_plan_optimizacion(10)
+        assert [ruta.calcular_prioridad() for ruta, _ in plan] == \
+            pytest.approx([ruta.calcular_prioridad() for ruta, _ in esperado])
+
+
+def test_error_en_consulta_vuelve_al_coordinador():
+    with SistemaFragmentado(2) as fragmentado:
+        fragmentado.agregar_rutas(generar_red(50))
+        with pytest.raises(AttributeError):
+            fragmentado._consultar_todos("no_existe")
+        # los fragmentos siguen vivos y los pipes en orden
+        assert fragmentado.obtener_ruta_mas_critica() is not None
+        assert len(fragmentado.generar_plan_optimizacion(5)) == 5
+
+
+def test_error_sin_respuesta_no_detiene_el_fragmento():
+    with SistemaFragmentado(2) as fragmentado:
+        fragmentado.agregar_rutas(generar_red(50))
+        fragmentado.actualizar_ruta(3, retraso_acumulado="x")
+        fragmentado.actualizar_ruta(4, retraso_acumulado=99)
+        assert fragmentado.obtener_ruta_mas_critica().id == 4
+        errores = fragmentado.errores()
+        assert [(fragmento, operacion) for fragmento, operacion, _ in errores] == \
+            [(fragmentado.fragmento(3), "actualizar_ruta")]
+        assert fragmentado.errores() == []
+        assert all(proceso.is_alive() for proceso in fragmentado._procesos)
@@ -0,0 +1,75 @@
+import random
+
+import pytest
+
+from DataStructs.Trees import heap as hp
+
+
+def _es_heap(heap):
+    # ningún padre es mayor que sus hijos
+    _elements = heap["elements"]["elements"]
+    _size = heap["size"]
+    assert _size == len(_elements) == heap["elements"]["size"]
+    for idx in range(1, _size):
+        padre = _elements[(idx - 1) // 2]
+        if heap["key"] is not None:
+            assert not _elements[idx] < padre
+        else:
+            assert heap["cmp_function"](padre, _elements[idx]) <= 0
+    return True
+
+
+@pytest.mark.parametrize("key", [None, lambda x: x])
+def test_insert_delete_min_ordena(key):
+    rng = random.Random(1)
+    valores = [rng.randint(0, 50) for _ in range(200)]
+    heap = hp.new_heap(key=key)
+    for valor in valores:
+        hp.insert(heap, valor)
+    assert _es_heap(heap)
+    assert hp.get_min(heap) == min(valores)
+    salida = [hp.delete_min(heap) for _ in range(len(valores))]
+    assert salida == sorted(valores)
+    assert hp.is_empty(heap)
+    assert hp.get_min(heap) is None
+    assert hp.delete_min(heap) is None
+
+
+def test_key_desempata_por_orden_de_insercion():
+    # con llaves iguales sale primero el insertado antes y nunca se
+    # comparan los elementos, que aquí no son comparables
+    heap = hp.new_heap(key=lambda par: par[0])
+    elementos = [(1, {"n": i}) for i in range(5)] + [(0, {"n": 9})]
+    for elm in elementos:
+        hp.insert(heap, elm)
+    salida = [hp.delete_min(heap)[1]["n"] for _ in range(len(elementos))]
+    assert salida == [9, 0, 1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("key", [None, lambda x: -x])
+def test_heapify(key):
+    rng = random.Random(2)
+    valores = [rng.random() for _ in range(101)]
+    heap = hp.heapify(valores, key=key)
+    assert _es_heap(heap)
+    assert hp.size(heap) == len(valores)
+    esperado = sorted(valores, key=key)
+    assert [hp.delete_min(heap) for _ in range(len(valores))] == esperado
+
+
+@pytest.mark.parametrize("key", [None, lambda x: x])
+def test_top_k_en_orden_sin_modificar(key):
+    rng = random.Random(3)
+    valores = [rng.randint(0, 1000) for _ in range(300)]
+    heap = hp.heapify(valores, key=key)
+    antes = list(heap["elements"]["elements"])
+    for k in (0, 1, 10, 300, 500):
+        assert hp.top_k(heap, k) == sorted(valores)[:k]
+    assert heap["elements"]["elements"] == antes
+
+
+def test_cmp_function_propia():
+    heap = hp.new_heap(lambda a, b: (a < b) - (a > b))
+    for valor in [3, 9, 1, 7]:
+        hp.insert(heap, valor)
+    assert [hp.delete_min(heap) for _ in range(4)] == [9, 7, 3, 1]
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from DataStructs.Trees import idxheap as ih
+
+
+def _es_heap(heap):
+    # invariante de heap más índice coherente con el arreglo de llaves
+    _elements = heap["elements"]["elements"]
+    _keys = heap["keys"]["elements"]
+    _size = heap["size"]
+    assert _size == len(_elements) == len(_keys) == len(heap["index"])
+    for pos, key in enumerate(_keys):
+        assert heap["index"][key] == pos
+    for idx in range(1, _size):
+        padre = _elements[(idx - 1) // 2]
+        if heap["key"] is not None:
+            assert not _elements[idx] < padre
+        else:
+            assert heap["cmp_function"](padre, _elements[idx]) <= 0
+    return True
+
+
+def _nuevo(key, pares):
+    heap = ih.new_idx_heap(key=key)
+    ih.insert_all(heap, pares)
+    return heap
+
+
+@pytest.mark.parametrize("key", [None, lambda x: x])
+def test_invariante_tras_update_y_remove(key):
+    rng = random.Random(4)
+    actual = {i: rng.randint(0, 100) for i in range(300)}
+    heap = _nuevo(key, actual.items())
+    assert _es_heap(heap)
+    for paso in range(1000):
+        llave = rng.randrange(400)
+        if paso % 5 == 0:
+            assert ih.remove_key(heap, llave) == actual.pop(llave, None)
+        elif llave in actual:
+            actual[llave] = rng.randint(0, 100)
+            ih.update_key(heap, llave, actual[llave])
+        else:
+            actual[llave] = rng.randint(0, 100)
+            ih.insert(heap, llave, actual[llave])
+        assert ih.contains_key(heap, llave) == (llave in actual)
+    assert _es_heap(heap)
+    assert ih.get_min(heap) == min(actual.values())
+    assert ih.get(heap, next(iter(actual))) == actual[next(iter(actual))]
+    salida = [ih.delete_min(heap) for _ in range(len(actual))]
+    assert salida == sorted(actual.values())
+
+
+def test_update_keys_recalcula_la_key():
+    # los elementos cambian por fuera y update_keys los reubica, por
+    # separado o reconstruyendo según la cantidad
+    elementos = {i: {"p": i} for i in range(100)}
+    heap = _nuevo(lambda elm: elm["p"], elementos.items())
+    for cambiadas in ([5], list(range(0, 100, 2))):
+        for llave in cambiadas:
+            elementos[llave]["p"] = -elementos[llave]["p"] - 1000
+        ih.update_keys(heap, cambiadas)
+        assert _es_heap(heap)
+        assert ih.get_min_key(heap) == min(elementos, key=lambda k: elementos[k]["p"])
+
+
+def test_insert_repetida_falla():
+    heap = _nuevo(None, [(1, 10)])
+    with pytest.raises(KeyError):
+        ih.insert(heap, 1, 20)
+    with pytest.raises(KeyError):
+        ih.insert_all(heap, [(2, 1), (2, 2)])
+    with pytest.raises(KeyError):
+        ih.update_key(heap, 3, 5)
+
+
+@pytest.mark.parametrize("key", [None, lambda x: x])
+def test_top_k_en_orden(key):
+    rng = random.Random(5)
+    valores = {i: rng.random() for i in range(250)}
+    heap = _nuevo(key, valores.items())
+    for k in (0, 1, 7, 250, 300):
+        assert ih.top_k(heap, k) == sorted(valores.values())[:k]
+
+
+def test_dump_restore_ida_y_vuelta():
+    rng = random.Random(6)
+    heap = _nuevo(lambda x: x, [(i, rng.random()) for i in range(200)])
+    ih.remove_key(heap, 17)
+    llaves, entradas, seq = ih.dump(heap)
+    copia = ih.new_idx_heap(key=lambda x: x)
+    ih.restore(copia, llaves, entradas, seq)
+    assert copia["elements"]["elements"] == heap["elements"]["elements"]
+    assert copia["index"] == heap["index"]
+    assert _es_heap(copia)
+    # la secuencia continúa donde quedó el original
+    ih.insert(copia, 500, 0.5)
+    ih.insert(heap, 500, 0.5)
+    assert ih.dump(copia) == ih.dump(heap)
+
+
+def test_restore_sin_orden_reconstruye():
+    entradas = [(float(v), i, v) for i, v in enumerate([9, 3, 7, 1])]
+    heap = ih.new_idx_heap(key=float)
+    ih.restore(heap, ["a", "b", "c", "d"], entradas, 4, ordered=False)
+    assert _es_heap(heap)
+    assert ih.get_min_key(heap) == "d"
+    with pytest.raises(KeyError):
+        ih.restore(heap, ["a", "a"], entradas[:2], 2)
+    with pytest.raises(ValueError):
+        ih.restore(heap, ["a"], entradas[:2], 2)
+
+
+def test_copy_es_independiente():
+    heap = _nuevo(lambda x: x, [(i, i) for i in range(50)])
+    copia = ih.copy(heap)
+    ih.update_key(copia, 40, -1)
+    ih.remove_key(copia, 0)
+    assert ih.get_min_key(heap) == 0 and ih.size(heap) == 50
+    assert ih.get_min_key(copia) == 40
+    assert _es_heap(heap) and _es_heap(copia)
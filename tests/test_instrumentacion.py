@@ -0,0 +1,87 @@
+import random
+
+from DataStructs.Trees import heap as hp
+from DataStructs.Trees import idxheap as ih
+from Utils import instrumentacion
+
+
+def _operar(semilla):
+    # misma secuencia de operaciones en modo key sobre heap e idxheap
+    rng = random.Random(semilla)
+    _heap = hp.heapify([rng.random() for _ in range(301)], key=lambda x: x)
+    for _ in range(200):
+        hp.insert(_heap, rng.random())
+    for _ in range(150):
+        hp.delete_min(_heap)
+    _idx = ih.new_idx_heap(key=lambda x: x)
+    ih.insert_all(_idx, [(i, rng.random()) for i in range(500)])
+    for i in range(600):
+        key = rng.randrange(500)
+        if ih.contains_key(_idx, key):
+            ih.update_key(_idx, key, rng.random())
+            if i % 7 == 0:
+                ih.remove_key(_idx, key)
+        elif i % 3 == 0:
+            ih.insert(_idx, key, rng.random())
+        if i % 11 == 0:
+            ih.delete_min(_idx)
+    return (list(_heap["elements"]["elements"]), list(_idx["elements"]["elements"]),
+            list(_idx["keys"]["elements"]), dict(_idx["index"]))
+
+
+def _comparaciones_sink(elementos, inicio):
+    # cuenta a mano las comparaciones de un _sink_key desde inicio
+    _size = len(elementos)
+    _entry = elementos[inicio]
+    idx = inicio
+    comparaciones = movimientos = 0
+    j = 2 * idx + 1
+    while j < _size:
+        if j + 1 < _size:
+            comparaciones += 1
+            if elementos[j + 1] < elementos[j]:
+                j += 1
+        comparaciones += 1
+        if not elementos[j] < _entry:
+            break
+        elementos[idx] = elementos[j]
+        movimientos += 1
+        idx = j
+        j = 2 * idx + 1
+    elementos[idx] = _entry
+    return comparaciones, movimientos
+
+
+def test_instrumentada_produce_el_mismo_heap():
+    normal = _operar(7)
+    instrumentacion.reiniciar()
+    instrumentacion.activar()
+    try:
+        medida = _operar(7)
+        contadores = instrumentacion.stats()["contadores"]
+    finally:
+        instrumentacion.desactivar()
+        instrumentacion.reiniciar()
+    assert medida == normal
+    assert contadores["idxheap.comparaciones"] > 0
+    assert contadores["idxheap.intercambios"] > 0
+    assert hp._contar is None and ih._contar is None
+
+
+def test_conteo_de_sink_coincide_con_el_recorrido():
+    rng = random.Random(3)
+    for n in range(1, 40):
+        for inicio in range(n):
+            valores = [(rng.random(), i, None) for i in range(n)]
+            _heap = hp.new_heap(key=lambda x: x)
+            _heap["elements"]["elements"] = list(valores)
+            _heap["elements"]["size"] = _heap["size"] = n
+            contados = {}
+            hp._contar = lambda nombre, c: contados.__setitem__(nombre, c)
+            try:
+                hp._sink_key(_heap, inicio)
+            finally:
+                hp._contar = None
+            esperados = _comparaciones_sink(valores, inicio)
+            assert _heap["elements"]["elements"] == valores
+            assert (contados["heap.comparaciones"], contados["heap.intercambios"]) == esperados
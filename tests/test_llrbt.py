@@ -0,0 +1,191 @@
+import random
+
+import pytest
+
+from DataStructs.List import sllt
+from DataStructs.Trees import llrbt
+from DataStructs.Trees import trnode as trn
+
+
+def _llaves(tree):
+    entradas = []
+    llrbt._collect(tree["root"], entradas)
+    return [k for k, _ in entradas]
+
+
+def _altura_negra(node):
+    # valida el subárbol y retorna su altura negra
+    if node is None:
+        return 0
+    assert not llrbt._is_red(node["right"]), "enlace rojo a la derecha"
+    if llrbt._is_red(node):
+        assert not llrbt._is_red(node["left"]), "dos rojos seguidos"
+    assert node["size"] == 1 + llrbt._size(node["left"]) + llrbt._size(node["right"])
+    if node["left"] is not None:
+        assert node["left"]["key"] < node["key"]
+    if node["right"] is not None:
+        assert node["right"]["key"] > node["key"]
+    izquierda = _altura_negra(node["left"])
+    assert izquierda == _altura_negra(node["right"]), "altura negra distinta"
+    return izquierda + (0 if llrbt._is_red(node) else 1)
+
+
+def _es_llrbt(tree):
+    if tree["root"] is not None:
+        assert tree["root"]["color"] == trn.BLACK
+    _altura_negra(tree["root"])
+    llaves = _llaves(tree)
+    assert llaves == sorted(set(llaves))
+    return True
+
+
+def _arbol(llaves):
+    tree = llrbt.new_tree()
+    for k in llaves:
+        llrbt.insert(tree, k, str(k))
+    return tree
+
+
+def test_insert_mantiene_invariantes():
+    rng = random.Random(8)
+    llaves = rng.sample(range(10000), 500)
+    tree = _arbol(llaves)
+    assert _es_llrbt(tree)
+    assert llrbt.size(tree) == 500
+    assert _llaves(tree) == sorted(llaves)
+    # reinsertar una llave reemplaza el valor sin crecer
+    llrbt.insert(tree, llaves[0], "otro")
+    assert llrbt.size(tree) == 500
+    assert llrbt.get(tree, llaves[0])["value"] == "otro"
+
+
+@pytest.mark.parametrize("n", [0, 1, 2, 3, 7, 8, 26, 27, 100, 1000])
+def test_insert_all_en_arbol_vacio(n):
+    rng = random.Random(n)
+    pares = [(k, str(k)) for k in rng.sample(range(5 * n + 1), n)]
+    tree = llrbt.new_tree()
+    llrbt.insert_all(tree, pares)
+    assert _es_llrbt(tree)
+    assert _llaves(tree) == sorted(k for k, _ in pares)
+
+
+def test_insert_all_combina_con_el_arbol():
+    tree = _arbol(range(0, 100, 2))
+    # lote grande: se reconstruye y ante repetidas gana el último valor
+    llrbt.insert_all(tree, [(k, "nuevo") for k in range(0, 200, 3)] + [(3, "último")])
+    assert _es_llrbt(tree)
+    assert _llaves(tree) == sorted(set(range(0, 100, 2)) | set(range(0, 200, 3)))
+    assert llrbt.get(tree, 3)["value"] == "último"
+    assert llrbt.get(tree, 4)["value"] == "4"
+    # lote pequeño: se inserta uno a uno
+    llrbt.insert_all(tree, [(1001, "a"), (1002, "b")])
+    assert _es_llrbt(tree)
+    assert llrbt.max(tree) == 1002
+
+
+def test_insert_all_con_cmp_propia():
+    tree = llrbt.new_tree(lambda a, b: (a < b) - (a > b))
+    llrbt.insert_all(tree, [(k, k) for k in range(20)])
+    assert llrbt.min(tree) == 19 and llrbt.max(tree) == 0
+    assert llrbt.select(tree, 0)["key"] == 19
+
+
+def test_rank_select_range_contra_lista_ordenada():
+    rng = random.Random(9)
+    llaves = sorted(rng.sample(range(2000), 300))
+    tree = llrbt.new_tree()
+    llrbt.insert_all(tree, [(k, k) for k in llaves])
+    for pos, k in enumerate(llaves):
+        assert llrbt.rank(tree, k) == pos
+        assert llrbt.select(tree, pos)["key"] == k
+    for _ in range(100):
+        bajo, alto = sorted(rng.sample(range(-10, 2010), 2))
+        esperadas = [k for k in llaves if bajo <= k <= alto]
+        assert [nodo["key"] for nodo in sllt.iterator(llrbt.range(tree, bajo, alto))] == esperadas
+        assert list(sllt.iterator(llrbt.keys(tree, bajo, alto))) == esperadas
+        assert list(sllt.iterator(llrbt.values(tree, bajo, alto))) == esperadas
+        assert [(e["key"], e["value"]) for e in sllt.iterator(llrbt.entries(tree, bajo, alto))] \
+            == [(k, k) for k in esperadas]
+
+
+def test_range_no_visita_subarboles_fuera_del_rango():
+    # el recorrido poda: compara solo con los nodos del camino y del rango
+    tree = llrbt.new_tree()
+    llrbt.insert_all(tree, [(k, k) for k in range(1024)])
+    visitas = []
+
+    def cmp(a, b):
+        visitas.append(b)
+        return (a > b) - (a < b)
+    llrbt._keys(tree["root"], 500, 505, cmp, sllt.new_list())
+    assert len(set(visitas)) < 40
+
+
+def test_remove_mantiene_invariantes():
+    rng = random.Random(10)
+    llaves = set(rng.sample(range(5000), 400))
+    tree = llrbt.new_tree()
+    llrbt.insert_all(tree, [(k, k) for k in llaves])
+    for k in rng.sample(sorted(llaves), 300):
+        llrbt.remove(tree, k)
+        llaves.discard(k)
+        assert _es_llrbt(tree)
+        assert not llrbt.contains(tree, k)
+    assert _llaves(tree) == sorted(llaves)
+    for k in sorted(llaves):
+        llrbt.remove(tree, k)
+    assert llrbt.is_empty(tree)
+
+
+# regresiones de los errores corregidos en llrbt.py
+
+def test_raiz_negra_tras_insert():
+    tree = llrbt.new_tree()
+    llrbt.insert(tree, 1, "a")
+    assert tree["root"]["color"] == trn.BLACK
+    llrbt.insert(tree, 2, "b")
+    assert tree["root"]["color"] == trn.BLACK
+
+
+def test_min_max():
+    tree = _arbol([5, 2, 8, 1, 9, 3])
+    assert llrbt.min(tree) == 1
+    assert llrbt.max(tree) == 9
+    assert llrbt.min(llrbt.new_tree()) is None
+
+
+def test_height_usa_max_nativo():
+    assert llrbt.height(llrbt.new_tree()) == -1
+    assert llrbt.height(_arbol([1])) == 0
+    tree = _arbol(range(1000))
+    # un LLRB con n nodos tiene altura menor que 2 log2(n)
+    assert 9 <= llrbt.height(tree) < 20
+
+
+def test_remove_compara_de_nuevo_tras_rotar():
+    # quitar cada llave de un árbol con nodos 3 pasa por las rotaciones
+    # a la derecha dentro de _remove
+    for n in range(1, 40):
+        for k in range(n):
+            tree = _arbol(range(n))
+            llrbt.remove(tree, k)
+            assert _es_llrbt(tree)
+            assert _llaves(tree) == [x for x in range(n) if x != k]
+
+
+def test_remove_de_llave_ausente():
+    tree = _arbol([1, 2, 3])
+    antes = _llaves(tree)
+    assert llrbt.remove(tree, 99) is tree
+    assert _llaves(tree) == antes and _es_llrbt(tree)
+    vacio = llrbt.new_tree()
+    llrbt.remove(vacio, 1)
+    assert llrbt.is_empty(vacio)
+
+
+def test_recorridos_de_rango_implementados():
+    tree = _arbol([4, 1, 3, 2])
+    assert list(sllt.iterator(llrbt.keys(tree, 2, 3))) == [2, 3]
+    assert list(sllt.iterator(llrbt.values(tree, 0, 10))) == ["1", "2", "3", "4"]
+    assert sllt.size(llrbt.range(tree, 5, 10)) == 0
+    assert [e["key"] for e in sllt.iterator(llrbt.entries(tree, 1, 1))] == [1]
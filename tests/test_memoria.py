@@ -0,0 +1,18 @@
+import gc
+
+from Utils.memoria import LOTE_MINIMO_GC, pausar_gc
+
+
+def test_pausar_gc_restaura_el_estado():
+    assert gc.isenabled()
+    with pausar_gc():
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+def test_lote_pequeno_no_pausa():
+    with pausar_gc(range(LOTE_MINIMO_GC - 1)):
+        assert gc.isenabled()
+    with pausar_gc(range(LOTE_MINIMO_GC)):
+        assert not gc.isenabled()
+    assert gc.isenabled()
@@ -0,0 +1,27 @@
+import pytest
+
+from Transporte.benchmark.generadores import generar_red
+from Transporte.montecarlo import main, simular_dias
+from Transporte.sistema import SistemaTransporte
+
+
+def _sistema(n=50):
+    sistema = SistemaTransporte()
+    sistema.agregar_rutas(generar_red(n))
+    return sistema
+
+
+def test_mismos_dias_en_proceso_y_en_paralelo():
+    sistema = _sistema()
+    local = simular_dias(sistema, 6, semilla=3, procesos=0)
+    paralelo = simular_dias(sistema, 6, semilla=3, procesos=2)
+    assert local["semillas"] == [3, 8]
+    assert local["minutos_critica"] == paralelo["minutos_critica"]
+    assert local["pico"] == paralelo["pico"]
+
+
+def test_rechaza_cero_dias():
+    with pytest.raises(ValueError):
+        simular_dias(_sistema(), 0, procesos=0)
+    with pytest.raises(SystemExit):
+        main(["--rutas", "10", "--dias", "0"])
@@ -0,0 +1,57 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from Transporte.benchmark.generadores import generar_red
+from Transporte.sistema import modulo as ht
+
+
+def _estado(sistema):
+    return {id_ruta: (ruta.nombre, ruta.origen, ruta.destino, ruta.densidad_pasajeros,
+                      ruta.retraso_acumulado, ruta.importancia_conexion,
+                      ruta.recursos_disponibles, ruta.ultima_actualizacion.timestamp())
+            for id_ruta, ruta in sistema.rutas.items()}
+
+
+def _caer(persistencia):
+    # detiene el hilo y escribe el diario sin checkpoint, como si el
+    # proceso terminara entre dos checkpoints
+    persistencia._detener.set()
+    persistencia._hilo.join()
+    persistencia.vaciar(checkpoint=False)
+    persistencia.conexion.close()
+
+
+@pytest.mark.parametrize("clase", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+def test_recuperar_reaplica_el_diario(tmp_path, clase):
+    path = str(tmp_path / "rutas.db")
+    hora = [datetime(2026, 1, 1, 8)]
+    sistema = clase()
+    sistema.reloj = lambda: hora[0]
+    sistema.agregar_rutas(generar_red(100, 6))
+    persistencia = sistema.persistir(path, intervalo=3600, checkpoint_cada=1000)
+    for i in range(60):
+        hora[0] += timedelta(seconds=30)
+        sistema.actualizar_ruta(i % 100, retraso_acumulado=i)
+        sistema.aplicar_lote([((i * 7) % 100, "densidad_pasajeros", i / 100),
+                              ((i * 3) % 100, "destino", f"T{i % 4}")])
+        if i % 20 == 0:
+            sistema.simular_evento_trafico(i, 4, propagar=0.5)
+    sistema.agregar_ruta(ht.Ruta(500, "Línea 500", "A", "B", 0.5, 1, 0.5, 1, hora[0]))
+    sistema.cambiar_pesos(demanda=15)
+    sistema.procesar_ruta_critica()
+    _caer(persistencia)
+    with sqlite3.connect(path) as conexion:
+        cola = conexion.execute("SELECT COUNT(*) FROM diario WHERE seq > "
+                                "(SELECT valor FROM meta WHERE llave = 'checkpoint')").fetchone()[0]
+    assert cola > 0
+
+    recuperado = clase.recuperar(path)
+    try:
+        assert _estado(recuperado) == _estado(sistema)
+        assert recuperado.pesos.factores == sistema.pesos.factores
+        assert recuperado.obtener_ruta_mas_critica().calcular_prioridad() == pytest.approx(
+            max(ruta.calcular_prioridad() for ruta in sistema.rutas.values()))
+    finally:
+        recuperado.dejar_de_persistir()
@@ -0,0 +1,37 @@
+import io
+
+import pytest
+
+from Transporte.reportes import ENCABEZADOS_PLAN, Salida, crear_salida, filas_plan
+from Transporte.sistema import Ruta
+
+
+def _plan():
+    ruta = Ruta(1, "Línea 1", "A", "B", 0.333, 3, 0.271, 2, None)
+    return [(ruta, "Monitoreo continuo")], ruta.calcular_prioridad()
+
+
+def test_salida_sin_escribir_falla_al_crearla():
+    class Incompleta(Salida):
+        pass
+
+    with pytest.raises(TypeError):
+        Incompleta()
+
+
+def test_csv_conserva_la_prioridad():
+    plan, prioridad = _plan()
+    archivo = io.StringIO()
+    crear_salida("csv", archivo).volcar(ENCABEZADOS_PLAN, filas_plan(plan))
+    assert archivo.getvalue().splitlines()[1].split(",")[-1] == repr(prioridad)
+
+
+@pytest.mark.parametrize("formato", ["fijo", "tabla"])
+def test_texto_con_dos_decimales(formato):
+    if formato == "tabla":
+        pytest.importorskip("tabulate")
+    plan, prioridad = _plan()
+    archivo = io.StringIO()
+    crear_salida(formato, archivo).volcar(ENCABEZADOS_PLAN, filas_plan(plan))
+    assert f"{prioridad:.2f}" in archivo.getvalue()
+    assert repr(prioridad) not in archivo.getvalue()
@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from Transporte.benchmark.generadores import generar_red
+from Transporte.servicio import ServicioTransporte
+from Transporte.sistema import SistemaTransporte, SistemaTransporteColumnar
+
+
+async def _pedir(servicio, pedidos):
+    # envía los pedidos por una conexión y retorna las respuestas en orden
+    host, puerto = await servicio.iniciar()
+    reader, writer = await asyncio.open_connection(host, puerto)
+    respuestas = []
+    for pedido in pedidos:
+        writer.write(json.dumps(pedido).encode("utf-8") + b"\n")
+        respuestas.append(json.loads(await reader.readline()))
+    writer.close()
+    await servicio.detener()
+    return respuestas
+
+
+@pytest.mark.parametrize("clase", [SistemaTransporte, SistemaTransporteColumnar])
+def test_rechaza_cambios_invalidos_antes_de_confirmar(clase):
+    sistema = clase()
+    sistema.agregar_rutas(generar_red(50))
+    retraso = sistema.rutas[1].retraso_acumulado
+    servicio = ServicioTransporte(sistema)
+    pedidos = [
+        ({"op": "cambios", "cambios": [[1, "id", 5]]}, False),
+        ({"op": "cambios", "cambios": [[1, "retraso_acumulado", True]]}, False),
+        ({"op": "cambios", "cambios": [[1, "nombre", 3]]}, False),
+        ({"op": "cambios", "cambios": [[999, "nombre", "x"]]}, False),
+        ({"op": "cambios", "cambios": [[[1], "nombre", "x"]]}, False),
+        ({"op": "evento", "tipo": "accidente", "cambios": [[999, 3]]}, False),
+        ({"op": "evento", "tipo": "accidente", "cambios": [[1, "3"]]}, False),
+        ({"op": "evento", "tipo": "accidente", "cambios": [[1, 3]]}, True),
+        ({"op": "cambios", "cambios": [[2, "nombre", "Nueva"], [2, "densidad_pasajeros", 0.5]]}, True),
+    ]
+    respuestas = asyncio.run(_pedir(servicio, [pedido for pedido, _ in pedidos]))
+    assert [respuesta["ok"] for respuesta in respuestas] == [ok for _, ok in pedidos]
+    assert sistema.rutas[1].retraso_acumulado == retraso + 3
+    assert sistema.rutas[2].nombre == "Nueva"
+    assert servicio.contadores["rechazados"] == 7
+    assert servicio.contadores["lotes_fallidos"] == 0
+
+
+def test_lote_fallido_se_aplica_de_a_uno():
+    sistema = SistemaTransporte()
+    sistema.agregar_rutas(generar_red(50))
+    aplicar_lote = sistema.aplicar_lote
+
+    def fallar_con_negativos(cambios):
+        if any(valor == -1 for _, _, valor in cambios):
+            raise ValueError("valor inválido")
+        return aplicar_lote(cambios)
+
+    sistema.aplicar_lote = fallar_con_negativos
+    servicio = ServicioTransporte(sistema)
+
+    async def correr():
+        await servicio.iniciar()
+        servicio.cola.put_nowait((None, [[3, "densidad_pasajeros", 0.1]]))
+        servicio.cola.put_nowait((None, [[4, "densidad_pasajeros", -1]]))
+        await servicio.detener()
+
+    asyncio.run(correr())
+    assert servicio.contadores["lotes_fallidos"] == 1
+    assert servicio.contadores["eventos_fallidos"] == 1
+    assert sistema.rutas[3].densidad_pasajeros == 0.1
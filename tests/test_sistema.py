@@ -0,0 +1,266 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from DataStructs.Trees import idxheap as ih
+from Transporte.benchmark.generadores import generar_red
+from Transporte.montecarlo import simular_dia
+from Transporte.simulacion import Simulador
+from Transporte.sistema import modulo as ht
+
+
+def _sistema(n=200, semilla=0, clase=None, pesos=None):
+    sistema = (clase or ht.SistemaTransporte)(pesos=pesos)
+    sistema.agregar_rutas(generar_red(n, semilla))
+    return sistema
+
+
+def _prioridades_heap(sistema):
+    # vacía una copia del heap y retorna las prioridades en el orden de salida
+    heap = ih.copy(sistema.heap_rutas_criticas)
+    salida = []
+    while not ih.is_empty(heap):
+        salida.append(ih.delete_min(heap).calcular_prioridad())
+    return salida
+
+
+def _prioridades_bruto(sistema):
+    return sorted((ruta.calcular_prioridad() for ruta in sistema.rutas.values()), reverse=True)
+
+
+def _estado(sistema):
+    return {id_ruta: (ruta.densidad_pasajeros, ruta.retraso_acumulado,
+                      ruta.importancia_conexion, ruta.recursos_disponibles)
+            for id_ruta, ruta in sistema.rutas.items()}
+
+
+def _reloj_fijo(sistema, hora=datetime(2026, 1, 1, 8)):
+    sistema.reloj = lambda: hora
+    return sistema
+
+
+# --- aplicar_lote ---
+
+@pytest.mark.parametrize("clase", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+def test_aplicar_lote_igual_que_actualizar_ruta(clase):
+    rng = random.Random(5)
+    rutas = generar_red(300)
+    lote = _reloj_fijo(clase())
+    lote.agregar_rutas(rutas)
+    secuencial = _reloj_fijo(clase())
+    secuencial.agregar_rutas([ruta.copiar() for ruta in rutas])
+    for _ in range(3):
+        lote.procesar_ruta_critica()
+        secuencial.procesar_ruta_critica()
+    cambios = []
+    for _ in range(200):
+        campo = rng.choice(ht.CAMPOS_PRIORIDAD + ("origen", "nombre"))
+        if campo in ("retraso_acumulado", "recursos_disponibles"):
+            valor = rng.randrange(0, 30)
+        elif campo in ("origen", "nombre"):
+            valor = f"T{rng.randrange(5)}"
+        else:
+            valor = rng.random()
+        # incluye ids repetidos y uno que no existe
+        cambios.append((rng.choice([rng.randrange(300), 999]), campo, valor))
+    tocadas = lote.aplicar_lote(cambios)
+    for id_ruta, campo, valor in cambios:
+        secuencial.actualizar_ruta(id_ruta, **{campo: valor})
+    assert tocadas == len({id_ruta for id_ruta, _, _ in cambios if id_ruta != 999})
+    assert _estado(lote) == _estado(secuencial)
+    assert {id_ruta: (ruta.origen, ruta.nombre, ruta.ultima_actualizacion)
+            for id_ruta, ruta in lote.rutas.items()} == \
+        {id_ruta: (ruta.origen, ruta.nombre, ruta.ultima_actualizacion)
+         for id_ruta, ruta in secuencial.rutas.items()}
+    assert [ruta.calcular_prioridad() for ruta, _ in lote.generar_plan_optimizacion(300)] == \
+        [ruta.calcular_prioridad() for ruta, _ in secuencial.generar_plan_optimizacion(300)]
+
+
+# --- fork ---
+
+def test_fork_aislado():
+    base = _sistema()
+    antes = _estado(base)
+    escenario = base.fork()
+    escenario.aplicar_lote([(1, "retraso_acumulado", 90), (2, "densidad_pasajeros", 0.0)])
+    escenario.asignar_vehiculos(10)
+    escenario.procesar_ruta_critica()
+    assert _estado(base) == antes
+    assert len(_prioridades_heap(base)) == len(base.rutas)
+    assert escenario.rutas[1].retraso_acumulado == 90
+    base.actualizar_ruta(3, retraso_acumulado=77)
+    assert escenario.rutas[3].retraso_acumulado != 77
+    assert _prioridades_heap(base) == _prioridades_bruto(base)
+    # la ruta procesada ya no está en el heap del escenario
+    assert _prioridades_heap(escenario) == _prioridades_bruto(escenario)[1:]
+
+
+def test_fork_anidado_aislado():
+    base = _sistema()
+    antes = _estado(base)
+    hijo = base.fork()
+    hijo.actualizar_ruta(1, retraso_acumulado=50)
+    nieto = hijo.fork()
+    nieto.actualizar_ruta(1, retraso_acumulado=60)
+    nieto.actualizar_ruta(2, retraso_acumulado=70)
+    assert _estado(base) == antes
+    assert hijo.rutas[1].retraso_acumulado == 50
+    assert hijo.rutas[2].retraso_acumulado == antes[2][1]
+    assert nieto.rutas[1].retraso_acumulado == 60
+    for sistema in (base, hijo, nieto):
+        assert _prioridades_heap(sistema) == _prioridades_bruto(sistema)
+
+
+def test_fork_anidado_actualizar_pesos():
+    # las rutas que un fork de un fork comparte siguen usando los pesos de
+    # la base; al cambiarlos en el lugar todos deben quedar ordenados
+    pesos = ht.Pesos()
+    base = _sistema(100, 2, pesos=pesos)
+    hijo = base.fork()
+    hijo.actualizar_ruta(1, retraso_acumulado=40)
+    nieto = hijo.fork()
+    nieto.actualizar_ruta(2, retraso_acumulado=30)
+    factores = nieto.pesos.factores
+    pesos.actualizar(demanda=200, retraso=0)
+    for sistema in (base, hijo, nieto):
+        assert _prioridades_heap(sistema) == _prioridades_bruto(sistema)
+    # los escenarios conservan su copia de los pesos
+    assert nieto.pesos.factores == factores
+    assert all(ruta._pesos is nieto.pesos for ruta in nieto.rutas.values())
+    ruta = base.rutas[5]
+    assert ruta.calcular_prioridad() == pytest.approx(
+        pesos.prioridad(ruta.densidad_pasajeros, ruta.retraso_acumulado,
+                        ruta.importancia_conexion, ruta.recursos_disponibles))
+
+
+def test_fork_copia_con_pesos_propios():
+    base = _sistema(50)
+    escenario = base.fork()
+    escenario.actualizar_ruta(4, retraso_acumulado=33)
+    assert escenario.rutas[4]._pesos is escenario.pesos
+    assert base.rutas[4]._pesos is base.pesos
+
+
+@pytest.mark.parametrize("clase", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+def test_fork_cambiar_pesos(clase):
+    base = _sistema(100, clase=clase)
+    escenario = base.fork()
+    escenario.cambiar_pesos(demanda=100)
+    assert base.pesos.demanda != 100
+    critica = escenario.obtener_ruta_mas_critica()
+    assert critica.calcular_prioridad() == pytest.approx(_prioridades_bruto(escenario)[0])
+    assert base.obtener_ruta_mas_critica().calcular_prioridad() == pytest.approx(
+        _prioridades_bruto(base)[0])
+
+
+def test_fork_liberado_libera_base():
+    base = _sistema(50)
+    hijo = base.fork()
+    nieto = hijo.fork()
+    del hijo
+    # el nieto todavía comparte las rutas de la base
+    assert base._propias is not None
+    nieto.actualizar_ruta(1, retraso_acumulado=99)
+    assert base.rutas[1].retraso_acumulado != 99
+    del nieto
+    assert base._propias is None and not base._compartido
+    base.actualizar_ruta(1, retraso_acumulado=99)
+    assert base.rutas[1]._pesos is base.pesos
+
+
+def test_simular_dia_no_deja_la_base_compartida():
+    base = _sistema(100)
+    antes = _estado(base)
+    simular_dia(base, 1)
+    assert _estado(base) == antes
+    assert base._propias is None and not base._compartido
+
+
+# --- eventos ---
+
+@pytest.mark.parametrize("clase", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+def test_evento_con_ruta_repetida_suma_incrementos(clase):
+    sistema = _sistema(50, clase=clase)
+    retraso = sistema.rutas[3].retraso_acumulado
+    recursos = sistema.rutas[4].recursos_disponibles
+    simulador = Simulador()
+    ht.registrar_eventos(simulador, sistema)
+    simulador.programar(1, "accidente", [(3, 5), (7, 1), (3, 2)])
+    simulador.programar(2, "refuerzo", [(4, 1), (4, 2)])
+    simulador.programar(3, "hora pico", [(5, 0.2), (5, 0.9)])
+    simulador.ejecutar()
+    assert sistema.rutas[3].retraso_acumulado == retraso + 7
+    assert sistema.rutas[4].recursos_disponibles == recursos + 3
+    assert sistema.rutas[5].densidad_pasajeros == 0.9
+
+
+# --- snapshot ---
+
+def _pendientes(sistema):
+    # prioridades de las rutas pendientes en el orden en que se procesarían
+    escenario = sistema.fork()
+    salida = []
+    while (ruta := escenario.procesar_ruta_critica()) is not None:
+        salida.append(round(ruta.calcular_prioridad(), 9))
+    return salida
+
+
+@pytest.mark.parametrize("origen", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+@pytest.mark.parametrize("destino", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+def test_snapshot_entre_sistemas(tmp_path, origen, destino):
+    sistema = origen(pesos=ht.Pesos(demanda=12, recursos=1))
+    sistema.agregar_rutas(generar_red(300, 3))
+    for _ in range(20):
+        sistema.procesar_ruta_critica()
+    sistema.aplicar_lote([(5, "retraso_acumulado", 99), (7, "densidad_pasajeros", 0.9)])
+    path = tmp_path / "rutas.snap"
+    sistema.guardar_snapshot(path)
+    cargado = destino.cargar_snapshot(path)
+    assert _estado(cargado) == _estado(sistema)
+    assert {id_ruta: ruta.ultima_actualizacion for id_ruta, ruta in cargado.rutas.items()} == \
+        {id_ruta: ruta.ultima_actualizacion for id_ruta, ruta in sistema.rutas.items()}
+    assert cargado.pesos.factores == sistema.pesos.factores
+    assert _pendientes(cargado) == _pendientes(sistema)
+    assert len(_pendientes(cargado)) == 280
+
+
+# --- frescura ---
+
+@pytest.mark.parametrize("clase", [ht.SistemaTransporte, ht.SistemaTransporteColumnar])
+def test_rutas_sin_actualizar_contra_fuerza_bruta(clase):
+    rng = random.Random(9)
+    hora = [datetime(2026, 1, 1, 8)]
+    rutas = generar_red(200, 9)
+    for ruta in rutas:
+        ruta.ultima_actualizacion = hora[0] - timedelta(minutes=rng.randint(0, 120))
+    sistema = clase()
+    sistema.reloj = lambda: hora[0]
+    sistema.agregar_rutas(rutas)
+    informadas = {}
+    for _ in range(200):
+        hora[0] += timedelta(seconds=rng.randint(0, 90))
+        operacion = rng.random()
+        if operacion < 0.4:
+            sistema.actualizar_ruta(rng.randrange(200), retraso_acumulado=rng.randint(0, 30))
+        elif operacion < 0.6:
+            sistema.aplicar_lote([(rng.randrange(200), "densidad_pasajeros", rng.random())
+                                  for _ in range(4)])
+        elif operacion < 0.7:
+            sistema.asignar_vehiculos(rng.randint(1, 5))
+        minutos = rng.choice([10, 30, 60])
+        limite = hora[0] - timedelta(minutes=minutos)
+        esperadas = sorted((ruta.ultima_actualizacion, ruta.id)
+                           for ruta in sistema.rutas.values() if ruta.ultima_actualizacion < limite)
+        assert [(ruta.ultima_actualizacion, ruta.id)
+                for ruta in sistema.rutas_sin_actualizar(minutos)] == esperadas
+        # vencidas() retorna solo las que no informó antes con esa marca
+        limite = hora[0] - timedelta(minutes=30)
+        for ruta in sistema.frescura.vencidas(limite.timestamp()):
+            assert ruta.ultima_actualizacion < limite
+            assert informadas.get(ruta.id) != ruta.ultima_actualizacion
+            informadas[ruta.id] = ruta.ultima_actualizacion
+        assert {id_ruta: ruta.ultima_actualizacion for id_ruta, ruta in sistema.rutas.items()
+                if ruta.ultima_actualizacion < limite} == \
+            {id_ruta: marca for id_ruta, marca in informadas.items()
+             if sistema.rutas[id_ruta].ultima_actualizacion == marca}